@@ -0,0 +1,83 @@
+"""Backup and restore throughput and main-thread stalls during a backup
+
+Times a full snapshot, an incremental one after changing about 1% of
+the rows, a restore into the open database and a verification, in MB of
+database per second. While a second full backup runs on a worker
+thread, the main thread wakes every --tick-ms milliseconds like an event
+loop; the worst delay over that interval shows whether a backup can
+freeze the UI.
+
+Usage: python -m benchmarks.bench_backup [--rows N] [--compression gzip|zstd]
+"""
+import argparse
+import json
+import tempfile
+import threading
+import time
+from itertools import islice
+from pathlib import Path
+
+from benchmarks.generator import generate
+from src.models import BackupStore, Database, TransferResult
+
+
+def _report(result: TransferResult) -> dict:
+    """Throughput and sizes of one transfer"""
+    return {
+        "mb": round(result.bytes / 1e6, 2),
+        "stored_mb": round(result.stored_bytes / 1e6, 2),
+        "seconds": round(result.seconds, 3),
+        "mb_per_sec": round(result.mb_per_sec, 1),
+        "new_pages": result.snapshot.new_pages,
+    }
+
+
+def _max_stall_ms(work, tick_ms: float) -> float:
+    """Longest main-thread delay beyond tick_ms while work runs on a thread"""
+    worker = threading.Thread(target=work)
+    worker.start()
+    worst = 0.0
+    while worker.is_alive():
+        start = time.perf_counter()
+        time.sleep(tick_ms / 1000)
+        worst = max(worst, (time.perf_counter() - start) * 1000 - tick_ms)
+    worker.join()
+    return round(worst, 2)
+
+
+def run(rows: int, root: Path, compression: str, tick_ms: float) -> dict:
+    """Return backup, restore and responsiveness figures"""
+    store = BackupStore(root / "backups", compression)
+    with Database(root / "backup.db", query_cache_size=0) as db:
+        db.add_transactions(generate(rows))
+        results = {"compression": store.compression, "full": _report(store.backup(db))}
+
+        db.add_transactions(generate(rows // 200, seed=1))
+        for transaction in islice(db.iter_transactions(), rows // 200):
+            db.delete_transaction(transaction.id)
+        results["incremental"] = _report(store.backup(db))
+
+        start = time.perf_counter()
+        store.verify()
+        results["verify_seconds"] = round(time.perf_counter() - start, 3)
+        results["restore"] = _report(store.restore(db, store.snapshot(1)))
+        assert db.count_transactions() == rows
+
+        results["max_stall_ms"] = _max_stall_ms(lambda: store.backup(db), tick_ms)
+        results["tick_ms"] = tick_ms
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--compression", choices=["gzip", "zstd"])
+    parser.add_argument("--tick-ms", type=float, default=16.0)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        print(json.dumps(run(args.rows, Path(tmp), args.compression, args.tick_ms), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Insert latency with and without budgets evaluated on every insert
+
+Stores --budgets budgets, a month, week and year limit for every
+category of the generated data and monthly limits on synthetic
+categories for the rest, then times single inserts with no evaluator
+and with a BudgetEvaluator attached, plus the evaluator's seeding query
+and its cost per change event on its own.
+
+Usage: python -m benchmarks.bench_budgets [--rows N] [--budgets N] [--inserts N] [--rounds N]
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.generator import END_DATE, PROFILES, generate
+from src.models import Budget, BudgetEvaluator, ChangeEvent, Database, Transaction
+
+
+def _budgets(count: int):
+    """Budgets on the generated categories first, then on synthetic ones"""
+    budgets = [
+        Budget(profile.category, profile.median_cents * 40, period)
+        for profile in PROFILES if profile.transaction_type == "expense"
+        for period in ("week", "month", "year")
+    ][:count]
+    budgets += [Budget(f"Budget {i}", 10000) for i in range(count - len(budgets))]
+    return budgets
+
+
+def _insert_latencies(db: Database, inserts: int, latencies: list):
+    """Append the duration of inserts add_transaction calls, in milliseconds"""
+    for i in range(inserts):
+        transaction = Transaction(f"Insert {i}", PROFILES[i % 3].category, 1000, "expense",
+                                  END_DATE)
+        start = time.perf_counter()
+        db.add_transaction(transaction)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def _percentiles(latencies: list) -> dict:
+    """Median and 99th percentile of latencies"""
+    latencies = sorted(latencies)
+    return {
+        "median_ms": round(statistics.median(latencies), 4),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 4),
+    }
+
+
+def run(rows: int, budgets: int, inserts: int, root: Path, rounds: int = 3) -> dict:
+    """Return seeding, per-event and insert timings
+
+    Inserts with and without the evaluator alternate over rounds, so the
+    growing table and disk noise affect both alike.
+    """
+    with Database(root / "budgets.db", query_cache_size=0) as db:
+        db.add_transactions(generate(rows))
+        for budget in _budgets(budgets):
+            db.set_budget(budget)
+        results = {}
+
+        start = time.perf_counter()
+        evaluator = BudgetEvaluator.load(db, END_DATE.date())
+        results["seed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+        event = ChangeEvent("insert", [Transaction("Event", "Groceries", 1, "expense", END_DATE)])
+        start = time.perf_counter()
+        for _ in range(inserts):
+            evaluator.apply(event)
+        results["apply_us"] = round((time.perf_counter() - start) / inserts * 1e6, 3)
+
+        without, with_evaluator = [], []
+        for _ in range(rounds):
+            _insert_latencies(db, inserts, without)
+            evaluator.attach(db)
+            _insert_latencies(db, inserts, with_evaluator)
+            evaluator.detach()
+        results["without_evaluator"] = _percentiles(without)
+        results["with_evaluator"] = _percentiles(with_evaluator)
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--budgets", type=int, default=1000)
+    parser.add_argument("--inserts", type=int, default=2000, help="per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run(args.rows, args.budgets, args.inserts, Path(tmp), args.rounds)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
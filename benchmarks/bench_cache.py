@@ -0,0 +1,86 @@
+"""Measure repeated dashboard reads with and without the query cache
+
+Simulates tab switches on unchanged data: every round reads the summary,
+the monthly trends, the first page of each type tab and its row count.
+A single write between rounds shows the cost of invalidation.
+
+Usage: python -m benchmarks.bench_cache [--rows N] [--rounds N]
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.models import Database, Transaction, TransactionFilter
+
+CATEGORIES = ["Food", "Transport", "Rent", "Fun", "Health", "Salary", "Gifts"]
+
+
+def _synthetic(rows: int):
+    """Yield deterministic synthetic transactions"""
+    rng = random.Random(7)
+    start = datetime(2015, 1, 1)
+    for i in range(rows):
+        yield Transaction(
+            description=f"Transaction {i}",
+            category=rng.choice(CATEGORIES),
+            amount=rng.randint(100, 50000),
+            transaction_type="income" if rng.random() < 0.2 else "expense",
+            date=start + timedelta(minutes=rng.randrange(5_000_000))
+        )
+
+
+def _dashboard(db: Database):
+    """Run the reads of one round of tab switches"""
+    db.get_summary()
+    db.get_trends("month")
+    for transaction_type in ("expense", "income"):
+        transaction_filter = TransactionFilter(transaction_type=transaction_type)
+        db.get_page(transaction_filter, limit=200)
+        db.count_transactions(transaction_filter)
+
+
+def _ms_per_round(db: Database, rounds: int, write_every: int = 0) -> float:
+    """Average milliseconds per round, optionally writing every few rounds"""
+    start = time.perf_counter()
+    for i in range(rounds):
+        if write_every and i % write_every == 0:
+            db.add_transaction(Transaction("Coffee", "Food", 350, "expense"))
+        _dashboard(db)
+    return (time.perf_counter() - start) * 1000 / rounds
+
+
+def run(rows: int, rounds: int) -> dict:
+    """Compare cached and uncached rounds on the same database"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cache.db"
+        with Database(path, query_cache_size=0) as db:
+            db.add_transactions(_synthetic(rows))
+            uncached = _ms_per_round(db, rounds)
+        with Database(path) as db:
+            cached = _ms_per_round(db, rounds)
+            stats = db.cache_stats()
+            with_writes = _ms_per_round(db, rounds, write_every=10)
+    return {
+        "rows": rows,
+        "uncached_ms_per_round": round(uncached, 3),
+        "cached_ms_per_round": round(cached, 3),
+        "cached_with_writes_ms_per_round": round(with_writes, 3),
+        "hit_rate": round(stats.hit_rate, 3),
+    }
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.rounds), indent=2))
+
+
+if __name__ == "__main__":
+    main()
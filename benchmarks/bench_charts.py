@@ -0,0 +1,88 @@
+"""Measure the cost of one chart update
+
+Compares rebuilding the figure on every update (clear, new subplot,
+tight_layout, full draw) with the artist-reusing chart widgets.
+
+Usage: QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_charts [--updates N]
+"""
+import argparse
+import random
+import time
+
+from PyQt6.QtWidgets import QApplication
+
+from src.ui.widgets.charts import BarChart, PieChart
+
+CATEGORIES = ["Food", "Transport", "Rent", "Fun", "Health", "Gifts"]
+
+
+def _rebuild_pie(chart: PieChart, data: dict):
+    """Draw a pie the way the widget did before reusing artists"""
+    chart.figure.clear()
+    ax = chart.figure.add_subplot(111)
+    ax.pie(data.values(), labels=data.keys(), autopct='%1.1f%%', startangle=90)
+    ax.set_title(chart.title, fontsize=12, fontweight='bold')
+    chart.figure.tight_layout()
+    chart.canvas.draw()
+
+
+def _rebuild_bars(chart: BarChart, values: tuple):
+    """Draw bars the way the widget did before reusing artists"""
+    chart.figure.clear()
+    ax = chart.figure.add_subplot(111)
+    ax.bar(['Expenses', 'Incomes'], values, color=['#dc3545', '#28a745'], alpha=0.7, edgecolor='black')
+    for i, value in enumerate(values):
+        ax.text(i, value, f'€{value:.2f}', ha='center', va='bottom')
+    chart.figure.tight_layout()
+    chart.canvas.draw()
+
+
+def _reuse(chart, update):
+    """Update a widget and flush its pending draw_idle"""
+    update()
+    chart.canvas.draw()
+
+
+def _ms_per_call(func, inputs) -> float:
+    """Average milliseconds per call of func over inputs"""
+    start = time.perf_counter()
+    for item in inputs:
+        func(item)
+    return (time.perf_counter() - start) * 1000 / len(inputs)
+
+
+def run(updates: int) -> dict:
+    """Return milliseconds per update for each strategy"""
+    rng = random.Random(7)
+    pies = [{c: rng.randint(100, 10000) for c in CATEGORIES} for _ in range(updates)]
+    bars = [(rng.randint(100, 100000), rng.randint(100, 100000)) for _ in range(updates)]
+
+    # Separate widgets: rebuilding replaces the axes the reusing widgets own
+    old_pie, old_bar = PieChart("Bench"), BarChart("Bench")
+    pie, bar = PieChart("Bench"), BarChart("Bench")
+    for chart in (old_pie, old_bar, pie, bar):
+        chart.show()
+    return {
+        "pie_rebuild_ms": _ms_per_call(lambda d: _rebuild_pie(old_pie, d), pies),
+        "pie_reuse_ms": _ms_per_call(lambda d: _reuse(pie, lambda: pie.plot(d)), pies),
+        "pie_unchanged_ms": _ms_per_call(lambda d: pie.plot(pies[-1]), pies),
+        "bar_rebuild_ms": _ms_per_call(lambda v: _rebuild_bars(old_bar, v), bars),
+        "bar_reuse_ms": _ms_per_call(lambda v: _reuse(bar, lambda: bar.plot(*v)), bars),
+        "bar_unchanged_ms": _ms_per_call(lambda v: bar.plot(*bars[-1]), bars),
+    }
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=50)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    for name, value in run(args.updates).items():
+        print(f"{name}: {value:.2f}")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare write throughput of connect-per-call and pooled connections
+
+Usage: python -m benchmarks.bench_connection [--ops N]
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from src.models import Database, Transaction
+
+
+def _legacy_add(db_path: Path, transaction: Transaction) -> int:
+    """Insert the way Database did before pooling: one connection per call"""
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO transactions
+            (description, category, amount, transaction_type, date)
+            VALUES (?, ?, ?, ?, ?)
+        """, (
+            transaction.description,
+            transaction.category,
+            transaction.amount,
+            transaction.transaction_type,
+            transaction.date.isoformat()
+        ))
+        conn.commit()
+        return cursor.lastrowid
+
+
+def _legacy_delete(db_path: Path, transaction_id: int) -> bool:
+    """Delete the way Database did before pooling"""
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
+        conn.commit()
+        return cursor.rowcount > 0
+
+
+def _ops_per_sec(func, args_list) -> float:
+    """Run func over args_list and return calls per second"""
+    start = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    return len(args_list) / (time.perf_counter() - start)
+
+
+def run(ops: int) -> dict:
+    """Run the legacy and pooled benchmarks and return ops/sec"""
+    transaction = Transaction("Coffee", "Food", 350, "expense")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Legacy journal: rollback journal with full sync, reopened per call
+        legacy = Database(Path(tmp) / "legacy.db", journal_mode="DELETE", synchronous="FULL")
+        legacy.close()
+        ids = []
+        start = time.perf_counter()
+        for _ in range(ops):
+            ids.append(_legacy_add(legacy.db_path, transaction))
+        results["legacy_add"] = ops / (time.perf_counter() - start)
+        results["legacy_delete"] = _ops_per_sec(
+            _legacy_delete, [(legacy.db_path, i) for i in ids]
+        )
+
+        with Database(Path(tmp) / "pooled.db") as pooled:
+            ids = []
+            start = time.perf_counter()
+            for _ in range(ops):
+                ids.append(pooled.add_transaction(transaction))
+            results["pooled_add"] = ops / (time.perf_counter() - start)
+            results["pooled_delete"] = _ops_per_sec(
+                pooled.delete_transaction, [(i,) for i in ids]
+            )
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = run(args.ops)
+    for operation in ("add", "delete"):
+        legacy = results[f"legacy_{operation}"]
+        pooled = results[f"pooled_{operation}"]
+        print(f"{operation:>7}: {legacy:10.0f} ops/s -> {pooled:10.0f} ops/s ({pooled / legacy:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Measure export throughput and memory for every format
+
+Exports the whole table and a tenth of it (by date) and reports rows/s
+and the peak of Python allocations during each export. Flat memory
+means the peak is the same for both sizes.
+
+Usage: python -m benchmarks.bench_export [--rows N] [--db PATH]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.models import Database, Transaction, TransactionFilter, export_transactions
+from src.models.export import WRITERS
+
+CATEGORIES = ["Food", "Transport", "Rent", "Fun", "Health", "Salary", "Gifts"]
+START = datetime(2015, 1, 1)
+SPAN_MINUTES = 5_000_000
+
+
+def _synthetic(rows: int):
+    """Yield deterministic synthetic transactions"""
+    rng = random.Random(11)
+    for i in range(rows):
+        yield Transaction(
+            description=f"Transaction {i}",
+            category=rng.choice(CATEGORIES),
+            amount=rng.randint(100, 50000),
+            transaction_type="income" if rng.random() < 0.2 else "expense",
+            date=START + timedelta(minutes=rng.randrange(SPAN_MINUTES))
+        )
+
+
+def _available_formats():
+    """Formats whose optional dependencies are installed"""
+    formats = []
+    for name, writer in WRITERS.items():
+        try:
+            writer.check()
+        except ImportError:
+            continue
+        formats.append(name)
+    return formats
+
+
+def _measure(db: Database, path: Path, export_format: str, transaction_filter) -> dict:
+    """Rows/s of one export, then its allocation peak in a second run"""
+    result = export_transactions(db, path, export_format, transaction_filter)
+    tracemalloc.start()
+    export_transactions(db, path, export_format, transaction_filter)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rows": result.rows,
+        "rows_per_sec": round(result.rows_per_sec),
+        "peak_mib": round(peak / 2 ** 20, 2),
+        "file_mib": round(os.path.getsize(path) / 2 ** 20, 2),
+    }
+
+
+def run(db_path: Path) -> dict:
+    """Export everything and a tenth of the table in every available format"""
+    tenth = TransactionFilter(
+        start_date=START, end_date=START + timedelta(minutes=SPAN_MINUTES // 10)
+    )
+    results = {}
+    with Database(db_path) as db, tempfile.TemporaryDirectory() as tmp:
+        for export_format in _available_formats():
+            path = Path(tmp) / f"export.{export_format}"
+            results[export_format] = {
+                "all": _measure(db, path, export_format, None),
+                "tenth": _measure(db, path, export_format, tenth),
+            }
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", type=Path, help="reuse this database instead of generating one")
+    args = parser.parse_args()
+    if args.db is not None:
+        print(json.dumps(run(args.db), indent=2))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "export.db"
+        with Database(db_path) as db:
+            db.add_transactions(_synthetic(args.rows))
+        print(json.dumps(run(db_path), indent=2))
+
+
+if __name__ == "__main__":
+    main()
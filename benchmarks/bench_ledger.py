@@ -0,0 +1,73 @@
+"""Compare one database file with a ledger of per-year partitions
+
+Times the current year's listing and count, which the ledger answers
+from one partition, and the full aggregates it fans out across all of
+them, before and after archiving every past year.
+
+Usage: python -m benchmarks.bench_ledger [--rows N]
+"""
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from benchmarks.generator import END_DATE, generate
+from src.models import Database, Ledger, TransactionFilter
+
+CURRENT_YEAR = TransactionFilter(start_date=datetime(END_DATE.year, 1, 1))
+
+
+def _ms(func, repeat: int = 5) -> float:
+    """Best of repeat calls of func, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _workload(store) -> dict:
+    """Time the reads shared by Database and Ledger"""
+    return {
+        "current_year_count_ms": _ms(lambda: store.count_transactions(CURRENT_YEAR)),
+        "current_year_first_page_ms": _ms(
+            lambda: list(islice(store.iter_transactions(CURRENT_YEAR), 200))
+        ),
+        "summary_ms": _ms(store.get_summary),
+        "trends_week_ms": _ms(lambda: store.get_trends("week")),
+    }
+
+
+def run(rows: int, root: Path) -> dict:
+    """Return timings of a single file and of the ledger, active and archived"""
+    transactions = list(generate(rows))
+    options = {"query_cache_size": 0}
+    results = {}
+    with Database(root / "single.db", **options) as db:
+        db.add_transactions(transactions)
+        results["single_file"] = _workload(db)
+        with Ledger(root / "ledger", **options) as ledger:
+            ledger.import_database(db)
+            results["ledger"] = _workload(ledger)
+            for partition in ledger.partitions():
+                if partition.year < END_DATE.year:
+                    ledger.archive(partition.account, partition.year)
+            results["ledger_archived"] = _workload(ledger)
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        print(json.dumps(run(args.rows, Path(tmp)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
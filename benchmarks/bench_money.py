@@ -0,0 +1,63 @@
+"""Compare summing amounts stored as REAL and as INTEGER cents
+
+Fills two plain tables with the same random amounts, one as floats and
+one as cents, and reports SUM() time and whether each result matches an
+exact Decimal reference.
+
+Usage: python -m benchmarks.bench_money [--rows N]
+"""
+import argparse
+import json
+import random
+import sqlite3
+import time
+from decimal import Decimal
+
+from src.utils.money import from_cents
+
+
+def _timed_sum(conn: sqlite3.Connection, table: str):
+    """Return (SUM(amount), milliseconds) for one table"""
+    start = time.perf_counter()
+    total = conn.execute(f"SELECT SUM(amount) FROM {table}").fetchone()[0]
+    return total, (time.perf_counter() - start) * 1000
+
+
+def run(rows: int, seed: int = 12) -> dict:
+    """Sum the same amounts stored both ways and compare to Decimal"""
+    rng = random.Random(seed)
+    cents = [rng.randint(1, 99999) for _ in range(rows)]
+    reference = sum(from_cents(c) for c in cents)
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE amounts_real (amount REAL NOT NULL)")
+    conn.execute("CREATE TABLE amounts_cents (amount INTEGER NOT NULL)")
+    conn.executemany("INSERT INTO amounts_real VALUES (?)", ((c / 100,) for c in cents))
+    conn.executemany("INSERT INTO amounts_cents VALUES (?)", ((c,) for c in cents))
+
+    real_total, real_ms = _timed_sum(conn, "amounts_real")
+    cents_total, cents_ms = _timed_sum(conn, "amounts_cents")
+    conn.close()
+
+    return {
+        "rows": rows,
+        "reference": str(reference),
+        "real_sum": repr(real_total),
+        "real_exact": Decimal(repr(real_total)) == reference,
+        "real_ms": round(real_ms, 2),
+        "cents_sum": str(from_cents(cents_total)),
+        "cents_exact": from_cents(cents_total) == reference,
+        "cents_ms": round(cents_ms, 2),
+    }
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Backfill of recurring rules that have never been materialized
+
+Stores --rules rules, a mix of weekly, monthly and yearly ones plus a
+few daily ones, all starting --years years ago, then times the first
+materialize_recurring call creating every missed occurrence and a
+second call, which must create none.
+
+Usage: python -m benchmarks.bench_recurring [--rules N] [--years N]
+"""
+import argparse
+import json
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from benchmarks.generator import END_DATE
+from src.models import Database, RecurringRule
+
+# Share of rules per frequency, out of 20
+MIX = ("weekly",) * 6 + ("monthly",) * 11 + ("yearly",) * 2 + ("daily",)
+
+
+def _rules(count: int, years: int):
+    """Rules with varied frequencies, start days and intervals"""
+    first = END_DATE.date() - timedelta(days=365 * years)
+    return [
+        RecurringRule(
+            description=f"Subscription {i}",
+            category=f"Recurring {i % 12}",
+            amount=500 + i,
+            transaction_type="income" if i % 10 == 0 else "expense",
+            frequency=MIX[i % len(MIX)],
+            start=first + timedelta(days=i % 28),
+            interval=1 + i % 2 if MIX[i % len(MIX)] == "weekly" else 1,
+        )
+        for i in range(count)
+    ]
+
+
+def run(rules: int, years: int, root: Path) -> dict:
+    """Return the rows created and the time of both runs"""
+    with Database(root / "recurring.db", query_cache_size=0) as db:
+        for rule in _rules(rules, years):
+            db.add_recurring_rule(rule)
+        start = time.perf_counter()
+        created = db.materialize_recurring(END_DATE.date())
+        backfill = time.perf_counter() - start
+        start = time.perf_counter()
+        again = db.materialize_recurring(END_DATE.date())
+        rerun = time.perf_counter() - start
+        stored = db.count_transactions()
+    return {
+        "rules": rules,
+        "years": years,
+        "created": created,
+        "backfill_ms": round(backfill * 1000, 1),
+        "rows_per_sec": round(created / backfill),
+        "rerun_created": again,
+        "rerun_ms": round(rerun * 1000, 2),
+        "stored": stored,
+    }
+
+
+def main() -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, default=300)
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run(args.rules, args.years, Path(tmp))
+    print(json.dumps(report, indent=2))
+    return 1 if report["rerun_created"] or report["stored"] != report["created"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
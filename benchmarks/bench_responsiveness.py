@@ -0,0 +1,126 @@
+"""Measure GUI event-loop stalls while a scanning query runs
+
+A timer ticks every few milliseconds on the GUI thread; the longest gap
+between ticks is the worst stall a user would notice. Weekly trends,
+aggregated from every row, or the full transaction list are loaded once
+on the GUI thread and once through DatabaseExecutor. The query cache is
+off and the summary is not used, as it is an O(1) rollup read.
+
+Usage: QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_responsiveness [--rows N]
+           [--query trends|transactions]
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+
+from src.models import Database, Transaction
+from src.ui.executor import DatabaseExecutor
+
+TICK_MS = 5
+CATEGORIES = ["Food", "Transport", "Rent", "Fun", "Health", "Salary", "Gifts"]
+# Queries that read every row, by --query name
+QUERIES = {
+    "trends": lambda db: db.get_trends("week"),
+    "transactions": lambda db: db.get_all_transactions(),
+}
+
+
+def _synthetic(rows: int):
+    """Yield deterministic synthetic transactions"""
+    rng = random.Random(42)
+    start = datetime(2015, 1, 1)
+    for i in range(rows):
+        yield Transaction(
+            description=f"Transaction {i}",
+            category=rng.choice(CATEGORIES),
+            amount=rng.randint(100, 50000),
+            transaction_type="income" if rng.random() < 0.2 else "expense",
+            date=start + timedelta(minutes=rng.randrange(5_000_000))
+        )
+
+
+class StallMeter:
+    """Record the longest gap between timer ticks"""
+
+    def __init__(self):
+        """Start ticking"""
+        self.max_gap = 0.0
+        self._last = time.perf_counter()
+        self.timer = QTimer()
+        self.timer.setInterval(TICK_MS)
+        self.timer.timeout.connect(self._tick)
+        self.timer.start()
+
+    def _tick(self):
+        """Record the time since the previous tick"""
+        now = time.perf_counter()
+        self.max_gap = max(self.max_gap, now - self._last)
+        self._last = now
+
+    def reset(self):
+        """Forget previous gaps"""
+        self.max_gap = 0.0
+        self._last = time.perf_counter()
+
+
+def _run_loop(until):
+    """Run the event loop until until() returns True"""
+    loop = QEventLoop()
+    poll = QTimer()
+    poll.timeout.connect(lambda: until() and loop.quit())
+    poll.start(1)
+    loop.exec()
+
+
+def run(db: Database, query: str = "trends") -> dict:
+    """Return the worst stall (ms) for synchronous and background loads"""
+    load = QUERIES[query]
+    meter = StallMeter()
+    results = {}
+
+    # Synchronous: the query runs inside a GUI-thread slot
+    done = []
+    meter.reset()
+    QTimer.singleShot(0, lambda: done.append(load(db)))
+    _run_loop(lambda: bool(done))
+    results["gui_thread_stall_ms"] = meter.max_gap * 1000
+
+    # Background: the query runs on the executor's pool
+    executor = DatabaseExecutor()
+    done.clear()
+    meter.reset()
+    executor.submit(query, load, db, on_result=done.append)
+    _run_loop(lambda: bool(done))
+    results["worker_stall_ms"] = meter.max_gap * 1000
+    executor.shutdown()
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", help="reuse this database file instead of generating one")
+    parser.add_argument("--query", choices=sorted(QUERIES), default="trends")
+    args = parser.parse_args()
+
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(args.db) if args.db else Path(tmp) / "bench.db"
+        with Database(db_path, query_cache_size=0) as db:
+            if not args.db:
+                print(f"generating {args.rows} rows...")
+                db.add_transactions(_synthetic(args.rows))
+            for name, value in run(db, args.query).items():
+                print(f"{name}: {value:.1f}")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Measure search-as-you-type latency of the full-text index
+
+Replays the prefixes a user types for a few queries and reports the
+median and worst latency of Database.search and of a filtered first
+page, with the query cache disabled.
+
+Usage: python -m benchmarks.bench_search [--rows N] [--db PATH]
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.models import Database, Transaction, TransactionFilter
+
+WORDS = ["coffee", "café", "supermarket", "rent", "salary", "gym", "cinema", "pharmacy",
+         "train", "taxi", "bakery", "restaurant", "electricity", "water", "internet",
+         "phone", "books", "gift", "insurance", "parking"]
+CATEGORIES = ["Food", "Transport", "Rent", "Fun", "Health", "Salary", "Gifts"]
+QUERIES = ["coffee taxi", "supermarket", "cafe", "insurance 4242", "food"]
+
+
+def _synthetic(rows: int):
+    """Yield deterministic synthetic transactions with searchable text"""
+    rng = random.Random(3)
+    start = datetime(2015, 1, 1)
+    for _ in range(rows):
+        yield Transaction(
+            description=f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.randint(1, 99999)}",
+            category=rng.choice(CATEGORIES),
+            amount=rng.randint(100, 50000),
+            transaction_type="income" if rng.random() < 0.2 else "expense",
+            date=start + timedelta(minutes=rng.randrange(5_000_000))
+        )
+
+
+def _keystrokes(query: str):
+    """Every prefix of query, as typed"""
+    return [query[:end] for end in range(1, len(query) + 1) if query[:end].strip()]
+
+
+def _latencies(func, inputs, repeat: int = 3):
+    """Best-of-repeat milliseconds of func for every input"""
+    results = []
+    for value in inputs:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(value)
+            best = min(best, time.perf_counter() - start)
+        results.append(best * 1000)
+    return results
+
+
+def _report(latencies) -> dict:
+    """Median and worst of a list of milliseconds"""
+    return {
+        "median_ms": round(statistics.median(latencies), 3),
+        "max_ms": round(max(latencies), 3),
+    }
+
+
+def run(db_path: Path) -> dict:
+    """Time every keystroke of QUERIES against an existing database"""
+    with Database(db_path, query_cache_size=0) as db:
+        typed = [prefix for query in QUERIES for prefix in _keystrokes(query)]
+        expense = TransactionFilter(transaction_type="expense")
+        return {
+            "rows": db.count_transactions(),
+            "keystrokes": len(typed),
+            "search": _report(_latencies(lambda text: db.search(text, limit=200), typed)),
+            "search_expenses": _report(_latencies(
+                lambda text: db.search(text, expense, limit=200), typed
+            )),
+            "first_page": _report(_latencies(
+                lambda text: db.get_page(TransactionFilter(search=text), limit=200), typed
+            )),
+        }
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", type=Path, help="reuse this database instead of generating one")
+    args = parser.parse_args()
+    if args.db is not None:
+        print(json.dumps(run(args.db), indent=2))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "search.db"
+        with Database(db_path) as db:
+            db.add_transactions(_synthetic(args.rows))
+        print(json.dumps(run(db_path), indent=2))
+
+
+if __name__ == "__main__":
+    main()
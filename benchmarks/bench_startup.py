@@ -0,0 +1,48 @@
+"""Measure cold-start time of the application
+
+Runs main.py --profile-startup in fresh interpreters against an empty
+database and reports the median time to first data per phase.
+
+Usage: QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_startup [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def run(runs: int) -> dict:
+    """Return median milliseconds per startup phase over several runs"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    reports = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, str(PROJECT_ROOT / "main.py"), "--profile-startup"],
+                capture_output=True, text=True, cwd=tmp, env=env, check=True
+            ).stdout
+            reports.append(json.loads(output))
+
+    results = {"total_ms": statistics.median(r["total_ms"] for r in reports)}
+    for phase in reports[0]["phases_ms"]:
+        results[f"{phase}_ms"] = statistics.median(r["phases_ms"][phase] for r in reports)
+    results["slowest_imports_us"] = reports[-1]["slowest_imports_us"]
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Deterministic synthetic transactions with realistic distributions
+
+Rows are spread over as many months as a household with the profiles
+below would need to produce them, at most MAX_MONTHS, ending at
+END_DATE; larger tables look like several households. Fixed payments
+(rent, salary) fall on the same day of the month, everyday spending
+follows daytime hours with more restaurants and entertainment on weekends and more
+shopping in December, and amounts are log-normal around a per-category
+median. The same seed always yields the same rows.
+"""
+import math
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterator, Optional, Tuple
+
+from src.models import Transaction
+
+END_DATE = datetime(2025, 12, 31)
+MAX_MONTHS = 120
+
+
+@dataclass(frozen=True)
+class Profile:
+    """How often and how much one category of transactions occurs"""
+    category: str
+    transaction_type: str
+    per_month: float
+    median_cents: int
+    sigma: float
+    descriptions: Tuple[str, ...]
+    day_of_month: Optional[int] = None
+    weekend_factor: float = 1.0
+    december_factor: float = 1.0
+
+
+PROFILES = (
+    Profile("Groceries", "expense", 12, 4500, 0.6,
+            ("Supermarket", "Farmers market", "Bakery", "Organic store", "Butcher")),
+    Profile("Restaurants", "expense", 6, 3200, 0.5,
+            ("Pizzeria", "Sushi bar", "Trattoria", "Burger place", "Thai kitchen"),
+            weekend_factor=2.0),
+    Profile("Coffee", "expense", 10, 350, 0.3, ("Coffee shop", "Café latte", "Espresso bar")),
+    Profile("Transport", "expense", 10, 650, 0.7,
+            ("Train ticket", "Bus pass", "Taxi ride", "Fuel station", "Parking")),
+    Profile("Utilities", "expense", 3, 8500, 0.3, ("Electricity bill", "Water bill", "Internet")),
+    Profile("Rent", "expense", 1, 95000, 0.0, ("Monthly rent",), day_of_month=1),
+    Profile("Entertainment", "expense", 3, 2500, 0.8,
+            ("Cinema", "Concert tickets", "Streaming service", "Museum"), weekend_factor=2.5),
+    Profile("Health", "expense", 1, 4000, 0.9, ("Pharmacy", "Dentist", "Gym membership")),
+    Profile("Shopping", "expense", 4, 6000, 1.0,
+            ("Clothing store", "Electronics", "Bookshop", "Home goods"), december_factor=2.5),
+    Profile("Salary", "income", 1, 320000, 0.05, ("Monthly salary",), day_of_month=27),
+    Profile("Freelance", "income", 0.5, 60000, 0.6, ("Consulting invoice", "Design project")),
+    Profile("Gifts", "income", 0.2, 5000, 0.8, ("Birthday gift", "Refund", "Cashback"),
+            december_factor=4.0),
+)
+
+ROWS_PER_MONTH = sum(profile.per_month for profile in PROFILES)
+
+
+def span_months(rows: int) -> int:
+    """Number of months the generated rows cover"""
+    return min(MAX_MONTHS, max(1, math.ceil(rows / ROWS_PER_MONTH)))
+
+
+def _weights(month: int, weekend: bool):
+    """Relative frequency of every profile for a calendar month and weekday"""
+    return [
+        profile.per_month
+        * (profile.weekend_factor if weekend else 1.0)
+        * (profile.december_factor if month == 12 else 1.0)
+        for profile in PROFILES
+    ]
+
+
+def generate(rows: int, seed: int = 0) -> Iterator[Transaction]:
+    """Yield rows transactions, roughly in date order"""
+    rng = random.Random(seed)
+    months = span_months(rows)
+    start = END_DATE - timedelta(days=months * 365.25 / 12)
+    span_seconds = (END_DATE - start).total_seconds()
+    weights = {
+        (month, weekend): _weights(month, weekend)
+        for month in range(1, 13) for weekend in (False, True)
+    }
+
+    for i in range(rows):
+        # Evenly spaced days with jitter; times follow waking hours
+        day = start + timedelta(seconds=span_seconds * (i + rng.random()) / rows)
+        profile = rng.choices(PROFILES, weights[(day.month, day.weekday() >= 5)])[0]
+        if profile.day_of_month is not None:
+            day = day.replace(day=profile.day_of_month, hour=9, minute=0, second=0)
+        else:
+            day = day.replace(
+                hour=min(23, max(6, round(rng.gauss(14, 4)))),
+                minute=rng.randrange(60), second=0
+            )
+        amount = round(profile.median_cents * math.exp(rng.gauss(0, profile.sigma)))
+        yield Transaction(
+            description=rng.choice(profile.descriptions),
+            category=profile.category,
+            amount=max(1, amount),
+            transaction_type=profile.transaction_type,
+            date=day.replace(microsecond=0)
+        )
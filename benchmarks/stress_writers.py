@@ -0,0 +1,105 @@
+"""Stress one database file with concurrent writer processes
+
+Each process opens the same file and inserts --writes transactions with
+unique descriptions, either through a WriteQueue or with one
+add_transaction call (and commit) per row. Afterwards every description
+must be stored exactly once. Reports throughput and failed writes, and
+exits with status 1 if a row is lost or duplicated.
+
+Usage: python -m benchmarks.stress_writers [--processes N] [--writes N] [--mode queue|direct]
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from src.models import Database, Transaction, WriteQueue
+
+
+def _transaction(worker: int, i: int) -> Transaction:
+    """Transaction identified by its writer and sequence number"""
+    return Transaction(
+        description=f"writer {worker} row {i}",
+        category="Stress",
+        amount=100 + i,
+        transaction_type="expense",
+        date=datetime(2024, 1, 1)
+    )
+
+
+def _write(db_path: str, worker: int, writes: int, mode: str, start, results):
+    """Process body: insert writes rows, then report (worker, failures)"""
+    failures = 0
+    with Database(db_path) as db:
+        start.wait()
+        if mode == "queue":
+            with WriteQueue(db) as writer:
+                futures = writer.add_transactions(_transaction(worker, i) for i in range(writes))
+                for future in futures:
+                    if future.exception() is not None:
+                        failures += 1
+        else:
+            for i in range(writes):
+                try:
+                    db.add_transaction(_transaction(worker, i))
+                except Exception:
+                    failures += 1
+    results.put((worker, failures))
+
+
+def run(db_path: Path, processes: int, writes: int, mode: str) -> dict:
+    """Run the writer processes and check the stored rows"""
+    Database(db_path).close()
+    context = multiprocessing.get_context("spawn")
+    start = context.Event()
+    results = context.Queue()
+    workers = [
+        context.Process(target=_write, args=(str(db_path), worker, writes, mode, start, results))
+        for worker in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    # Let every process open the database before the clock starts
+    time.sleep(1.0)
+    began = time.perf_counter()
+    start.set()
+    failures = sum(results.get()[1] for _ in workers)
+    seconds = time.perf_counter() - began
+    for process in workers:
+        process.join()
+
+    with Database(db_path) as db:
+        stored = Counter(t.description for t in db.iter_transactions())
+    expected = {_transaction(w, i).description for w in range(processes) for i in range(writes)}
+    return {
+        "mode": mode,
+        "processes": processes,
+        "writes": processes * writes,
+        "failed_writes": failures,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(sum(stored.values()) / seconds, 1),
+        "lost": len(expected - stored.keys()) - failures,
+        "duplicated": sum(1 for count in stored.values() if count > 1),
+    }
+
+
+def main() -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=2000, help="rows per process")
+    parser.add_argument("--mode", choices=["queue", "direct"], default="queue")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run(Path(tmp) / "stress.db", args.processes, args.writes, args.mode)
+    print(json.dumps(report, indent=2))
+    return 1 if report["lost"] or report["duplicated"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""Reproducible benchmark suite for the data layer, window and charts
+
+Builds a database from benchmarks.generator, then times insert
+throughput, get_all_transactions, the aggregation queries (with the
+query cache disabled), a full MainWindow._update_display on the
+offscreen Qt platform and one redraw of every chart. Each timing is
+the best of --repeat runs, like timeit, as the slower runs mostly
+measure other load on the machine.
+
+Results are written as JSON. Given --baseline, a previous results file,
+the suite exits with status 1 if any benchmark is more than --threshold
+(relative) worse than the baseline. The GUI benchmarks are skipped when
+PyQt6 is not installed or --no-gui is given.
+
+Usage: python -m benchmarks.suite [--rows N] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.generator import generate
+from src.models import Database, TransactionFilter
+
+# name -> {"value": float, "unit": str, "better": "lower" | "higher"}
+Results = Dict[str, dict]
+
+SINGLE_INSERTS = 500
+MIN_SAMPLE_MS = 20
+
+
+def _best_ms(func: Callable, repeat: int) -> float:
+    """Best wall time of func() over repeat samples, in milliseconds
+
+    Calls faster than MIN_SAMPLE_MS are timed in batches, so that timer
+    resolution and noise do not turn into false regressions.
+    """
+    start = time.perf_counter()
+    func()
+    first = (time.perf_counter() - start) * 1000
+    number = max(1, math.ceil(MIN_SAMPLE_MS / first)) if first else 1000
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) * 1000 / number)
+    return min(timings)
+
+
+def _ms(value: float) -> dict:
+    """Result entry of a duration"""
+    return {"value": round(value, 3), "unit": "ms", "better": "lower"}
+
+
+def _rate(value: float, unit: str) -> dict:
+    """Result entry of a throughput"""
+    return {"value": round(value, 1), "unit": unit, "better": "higher"}
+
+
+def bench_inserts(db_path: Path, rows: int, seed: int) -> Results:
+    """Fill db_path with rows transactions, then time single inserts elsewhere"""
+    transactions = list(generate(rows, seed))
+    with Database(db_path) as db:
+        start = time.perf_counter()
+        db.add_transactions(transactions)
+        bulk_seconds = time.perf_counter() - start
+
+    # Single inserts commit one by one; a separate file keeps rows exact
+    singles = list(generate(SINGLE_INSERTS, seed + 1))
+    with Database(db_path.with_name("singles.db")) as db:
+        start = time.perf_counter()
+        for transaction in singles:
+            db.add_transaction(transaction)
+        single_seconds = time.perf_counter() - start
+    return {
+        "insert_bulk": _rate(rows / bulk_seconds, "rows/s"),
+        "insert_single": _rate(SINGLE_INSERTS / single_seconds, "rows/s"),
+    }
+
+
+def bench_queries(db_path: Path, repeat: int) -> Results:
+    """Time the read paths the window and reports use"""
+    with Database(db_path, query_cache_size=0) as db:
+        queries = {
+            "get_all_transactions": db.get_all_transactions,
+            "get_summary": db.get_summary,
+            "get_category_totals": lambda: db.get_category_totals("expense"),
+            "get_period_totals": lambda: db.get_period_totals("month"),
+            "get_trends_month": lambda: db.get_trends("month"),
+            "get_trends_week": lambda: db.get_trends("week"),
+            "get_balance": db.get_balance,
+            "get_page_filtered": lambda: db.get_page(
+                TransactionFilter(transaction_type="expense", category="Groceries")
+            ),
+            "search": lambda: db.search("coffee"),
+        }
+        return {name: _ms(_best_ms(query, repeat)) for name, query in queries.items()}
+
+
+def bench_gui(db_path: Path, repeat: int) -> Results:
+    """Time MainWindow._update_display and chart redraws on the offscreen platform"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import QEventLoop
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.main_window import MainWindow
+    from src.ui.widgets.charts import BarChart, PieChart, TrendChart
+
+    app = QApplication.instance() or QApplication([])
+    results = {}
+    cwd = os.getcwd()
+    # MainWindow opens data/transactions.db relative to the working directory
+    os.chdir(db_path.parent.parent)
+    try:
+        window = MainWindow()
+        window.show()
+        for index in range(window.tabs.count()):
+            window.tabs.setCurrentIndex(index)
+        window.tabs.setCurrentIndex(0)
+
+        def wait(done: Callable[[], bool]):
+            while not done():
+                app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents)
+
+        def update_display():
+            if window.db.cache is not None:
+                window.db.cache.clear()
+            loaded = []
+            window.data_loaded.connect(lambda: loaded.append(True))
+            window._update_display()
+            wait(lambda: loaded and not window.executor.is_pending("trends"))
+            window.data_loaded.disconnect()
+            app.processEvents()
+
+        wait(lambda: not window.executor.is_pending("summary")
+             and not window.executor.is_pending("trends"))
+        results["update_display"] = _ms(_best_ms(update_display, repeat))
+
+        # Alternate two data sets so no redraw is skipped as unchanged
+        summary, trends = window.summary, window.trends
+        bar, pie, trend = BarChart(), PieChart(), TrendChart()
+        pie_data = [summary.categories("expense"), summary.categories("income")]
+        bar_data = [(summary.total_expenses, summary.total_incomes),
+                    (summary.total_incomes, summary.total_expenses)]
+        trend.plot(trends)
+        trend_data = [trend._data, tuple(values[-12:] for values in trend._data)]
+        charts = {"redraw_pie": (pie, pie_data), "redraw_bar": (bar, bar_data),
+                  "redraw_trend": (trend, trend_data)}
+        for name, (chart, data) in charts.items():
+            turn = []
+
+            def redraw(chart=chart, data=data, turn=turn):
+                chart._render(data[len(turn) % 2])
+                chart.canvas.draw()
+                turn.append(True)
+
+            results[name] = _ms(_best_ms(redraw, repeat))
+        # close() would ask for confirmation; release what it would
+        window.writer.close()
+        window.db_signals.detach()
+        window.executor.shutdown()
+        window.db.close()
+        window.hide()
+    finally:
+        os.chdir(cwd)
+    app.processEvents()
+    return results
+
+
+def run(rows: int, seed: int = 0, repeat: int = 5, gui: bool = True) -> dict:
+    """Run every benchmark on a fresh database and return the report"""
+    report = {
+        "meta": {
+            "rows": rows,
+            "seed": seed,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": {},
+    }
+    results = report["results"]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "data" / "transactions.db"
+        db_path.parent.mkdir()
+        results.update(bench_inserts(db_path, rows, seed))
+        results.update(bench_queries(db_path, repeat))
+        if gui:
+            try:
+                results.update(bench_gui(db_path, repeat))
+            except ImportError as e:
+                print(f"skipping GUI benchmarks: {e}", file=sys.stderr)
+    return report
+
+
+def regressions(results: Results, baseline: Results, threshold: float) -> List[str]:
+    """Describe every result more than threshold worse than its baseline"""
+    found = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base["value"] or not result["value"]:
+            continue
+        if result["better"] == "lower":
+            change = result["value"] / base["value"] - 1
+        else:
+            change = base["value"] / result["value"] - 1
+        if change > threshold:
+            found.append(f"{name}: {base['value']} -> {result['value']} {result['unit']} "
+                         f"({change:+.0%} worse)")
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per timing; the best counts")
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown counted as a regression (default 0.2)")
+    parser.add_argument("--no-gui", action="store_true", help="skip window and chart benchmarks")
+    args = parser.parse_args(argv)
+
+    report = run(args.rows, args.seed, args.repeat, gui=not args.no_gui)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.baseline is None:
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline["meta"]["rows"] != args.rows:
+        print(f"warning: baseline has {baseline['meta']['rows']} rows, this run {args.rows}",
+              file=sys.stderr)
+    found = regressions(report["results"], baseline["results"], args.threshold)
+    for line in found:
+        print(f"regression {line}", file=sys.stderr)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
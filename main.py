@@ -1,15 +1,45 @@
 """Application entry point"""
 import sys
-from PyQt6.QtWidgets import QApplication
-from src.ui.main_window import MainWindow
+from src.utils.profiling import enable_from_environment, profiler as trace_profiler
+from src.utils.startup import StartupProfiler
 
 
 def main():
-    """Main application entry point"""
+    """Main application entry point
+
+    Pass --profile-startup to print startup phase timings as JSON and
+    exit once the first data load has been shown. With the
+    EXPENSE_TRACKER_TRACE environment variable set to a path, spans are
+    recorded from the start and written there as a Chrome trace at exit.
+    """
+    trace_path = enable_from_environment()
+    profiler = StartupProfiler()
+    profile = "--profile-startup" in sys.argv
+    if profile:
+        sys.argv.remove("--profile-startup")
+
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.main_window import MainWindow
+    profiler.mark("imports")
+
     app = QApplication(sys.argv)
+    profiler.mark("qapplication")
     window = MainWindow()
+    profiler.mark("window")
     window.show()
-    sys.exit(app.exec())
+    profiler.mark("show")
+
+    if profile:
+        window.data_loaded.connect(lambda: (profiler.mark("first_data"), app.exit(0)))
+        app.exec()
+        window.writer.close()
+        window.db.close()
+        profiler.dump()
+        return
+    status = app.exec()
+    if trace_path is not None:
+        trace_profiler.export_chrome_trace(trace_path)
+    sys.exit(status)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,9 @@
+"""Headless command line interface: python -m src.cli
+
+Works on the models layer only and never imports PyQt, so it runs on
+servers without a display. Charts are rendered with matplotlib's Agg
+canvas.
+"""
+from .main import main
+
+__all__ = ["main"]
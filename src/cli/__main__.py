@@ -0,0 +1,6 @@
+"""Run the command line interface"""
+import sys
+from .main import main
+
+if __name__ == "__main__":
+    sys.exit(main())
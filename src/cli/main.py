@@ -0,0 +1,508 @@
+"""Command line entry point working on the models layer only"""
+import argparse
+import json
+import os
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional
+from src.models import (
+    BackupStore, Budget, BudgetAlert, BudgetEvaluator, ChecksumError, Database, ExportResult,
+    ImportResult, Ledger, RecurringRule, StatementImporter, Summary, TransactionFilter,
+    TransferResult, export_transactions
+)
+from src.models.budgets import BUDGET_PERIODS
+from src.models.recurring import FREQUENCIES
+from src.models.export import WRITERS, format_for
+from src.models.ledger import DEFAULT_ACCOUNT
+from src.utils.money import format_money, to_cents
+from src.utils.profiling import enable_from_environment, profiler
+
+DEFAULT_DB = "data/transactions.db"
+DEFAULT_LEDGER = "data/ledger"
+DEFAULT_BACKUPS = "data/backups"
+TREND_TITLES = {"day": "Daily", "week": "Weekly", "month": "Monthly", "year": "Yearly"}
+
+
+def _month(value: str) -> datetime:
+    """Parse YYYY-MM as the first moment of that month"""
+    return datetime.strptime(value, "%Y-%m")
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser):
+    """Options building a TransactionFilter"""
+    parser.add_argument("--type", dest="transaction_type", choices=["income", "expense"])
+    parser.add_argument("--category")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="first date included (ISO)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="first date excluded (ISO)")
+    parser.add_argument("--min-amount", type=to_cents, help="in currency units, e.g. 12.50")
+    parser.add_argument("--max-amount", type=to_cents, help="in currency units, e.g. 12.50")
+    parser.add_argument("--search", help="words of the description or category")
+
+
+def _filter(args: argparse.Namespace) -> TransactionFilter:
+    """Build the filter given on the command line"""
+    return TransactionFilter(
+        transaction_type=args.transaction_type,
+        category=args.category,
+        start_date=args.since,
+        end_date=args.until,
+        min_amount=args.min_amount,
+        max_amount=args.max_amount,
+        search=args.search,
+    )
+
+
+def _print_progress(result: ImportResult):
+    """Report import progress on stderr"""
+    print(f"\r{result.rows_read} rows read, {result.imported} imported",
+          end="", file=sys.stderr, flush=True)
+
+
+def _print_alert(alert: BudgetAlert):
+    """Report a budget that reached its warning level or limit"""
+    status = alert.status
+    budget = status.budget
+    print(f"budget {alert.level}: {budget.category} {format_money(status.spent)} of "
+          f"{format_money(budget.limit)} this {budget.period} ({status.ratio:.0%})")
+
+
+def cmd_import(db: Database, args: argparse.Namespace) -> int:
+    """Import statements into the database, reporting budgets they push over"""
+    if db.get_budgets():
+        evaluator = BudgetEvaluator.load(db)
+        evaluator.subscribe(_print_alert)
+        evaluator.attach(db)
+    importer = StatementImporter(
+        db,
+        batch_size=args.batch_size,
+        skip_duplicates=not args.keep_duplicates,
+        progress=None if args.quiet else _print_progress,
+        date_format=args.date_format,
+        decimal=args.decimal,
+    )
+    status = 0
+    for path in args.files:
+        result = importer.import_file(path)
+        if not args.quiet:
+            print(file=sys.stderr)
+        print(f"{path}: {result.imported} imported, {result.duplicates} duplicates, "
+              f"{result.invalid} invalid")
+        for error in result.errors:
+            print(f"  {error}", file=sys.stderr)
+        if result.invalid:
+            status = 1
+    return status
+
+
+def cmd_export(db: Database, args: argparse.Namespace) -> int:
+    """Stream matching transactions as CSV, JSONL or Parquet"""
+    export_format = args.format
+    if export_format is None:
+        try:
+            export_format = format_for(args.output) if args.output else "csv"
+        except ValueError as e:
+            print(f"error: {e}, pass --format", file=sys.stderr)
+            return 2
+    if args.output is not None:
+        output = args.output
+    else:
+        output = sys.stdout.buffer if WRITERS[export_format].binary else sys.stdout
+
+    def progress(result: ExportResult):
+        print(f"\r{result.rows} rows, {result.rows_per_sec:,.0f} rows/s",
+              end="", file=sys.stderr, flush=True)
+
+    try:
+        result = export_transactions(
+            db, output, export_format, _filter(args), args.chunk_size,
+            progress=None if args.quiet else progress
+        )
+    except ImportError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if not args.quiet:
+        print(f"\r{result.rows} rows exported in {result.seconds:.2f}s "
+              f"({result.rows_per_sec:,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+
+def cmd_summary(db: Database, args: argparse.Namespace) -> int:
+    """Print totals, categories and per-period totals"""
+    summary = db.get_summary()
+    periods = db.get_period_totals(args.period) if args.period else {}
+    if args.json:
+        print(json.dumps({
+            "totals": summary.totals,
+            "balance": summary.balance,
+            "categories": summary.by_category,
+            "periods": periods,
+        }, indent=2, ensure_ascii=False))
+        return 0
+
+    _print_summary(summary)
+    if periods:
+        print(f"\nPer {args.period}:")
+        for period, totals in periods.items():
+            incomes, expenses = totals.get("income", 0), totals.get("expense", 0)
+            print(f"  {period:<12} +{format_money(incomes):>13} -{format_money(expenses):>13} "
+                  f"= {format_money(incomes - expenses):>14}")
+    return 0
+
+
+def _print_summary(summary: Summary):
+    """Print balance, totals and category totals"""
+    print(f"Balance:  {format_money(summary.balance)}")
+    print(f"Incomes:  {format_money(summary.total_incomes)}")
+    print(f"Expenses: {format_money(summary.total_expenses)}")
+    for transaction_type in ("expense", "income"):
+        categories = summary.categories(transaction_type)
+        if categories:
+            print(f"\n{transaction_type.capitalize()}s by category:")
+            for category, total in sorted(categories.items(), key=lambda item: -item[1]):
+                print(f"  {category:<24} {format_money(total):>14}")
+
+
+def cmd_ledger(db: Database, args: argparse.Namespace) -> int:
+    """Split the database into partitions, list, summarize or archive them"""
+    with Ledger(args.root) as ledger:
+        if args.action == "split":
+            account = args.accounts[0] if args.accounts else DEFAULT_ACCOUNT
+            copied = ledger.import_database(db, account)
+            print(f"copied {copied} transactions into {len(ledger.partitions([account]))} "
+                  f"partitions of {account}")
+            return 0
+        if args.action == "summary":
+            _print_summary(ledger.get_summary(args.accounts, args.years))
+            return 0
+        if args.action in ("archive", "unarchive"):
+            if not args.years:
+                print("error: pass the partitions' years with --year", file=sys.stderr)
+                return 2
+            for account in args.accounts or [DEFAULT_ACCOUNT]:
+                for year in args.years:
+                    try:
+                        partition = getattr(ledger, args.action)(account, year)
+                    except KeyError:
+                        print(f"error: no partition {account}-{year}", file=sys.stderr)
+                        return 1
+                    print(partition.path)
+            return 0
+        for partition in ledger.partitions(args.accounts, args.years):
+            partition_db = ledger.database(partition)
+            state = "archived" if partition.archived else "active"
+            print(f"{partition.name:<20} {state:<9} {partition_db.count_transactions():>9} rows "
+                  f"{format_money(partition_db.get_balance()):>14}")
+        return 0
+
+
+def cmd_budgets(db: Database, args: argparse.Namespace) -> int:
+    """Set, remove or check spending limits"""
+    if args.action in ("set", "remove") and args.category is None:
+        print(f"error: {args.action} needs a category", file=sys.stderr)
+        return 2
+    if args.action == "set":
+        if args.amount is None:
+            print("error: set needs an amount", file=sys.stderr)
+            return 2
+        try:
+            budget = Budget(args.category, args.amount, args.period, args.warn_at)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        db.set_budget(budget)
+        print(f"{budget.category}: {format_money(budget.limit)} per {budget.period}")
+        return 0
+    if args.action == "remove":
+        if not db.delete_budget(args.category, args.period):
+            print(f"error: no {args.period} budget for {args.category}", file=sys.stderr)
+            return 1
+        return 0
+
+    evaluator = BudgetEvaluator.load(db, args.date)
+    over = 0
+    for status in evaluator.statuses():
+        budget = status.budget
+        over += status.level == "exceeded"
+        print(f"{budget.category:<24} {budget.period:<6} {format_money(status.spent):>13} "
+              f"of {format_money(budget.limit):>13} {status.ratio:>5.0%}  {status.level}")
+    return 1 if over else 0
+
+
+def _every(rule: RecurringRule) -> str:
+    """Schedule of a rule, e.g. monthly or every 2 weeks"""
+    if rule.interval == 1:
+        return rule.frequency
+    unit = {"daily": "days", "weekly": "weeks", "monthly": "months", "yearly": "years"}
+    return f"every {rule.interval} {unit[rule.frequency]}"
+
+
+def cmd_recurring(db: Database, args: argparse.Namespace) -> int:
+    """Add, remove, list or run recurring transactions"""
+    if args.action == "add":
+        if args.description is None or args.category is None or args.amount is None:
+            print("error: add needs a description, category and amount", file=sys.stderr)
+            return 2
+        fields = dict(
+            description=args.description,
+            category=args.category,
+            amount=args.amount,
+            transaction_type=args.transaction_type,
+            start=args.start,
+        )
+        try:
+            if args.rrule:
+                rule = RecurringRule.from_rrule(args.rrule, **fields)
+            else:
+                rule = RecurringRule(frequency=args.frequency, interval=args.interval,
+                                     end=args.end, **fields)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        print(f"rule {db.add_recurring_rule(rule)}: {rule.description}, {_every(rule)} "
+              f"from {rule.start}")
+        return 0
+    if args.action == "remove":
+        if args.description is None or not args.description.isdigit():
+            print("error: remove needs the id of a rule", file=sys.stderr)
+            return 2
+        if not db.delete_recurring_rule(int(args.description)):
+            print(f"error: no rule {args.description}", file=sys.stderr)
+            return 1
+        return 0
+    if args.action == "run":
+        print(f"{db.materialize_recurring(args.until)} transactions created")
+        return 0
+
+    for rule in db.get_recurring_rules():
+        sign = "+" if rule.transaction_type == "income" else "-"
+        print(f"{rule.id:>5} {rule.description:<24} {rule.category:<16} "
+              f"{sign}{format_money(rule.amount):>12} {_every(rule):<15} "
+              f"next {rule.next_date or 'ended'}")
+    return 0
+
+
+def _print_transfer(action: str, result: TransferResult):
+    """Report the size and throughput of a backup or restore"""
+    print(f"{action} snapshot {result.snapshot.id}: {result.bytes / 1e6:.1f} MB, "
+          f"{result.stored_bytes / 1e6:.1f} MB written in {result.seconds:.2f}s "
+          f"({result.mb_per_sec:.1f} MB/s)")
+
+
+def cmd_backup(db: Database, args: argparse.Namespace) -> int:
+    """Take, list, verify or restore snapshots of the database"""
+    try:
+        store = BackupStore(args.root, args.compression)
+    except ImportError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.action == "create":
+        result = store.backup(db)
+        _print_transfer("saved", result)
+        print(f"{result.snapshot.new_pages} of {result.snapshot.page_count} pages were new")
+        return 0
+    if args.action == "list":
+        for snapshot in store.snapshots():
+            print(f"{snapshot.id:>6} {snapshot.created.replace('T', ' ')} "
+                  f"{snapshot.size / 1e6:>9.1f} MB {snapshot.new_pages:>8} new pages "
+                  f"{snapshot.pack_bytes / 1e6:>8.1f} MB {snapshot.compression}")
+        return 0
+
+    try:
+        snapshot = store.snapshot(args.snapshot, args.at)
+    except KeyError:
+        print("error: no matching snapshot", file=sys.stderr)
+        return 1
+    try:
+        if args.action == "verify":
+            store.verify(snapshot)
+            print(f"snapshot {snapshot.id} is intact")
+        elif args.to is not None:
+            _print_transfer("restored", store.restore_file(args.to, snapshot))
+        else:
+            _print_transfer("restored", store.restore(db, snapshot))
+    except ChecksumError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_chart(db: Database, args: argparse.Namespace) -> int:
+    """Render one chart to an image file"""
+    from . import reports
+
+    if args.kind == "bar":
+        reports.render_bar(db.get_summary(), args.output)
+    elif args.kind == "pie":
+        name = "Expenses" if args.transaction_type == "expense" else "Incomes"
+        reports.render_pie(db.get_category_totals(args.transaction_type), args.output,
+                           f"{name} by Category")
+    else:
+        reports.render_trend(db.get_trends(args.period), args.output,
+                             f"{TREND_TITLES[args.period]} Trends")
+    print(args.output)
+    return 0
+
+
+def cmd_reports(db: Database, args: argparse.Namespace) -> int:
+    """Write one report per month, rendered by a process pool"""
+    from . import reports
+
+    trends = db.get_trends("month")
+    months = [
+        month for month in trends.starts()
+        if (args.since is None or month >= args.since.date())
+        and (args.until is None or month < args.until.date())
+    ]
+    paths = reports.write_month_reports(trends, args.output, months, args.format, args.workers)
+    for path in paths:
+        print(path)
+    return 0
+
+
+def cmd_rollups(db: Database, args: argparse.Namespace) -> int:
+    """Check or rebuild the trigger-maintained summary tables"""
+    drifts = db.rebuild_rollups() if args.action == "rebuild" else db.verify_rollups()
+    for drift in drifts:
+        print(f"{drift.table} {drift.key}: stored {drift.stored}, actual {drift.actual}")
+    if args.action == "rebuild":
+        print(f"rebuilt rollups, {len(drifts)} rows were out of date")
+        return 0
+    print("rollups are consistent" if not drifts else f"{len(drifts)} rows out of date")
+    return 1 if drifts else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Parser of every subcommand"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Headless access to the expense tracker database"
+    )
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"database file (default {DEFAULT_DB})")
+    parser.add_argument("--trace", type=Path,
+                        help="write a Chrome trace of the queries run to this file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="import CSV or OFX statements")
+    importer.add_argument("files", nargs="+", type=Path)
+    importer.add_argument("--batch-size", type=int, default=5000)
+    importer.add_argument("--keep-duplicates", action="store_true",
+                          help="insert rows already in the database again")
+    importer.add_argument("--date-format", help="strptime format of the date column")
+    importer.add_argument("--decimal", choices=[".", ","],
+                          help="decimal mark of CSV amounts (default: recognized per amount)")
+    importer.add_argument("--quiet", action="store_true", help="no progress output")
+    importer.set_defaults(handler=cmd_import)
+
+    exporter = commands.add_parser("export", help="write transactions as CSV, JSONL or Parquet")
+    exporter.add_argument("-o", "--output", type=Path, help="file to write (default stdout)")
+    exporter.add_argument("--format", choices=sorted(WRITERS),
+                          help="default: from the output suffix, else csv")
+    exporter.add_argument("--chunk-size", type=int, default=10000)
+    exporter.add_argument("--quiet", action="store_true", help="no progress output")
+    _add_filter_arguments(exporter)
+    exporter.set_defaults(handler=cmd_export)
+
+    summary = commands.add_parser("summary", help="print balance and totals")
+    summary.add_argument("--period", choices=["day", "week", "month", "year"])
+    summary.add_argument("--json", action="store_true", help="machine-readable output in cents")
+    summary.set_defaults(handler=cmd_summary)
+
+    chart = commands.add_parser("chart", help="render a chart to PNG, SVG or PDF")
+    chart.add_argument("kind", choices=["bar", "pie", "trend"])
+    chart.add_argument("-o", "--output", type=Path, required=True,
+                       help="image file; the format follows the suffix")
+    chart.add_argument("--type", dest="transaction_type", choices=["income", "expense"],
+                       default="expense", help="transactions of the pie chart")
+    chart.add_argument("--period", choices=["day", "week", "month", "year"], default="month",
+                       help="buckets of the trend chart")
+    chart.set_defaults(handler=cmd_chart)
+
+    report = commands.add_parser("reports", help="write a JSON and chart report per month")
+    report.add_argument("-o", "--output", type=Path, required=True, help="output directory")
+    report.add_argument("--since", type=_month, help="first month (YYYY-MM)")
+    report.add_argument("--until", type=_month, help="first month excluded (YYYY-MM)")
+    report.add_argument("--format", choices=["png", "svg", "pdf"], default="png")
+    report.add_argument("--workers", type=int, help="rendering processes (default: CPU count)")
+    report.set_defaults(handler=cmd_reports)
+
+    ledger = commands.add_parser("ledger", help="per-account, per-year partitions")
+    ledger.add_argument("action", choices=["list", "summary", "split", "archive", "unarchive"],
+                        help="split copies --db into the partitions of --account")
+    ledger.add_argument("--root", default=DEFAULT_LEDGER,
+                        help=f"partition directory (default {DEFAULT_LEDGER})")
+    ledger.add_argument("--account", dest="accounts", action="append",
+                        help="limit to an account; repeatable")
+    ledger.add_argument("--year", dest="years", type=int, action="append",
+                        help="limit to a year; repeatable")
+    ledger.set_defaults(handler=cmd_ledger)
+
+    budgets = commands.add_parser("budgets", help="spending limits per category")
+    budgets.add_argument("action", choices=["list", "set", "remove"],
+                         help="list exits with 1 if a budget is exceeded")
+    budgets.add_argument("category", nargs="?")
+    budgets.add_argument("amount", nargs="?", type=to_cents, help="limit in currency units")
+    budgets.add_argument("--period", choices=BUDGET_PERIODS, default="month")
+    budgets.add_argument("--warn-at", type=float, default=0.8,
+                         help="fraction of the limit raising a warning (default 0.8)")
+    budgets.add_argument("--date", type=date.fromisoformat,
+                         help="list the periods containing this day (default today)")
+    budgets.set_defaults(handler=cmd_budgets)
+
+    recurring = commands.add_parser("recurring", help="transactions repeated on a schedule")
+    recurring.add_argument("action", choices=["list", "add", "remove", "run"],
+                           help="run creates every occurrence due by --until; "
+                                "it never creates one twice")
+    recurring.add_argument("description", nargs="?", help="of a new rule, or the id to remove")
+    recurring.add_argument("category", nargs="?")
+    recurring.add_argument("amount", nargs="?", type=to_cents, help="in currency units")
+    recurring.add_argument("--type", dest="transaction_type", choices=["income", "expense"],
+                           default="expense")
+    recurring.add_argument("--frequency", choices=FREQUENCIES, default="monthly")
+    recurring.add_argument("--interval", type=int, default=1,
+                           help="repeat every N days, weeks, months or years")
+    recurring.add_argument("--start", type=date.fromisoformat, help="first occurrence (default today)")
+    recurring.add_argument("--end", type=date.fromisoformat, help="last day of the rule")
+    recurring.add_argument("--rrule", help="schedule as an RRULE, e.g. FREQ=WEEKLY;INTERVAL=2")
+    recurring.add_argument("--until", type=date.fromisoformat,
+                           help="run: create occurrences up to this day (default today)")
+    recurring.set_defaults(handler=cmd_recurring)
+
+    backup = commands.add_parser("backup", help="incremental compressed snapshots")
+    backup.add_argument("action", choices=["create", "list", "verify", "restore"],
+                        help="restore replaces the contents of --db unless --to is given")
+    backup.add_argument("--root", default=DEFAULT_BACKUPS,
+                        help=f"snapshot directory (default {DEFAULT_BACKUPS})")
+    backup.add_argument("--compression", choices=["gzip", "zstd"],
+                        help="of new snapshots (default zstd if installed, else gzip)")
+    backup.add_argument("--snapshot", type=int, help="snapshot id (default the latest)")
+    backup.add_argument("--at", type=datetime.fromisoformat,
+                        help="use the last snapshot taken at or before this time (ISO)")
+    backup.add_argument("--to", type=Path, help="restore into this new file instead")
+    backup.set_defaults(handler=cmd_backup)
+
+    rollups = commands.add_parser("rollups", help="verify or rebuild the summary tables")
+    rollups.add_argument("action", choices=["verify", "rebuild"])
+    rollups.set_defaults(handler=cmd_rollups)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run one subcommand and return its exit status"""
+    args = build_parser().parse_args(argv)
+    trace_path = args.trace or enable_from_environment()
+    if trace_path is not None:
+        profiler.enable()
+        profiler.begin_refresh(args.command)
+    try:
+        with Database(args.db) as db:
+            try:
+                return args.handler(db, args)
+            except BrokenPipeError:
+                # Output piped into e.g. head; silence the flush at exit
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, sys.stdout.fileno())
+                return 1
+    finally:
+        if trace_path is not None:
+            profiler.export_chrome_trace(trace_path)
@@ -0,0 +1,141 @@
+"""Charts and monthly reports rendered without a display
+
+Figures are drawn with matplotlib's Agg canvas directly, so neither
+pyplot nor a GUI toolkit is imported.
+"""
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from src.models import Summary, Trends
+from src.utils.money import format_money
+
+COLORS = {"expense": "#dc3545", "income": "#28a745", "net": "#007bff"}
+
+# Month data sent to report workers: type -> category -> cents
+MonthTotals = Dict[str, Dict[str, int]]
+
+
+def _figure(figsize=(6, 4)):
+    """New figure attached to an Agg canvas"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=figsize, dpi=100)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _draw_bar(ax, expenses: int, incomes: int, title: str):
+    """Draw the expenses vs incomes bars on ax"""
+    values = [expenses, incomes]
+    bars = ax.bar(["Expenses", "Incomes"], [v / 100 for v in values],
+                  color=[COLORS["expense"], COLORS["income"]], alpha=0.7, edgecolor="black")
+    for bar, value in zip(bars, values):
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), format_money(value),
+                ha="center", va="bottom")
+    ax.set_ylabel("Amount (€)", fontsize=10)
+    ax.set_title(title, fontsize=12, fontweight="bold")
+
+
+def _draw_pie(ax, categories: Dict[str, int], title: str):
+    """Draw a category breakdown on ax, or a placeholder when empty"""
+    ax.set_title(title, fontsize=12, fontweight="bold")
+    if not categories:
+        ax.text(0.5, 0.5, "No data", ha="center", va="center", transform=ax.transAxes)
+        ax.set_axis_off()
+        return
+    ax.pie(list(categories.values()), labels=list(categories), autopct="%1.1f%%", startangle=90)
+
+
+def render_bar(summary: Summary, path: Path, title: str = "Expenses vs Incomes"):
+    """Save the expenses vs incomes bar chart; the format follows the suffix"""
+    figure = _figure()
+    _draw_bar(figure.add_subplot(111), summary.total_expenses, summary.total_incomes, title)
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def render_pie(categories: Dict[str, int], path: Path, title: str = "Breakdown"):
+    """Save a category breakdown pie chart"""
+    figure = _figure((5, 4))
+    _draw_pie(figure.add_subplot(111), categories, title)
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def render_trend(trends: Trends, path: Path, title: str = "Trends", window: int = 3):
+    """Save incomes, expenses and the rolling net per bucket as lines"""
+    figure = _figure((8, 4))
+    ax = figure.add_subplot(111)
+    starts = trends.starts()
+    ax.plot(starts, [v / 100 for v in trends.series("income")],
+            color=COLORS["income"], marker="o", label="Incomes")
+    ax.plot(starts, [v / 100 for v in trends.series("expense")],
+            color=COLORS["expense"], marker="o", label="Expenses")
+    ax.plot(starts, [v / 100 for v in trends.rolling_average(window=window)],
+            color=COLORS["net"], linestyle="--", label=f"Net ({window}-period average)")
+    ax.axhline(0, color="gray", linewidth=0.5)
+    ax.set_ylabel("Amount (€)", fontsize=10)
+    ax.set_title(title, fontsize=12, fontweight="bold")
+    ax.legend(loc="upper left", fontsize=8)
+    figure.autofmt_xdate()
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def month_report(month: date, totals: MonthTotals) -> dict:
+    """JSON-serializable summary of one month; amounts are cents"""
+    expenses = sum(totals.get("expense", {}).values())
+    incomes = sum(totals.get("income", {}).values())
+    return {
+        "month": month.strftime("%Y-%m"),
+        "expenses": expenses,
+        "incomes": incomes,
+        "balance": incomes - expenses,
+        "categories": totals,
+    }
+
+
+def write_month_report(month: date, totals: MonthTotals, out_dir: Path,
+                       image_format: str = "png") -> List[Path]:
+    """Write the JSON summary and the chart page of one month"""
+    report = month_report(month, totals)
+    stem = out_dir / f"report-{report['month']}"
+    json_path = stem.with_suffix(".json")
+    json_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    figure = _figure((15, 4))
+    _draw_bar(figure.add_subplot(131), report["expenses"], report["incomes"],
+              f"{report['month']} balance {format_money(report['balance'])}")
+    _draw_pie(figure.add_subplot(132), totals.get("expense", {}), "Expenses")
+    _draw_pie(figure.add_subplot(133), totals.get("income", {}), "Incomes")
+    figure.tight_layout()
+    image_path = stem.with_suffix(f".{image_format}")
+    figure.savefig(image_path)
+    return [json_path, image_path]
+
+
+def _write_job(job: tuple) -> List[Path]:
+    """Process pool entry point for write_month_report"""
+    return write_month_report(*job)
+
+
+def write_month_reports(trends: Trends, out_dir: Path, months: Optional[Iterable[date]] = None,
+                        image_format: str = "png", workers: Optional[int] = None) -> List[Path]:
+    """Write a report for every month of trends, rendering in parallel
+
+    Only the per-month totals are sent to the worker processes, which
+    need no database access. workers=1 renders in this process.
+    """
+    if trends.period != "month":
+        raise ValueError("monthly reports need month trends")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    selected = trends.starts() if months is None else list(months)
+    jobs = [(month, trends.buckets.get(month, {}), out_dir, image_format) for month in selected]
+    if workers == 1 or len(jobs) < 2:
+        results = map(_write_job, jobs)
+        return [path for paths in results for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [path for paths in executor.map(_write_job, jobs) for path in paths]
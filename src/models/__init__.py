@@ -1,5 +1,19 @@
 """Data models for the expense tracker"""
+from .analytics import Trends
+from .backup import BackupStore, ChecksumError, Snapshot, TransferResult
+from .budgets import Budget, BudgetAlert, BudgetEvaluator, BudgetStatus
+from .cache import CacheStats
 from .database import Database
+from .events import ChangeEvent
+from .export import ExportResult, export_transactions
+from .importer import ImportResult, StatementImporter
+from .ledger import Ledger, Partition
+from .query import Page, TransactionFilter
+from .recurring import RecurringRule
+from .summary import Summary
 from .transaction import Transaction
+from .writer import WriteQueue, WriterStats
 
-__all__ = ["Database", "Transaction"]
+__all__ = ["BackupStore", "Budget", "BudgetAlert", "BudgetEvaluator", "BudgetStatus", "CacheStats", "ChangeEvent", "ChecksumError", "Database", "ExportResult", "ImportResult", "Ledger",
+           "Page", "Partition", "RecurringRule", "Snapshot", "StatementImporter", "Summary", "Transaction", "TransactionFilter", "TransferResult", "Trends",
+           "WriteQueue", "WriterStats", "export_transactions"]
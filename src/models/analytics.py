@@ -0,0 +1,173 @@
+"""Time-bucketed income, expense and net series"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List, Optional
+from .events import ChangeEvent
+from .transaction import Transaction
+
+TREND_PERIODS = ("day", "week", "month", "year")
+
+
+def bucket_start(day: date, period: str) -> date:
+    """First day of the bucket containing day; weeks start on Monday"""
+    if isinstance(day, datetime):
+        day = day.date()
+    if period == "day":
+        return day
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    if period == "year":
+        return day.replace(month=1, day=1)
+    raise ValueError(f"Unknown period: {period}")
+
+
+def next_bucket(start: date, period: str) -> date:
+    """First day of the bucket following the one starting at start"""
+    if period == "day":
+        return start + timedelta(days=1)
+    if period == "week":
+        return start + timedelta(days=7)
+    if period == "month":
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    if period == "year":
+        return start.replace(year=start.year + 1)
+    raise ValueError(f"Unknown period: {period}")
+
+
+def rolling_mean(values: List[int], window: int) -> List[float]:
+    """Mean of each value and the window - 1 values before it
+
+    The first values average over the shorter history available.
+    """
+    if window < 1:
+        raise ValueError("window must be positive")
+    means = []
+    running = 0
+    for index, value in enumerate(values):
+        running += value
+        if index >= window:
+            running -= values[index - window]
+        means.append(running / min(index + 1, window))
+    return means
+
+
+@dataclass
+class Trends:
+    """Totals in cents per time bucket, transaction type and category
+
+    Buckets are keyed by their first day. Derived series (net, running
+    balance, rolling averages, deltas) are computed from the buckets on
+    request and cover every bucket between the first and the last, so
+    empty buckets count as zero.
+    """
+    period: str = "month"
+    buckets: Dict[date, Dict[str, Dict[str, int]]] = field(default_factory=dict)
+
+    def add(self, start: date, transaction_type: str, category: str, amount: int):
+        """Add cents to one bucket, dropping entries that reach zero"""
+        types = self.buckets.setdefault(start, {})
+        categories = types.setdefault(transaction_type, {})
+        total = categories.get(category, 0) + amount
+        if total:
+            categories[category] = total
+        else:
+            categories.pop(category, None)
+            if not categories:
+                del types[transaction_type]
+            if not types:
+                del self.buckets[start]
+
+    def starts(self) -> List[date]:
+        """First day of every bucket from the earliest to the latest"""
+        if not self.buckets:
+            return []
+        start, last = min(self.buckets), max(self.buckets)
+        starts = []
+        while start <= last:
+            starts.append(start)
+            start = next_bucket(start, self.period)
+        return starts
+
+    def series(self, transaction_type: str) -> List[int]:
+        """Total of one transaction type per bucket"""
+        return [
+            sum(self.buckets.get(start, {}).get(transaction_type, {}).values())
+            for start in self.starts()
+        ]
+
+    def net(self) -> List[int]:
+        """Incomes minus expenses per bucket"""
+        return [
+            income - expense
+            for income, expense in zip(self.series("income"), self.series("expense"))
+        ]
+
+    def running_balance(self) -> List[int]:
+        """Balance at the end of every bucket"""
+        return list(accumulate(self.net()))
+
+    def rolling_average(self, transaction_type: Optional[str] = None,
+                        window: int = 3) -> List[float]:
+        """Rolling mean of one type, or of the net when no type is given"""
+        values = self.net() if transaction_type is None else self.series(transaction_type)
+        return rolling_mean(values, window)
+
+    def category_deltas(self, transaction_type: str) -> Dict[str, List[Optional[int]]]:
+        """Change of every category's total from the previous bucket
+
+        The first bucket has no previous value, so its delta is None.
+        """
+        starts = self.starts()
+        names = sorted({
+            category
+            for types in self.buckets.values()
+            for category in types.get(transaction_type, {})
+        })
+        deltas = {}
+        for category in names:
+            totals = [
+                self.buckets.get(start, {}).get(transaction_type, {}).get(category, 0)
+                for start in starts
+            ]
+            deltas[category] = [None] + [
+                current - previous for previous, current in zip(totals, totals[1:])
+            ]
+        return deltas
+
+    def merge(self, other: "Trends") -> "Trends":
+        """Add the buckets of trends over the same period and return self"""
+        if other.period != self.period:
+            raise ValueError(f"Cannot merge {other.period} trends into {self.period} trends")
+        for start, types in other.buckets.items():
+            for transaction_type, categories in types.items():
+                for category, amount in categories.items():
+                    self.add(start, transaction_type, category, amount)
+        return self
+
+    def _add(self, transaction: Transaction, sign: int):
+        """Add (sign=1) or remove (sign=-1) one transaction from its bucket"""
+        self.add(
+            bucket_start(transaction.date, self.period),
+            transaction.transaction_type,
+            transaction.category,
+            sign * transaction.amount
+        )
+
+    def apply(self, event: ChangeEvent) -> bool:
+        """Update buckets in place from a change event
+
+        Returns False for reset events, which need fresh trends.
+        """
+        if event.kind == "reset":
+            return False
+        for transaction in event.previous:
+            self._add(transaction, -1)
+        sign = -1 if event.kind == "delete" else 1
+        for transaction in event.transactions:
+            self._add(transaction, sign)
+        return True
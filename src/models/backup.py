@@ -0,0 +1,412 @@
+"""Incremental, compressed and checksummed snapshots of a database
+
+A snapshot starts as an online copy made with the SQLite backup API,
+which is then split into pages. Only pages that no earlier snapshot
+holds are compressed and appended to the snapshot's pack file; its page
+map lists, for every page, its hash and the pack and offset holding it.
+The JSON manifest is written last, so a snapshot exists once complete:
+
+    snapshot-000007.json  page size and count, SHA-256 of the database
+    snapshot-000007.map   page hash, pack id, offset, length per page
+    snapshot-000007.pack  compressed pages new in this snapshot
+
+Restoring rebuilds the database of any snapshot page by page, checking
+every page hash and the SHA-256 of the whole file.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import struct
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+from .database import Database
+
+SNAPSHOT_FILE = re.compile(r"snapshot-(\d{6})\.json$")
+# Page hash, id of the snapshot whose pack holds the page, offset, length
+_ENTRY = struct.Struct("<16sIQI")
+# Pages hashed and compressed between two progress reports
+PROGRESS_PAGES = 1024
+
+Progress = Callable[[int, int], None]
+
+
+class ChecksumError(ValueError):
+    """Backup data does not match the checksum recorded for it"""
+
+
+class GzipCodec:
+    """gzip frames from the standard library
+
+    The default level 1 compresses about twice as fast as level 6 for
+    output under a tenth larger.
+    """
+
+    name = "gzip"
+
+    @staticmethod
+    def check():
+        """Always available"""
+
+    def __init__(self, level: int = 1):
+        """Use a zlib compression level from 1 to 9"""
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        """One gzip frame holding data"""
+        return zlib.compress(data, self.level, wbits=31)
+
+    def decompress(self, data: bytes) -> bytes:
+        """Contents of one gzip frame"""
+        return zlib.decompress(data, wbits=31)
+
+
+class ZstdCodec:
+    """Zstandard frames; needs the zstandard package"""
+
+    name = "zstd"
+
+    @staticmethod
+    def check():
+        """Raise ImportError if zstandard is not installed"""
+        try:
+            import zstandard  # noqa: F401
+        except ImportError as e:
+            raise ImportError("zstd compression needs zstandard (pip install zstandard)") from e
+
+    def __init__(self, level: int = 3):
+        """Use a zstd compression level from 1 to 22"""
+        self.check()
+        import zstandard
+
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        """One zstd frame holding data"""
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        """Contents of one zstd frame"""
+        return self._decompressor.decompress(data)
+
+
+CODECS = {"gzip": GzipCodec, "zstd": ZstdCodec}
+
+
+def default_compression() -> str:
+    """zstd when zstandard is installed, else gzip"""
+    try:
+        ZstdCodec.check()
+    except ImportError:
+        return "gzip"
+    return "zstd"
+
+
+def _page_hash(page: bytes) -> bytes:
+    """16-byte BLAKE2b digest identifying a page"""
+    return hashlib.blake2b(page, digest_size=16).digest()
+
+
+def _file_sha256(path: Path) -> str:
+    """SHA-256 of a file read in 1 MiB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _remove_database(path: Path):
+    """Delete a database file with its WAL and shared-memory files"""
+    for suffix in ("", "-wal", "-shm"):
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Replace path with data, never leaving a partial file behind"""
+    partial = path.with_name(path.name + ".partial")
+    with open(partial, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Manifest of one stored snapshot"""
+    id: int
+    created: str
+    page_size: int
+    page_count: int
+    sha256: str
+    compression: str
+    new_pages: int
+    pack_bytes: int
+    pack_sha256: Optional[str]
+    map_sha256: str
+
+    @property
+    def size(self) -> int:
+        """Size in bytes of the database it restores"""
+        return self.page_size * self.page_count
+
+    @property
+    def created_at(self) -> datetime:
+        """When the snapshot was taken"""
+        return datetime.fromisoformat(self.created)
+
+
+@dataclass
+class TransferResult:
+    """Outcome of a backup or restore"""
+    snapshot: Snapshot
+    bytes: int
+    stored_bytes: int
+    seconds: float
+
+    @property
+    def mb_per_sec(self) -> float:
+        """Database megabytes processed per second"""
+        return self.bytes / 1e6 / self.seconds if self.seconds > 0 else 0.0
+
+
+class BackupStore:
+    """Directory of incremental database snapshots
+
+    Packs are shared by later snapshots, so snapshot files must not be
+    deleted individually. backup() and restore() may take seconds on
+    large databases; the app runs them on its DatabaseExecutor.
+    """
+
+    def __init__(self, root: str = "data/backups", compression: Optional[str] = None,
+                 level: Optional[int] = None):
+        """Use root for snapshots, compressing new ones with compression
+
+        compression is gzip or zstd, by default zstd when available.
+        Existing snapshots are read with the codec they were written with.
+        """
+        self.root = Path(root)
+        self.compression = compression or default_compression()
+        if self.compression not in CODECS:
+            raise ValueError(f"Unknown compression: {self.compression}")
+        CODECS[self.compression].check()
+        self.level = level
+
+    def _path(self, snapshot_id: int, suffix: str) -> Path:
+        """File of a snapshot"""
+        return self.root / f"snapshot-{snapshot_id:06d}.{suffix}"
+
+    def _codec(self, name: str):
+        """Codec instance by name, at the configured level for new snapshots"""
+        if name == self.compression and self.level is not None:
+            return CODECS[name](self.level)
+        return CODECS[name]()
+
+    def snapshots(self) -> List[Snapshot]:
+        """Every complete snapshot, oldest first"""
+        if not self.root.is_dir():
+            return []
+        snapshots = [
+            Snapshot(**json.loads(path.read_text()))
+            for path in self.root.iterdir() if SNAPSHOT_FILE.match(path.name)
+        ]
+        return sorted(snapshots, key=lambda snapshot: snapshot.id)
+
+    def snapshot(self, snapshot_id: Optional[int] = None,
+                 at: Optional[datetime] = None) -> Snapshot:
+        """A snapshot by id, the last one taken at or before at, or the latest
+
+        Raises KeyError if there is no such snapshot.
+        """
+        snapshots = self.snapshots()
+        if snapshot_id is not None:
+            snapshots = [s for s in snapshots if s.id == snapshot_id]
+        if at is not None:
+            snapshots = [s for s in snapshots if s.created_at <= at]
+        if not snapshots:
+            raise KeyError("No matching snapshot")
+        return snapshots[-1]
+
+    def _read_map(self, snapshot: Snapshot) -> List[Tuple[bytes, int, int, int]]:
+        """Page entries of a snapshot, checked against the manifest"""
+        data = self._path(snapshot.id, "map").read_bytes()
+        if hashlib.sha256(data).hexdigest() != snapshot.map_sha256:
+            raise ChecksumError(f"Page map of snapshot {snapshot.id} is corrupt")
+        return list(_ENTRY.iter_unpack(zlib.decompress(data)))
+
+    def backup(self, db: Database, progress: Optional[Progress] = None) -> TransferResult:
+        """Take a snapshot of db, storing only pages no earlier snapshot has
+
+        progress is called with the pages processed and the page count.
+        """
+        start = time.perf_counter()
+        self.root.mkdir(parents=True, exist_ok=True)
+        snapshots = self.snapshots()
+        previous = snapshots[-1] if snapshots else None
+        snapshot_id = previous.id + 1 if previous else 1
+        copy = self._path(snapshot_id, "db.partial")
+        _remove_database(copy)
+        db.copy_to(str(copy))
+        try:
+            return self._store(snapshot_id, copy, previous, start, progress)
+        finally:
+            _remove_database(copy)
+
+    def _store(self, snapshot_id: int, copy: Path, previous: Optional[Snapshot],
+               start: float, progress: Optional[Progress]) -> TransferResult:
+        """Split a database copy into pages and write the snapshot files"""
+        codec = self._codec(self.compression)
+        old_entries = self._read_map(previous) if previous else []
+        # Any page already stored, e.g. moved by VACUUM, is referenced again
+        known = {entry[0]: entry for entry in old_entries}
+        entries = []
+        whole = hashlib.sha256()
+        pack_path = self._path(snapshot_id, "pack")
+        offset = 0
+        with open(copy, "rb") as source, open(pack_path, "wb") as pack:
+            header = source.read(100)
+            page_size = struct.unpack(">H", header[16:18])[0]
+            page_size = 65536 if page_size == 1 else page_size
+            page_count = copy.stat().st_size // page_size
+            source.seek(0)
+            for number in range(page_count):
+                page = source.read(page_size)
+                whole.update(page)
+                digest = _page_hash(page)
+                if number < len(old_entries) and old_entries[number][0] == digest:
+                    entry = old_entries[number]
+                elif digest in known:
+                    entry = known[digest]
+                else:
+                    frame = codec.compress(page)
+                    pack.write(frame)
+                    entry = (digest, snapshot_id, offset, len(frame))
+                    known[digest] = entry
+                    offset += len(frame)
+                entries.append(entry)
+                if progress is not None and (number + 1) % PROGRESS_PAGES == 0:
+                    progress(number + 1, page_count)
+            pack.flush()
+            os.fsync(pack.fileno())
+        new_pages = sum(1 for entry in entries if entry[1] == snapshot_id)
+        if offset == 0:
+            pack_path.unlink()
+        page_map = zlib.compress(b"".join(_ENTRY.pack(*entry) for entry in entries))
+        _write_atomic(self._path(snapshot_id, "map"), page_map)
+        snapshot = Snapshot(
+            id=snapshot_id,
+            created=datetime.now().isoformat(timespec="seconds"),
+            page_size=page_size,
+            page_count=page_count,
+            sha256=whole.hexdigest(),
+            compression=codec.name,
+            new_pages=new_pages,
+            pack_bytes=offset,
+            pack_sha256=_file_sha256(pack_path) if offset else None,
+            map_sha256=hashlib.sha256(page_map).hexdigest(),
+        )
+        _write_atomic(self._path(snapshot_id, "json"), json.dumps(asdict(snapshot), indent=2).encode())
+        if progress is not None:
+            progress(page_count, page_count)
+        return TransferResult(snapshot, snapshot.size, offset + len(page_map),
+                              time.perf_counter() - start)
+
+    def _rebuild(self, snapshot: Snapshot, path: Path, progress: Optional[Progress] = None):
+        """Write the database of a snapshot to path, checking every page"""
+        entries = self._read_map(snapshot)
+        manifests = {s.id: s for s in self.snapshots()}
+        packs: Dict[int, BinaryIO] = {}
+        codecs = {}
+        whole = hashlib.sha256()
+        try:
+            with open(path, "wb") as target:
+                for number, (digest, pack_id, offset, length) in enumerate(entries):
+                    if pack_id not in packs:
+                        packs[pack_id] = open(self._path(pack_id, "pack"), "rb")
+                        codecs[pack_id] = self._codec(manifests[pack_id].compression)
+                    pack = packs[pack_id]
+                    pack.seek(offset)
+                    try:
+                        page = codecs[pack_id].decompress(pack.read(length))
+                    except Exception:
+                        page = None
+                    if page is None or _page_hash(page) != digest:
+                        raise ChecksumError(
+                            f"Page {number + 1} of snapshot {snapshot.id} is corrupt "
+                            f"in snapshot-{pack_id:06d}.pack"
+                        )
+                    whole.update(page)
+                    target.write(page)
+                    if progress is not None and (number + 1) % PROGRESS_PAGES == 0:
+                        progress(number + 1, len(entries))
+                target.flush()
+                os.fsync(target.fileno())
+        finally:
+            for pack in packs.values():
+                pack.close()
+        if whole.hexdigest() != snapshot.sha256:
+            raise ChecksumError(f"Snapshot {snapshot.id} does not match its SHA-256")
+
+    def restore_file(self, path: str, snapshot: Optional[Snapshot] = None,
+                     progress: Optional[Progress] = None) -> TransferResult:
+        """Write the database of a snapshot (default the latest) to a new file"""
+        start = time.perf_counter()
+        snapshot = snapshot or self.snapshot()
+        path = Path(path)
+        partial = path.with_name(path.name + ".partial")
+        try:
+            self._rebuild(snapshot, partial, progress)
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+        return TransferResult(snapshot, snapshot.size, snapshot.size, time.perf_counter() - start)
+
+    def restore(self, db: Database, snapshot: Optional[Snapshot] = None,
+                progress: Optional[Progress] = None) -> TransferResult:
+        """Replace the contents of an open database with a snapshot (default the latest)
+
+        The snapshot is rebuilt and checked before db is touched, then
+        copied in with Database.restore_from, which sends a reset event.
+        """
+        start = time.perf_counter()
+        snapshot = snapshot or self.snapshot()
+        partial = self._path(snapshot.id, "restore.partial")
+        try:
+            self._rebuild(snapshot, partial, progress)
+            db.restore_from(str(partial))
+        finally:
+            _remove_database(partial)
+        return TransferResult(snapshot, snapshot.size, snapshot.size, time.perf_counter() - start)
+
+    def verify(self, snapshot: Optional[Snapshot] = None) -> Snapshot:
+        """Check a snapshot (default the latest) can be restored intact
+
+        Checks the SHA-256 of every pack it uses, every page hash and the
+        whole database, then runs SQLite's quick_check on the rebuilt
+        file. Raises ChecksumError on the first problem found.
+        """
+        snapshot = snapshot or self.snapshot()
+        manifests = {s.id: s for s in self.snapshots()}
+        for pack_id in sorted({entry[1] for entry in self._read_map(snapshot)}):
+            if _file_sha256(self._path(pack_id, "pack")) != manifests[pack_id].pack_sha256:
+                raise ChecksumError(f"snapshot-{pack_id:06d}.pack is corrupt")
+        partial = self._path(snapshot.id, "verify.partial")
+        try:
+            self._rebuild(snapshot, partial)
+            conn = sqlite3.connect(partial)
+            try:
+                result = conn.execute("PRAGMA quick_check").fetchone()[0]
+            finally:
+                conn.close()
+        finally:
+            _remove_database(partial)
+        if result != "ok":
+            raise ChecksumError(f"Snapshot {snapshot.id} fails quick_check: {result}")
+        return snapshot
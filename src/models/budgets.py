@@ -0,0 +1,285 @@
+"""Spending limits per category and their incremental evaluation"""
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .analytics import bucket_start, next_bucket
+from .events import ChangeEvent
+from .transaction import Transaction
+
+BUDGET_PERIODS = ("week", "month", "year")
+# Alert levels in increasing order of severity
+LEVELS = ("ok", "warning", "exceeded")
+
+
+@dataclass
+class Budget:
+    """Limit in cents on the expenses of one category per period
+
+    A warning is raised once the spend reaches warn_at times the limit,
+    and the budget is exceeded once the spend is above the limit.
+    """
+    category: str
+    limit: int
+    period: str = "month"
+    warn_at: float = 0.8
+    id: int = None
+
+    def __post_init__(self):
+        """Validate period, limit and warning ratio"""
+        if self.period not in BUDGET_PERIODS:
+            raise ValueError(f"Unknown budget period: {self.period}")
+        if self.limit <= 0:
+            raise ValueError("Budget limit must be positive")
+        if not 0 < self.warn_at <= 1:
+            raise ValueError("warn_at must be in (0, 1]")
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        """(category, period), unique among stored budgets"""
+        return self.category, self.period
+
+    def level(self, spent: int) -> str:
+        """Alert level of a spend in cents"""
+        if spent > self.limit:
+            return "exceeded"
+        if spent >= self.warn_at * self.limit:
+            return "warning"
+        return "ok"
+
+
+@dataclass(frozen=True)
+class BudgetStatus:
+    """Spend of a budget in its current period"""
+    budget: Budget
+    spent: int
+    period_start: date
+
+    @property
+    def level(self) -> str:
+        """ok, warning or exceeded"""
+        return self.budget.level(self.spent)
+
+    @property
+    def ratio(self) -> float:
+        """Spend as a fraction of the limit"""
+        return self.spent / self.budget.limit
+
+    @property
+    def remaining(self) -> int:
+        """Cents left before the limit, negative once exceeded"""
+        return self.budget.limit - self.spent
+
+
+@dataclass(frozen=True)
+class BudgetAlert:
+    """A budget whose spend crossed into a more severe level"""
+    status: BudgetStatus
+    previous_level: str
+
+    @property
+    def level(self) -> str:
+        """Level reached, warning or exceeded"""
+        return self.status.level
+
+
+def _rose(previous: str, level: str) -> bool:
+    """Whether level is more severe than previous"""
+    return LEVELS.index(level) > LEVELS.index(previous)
+
+
+BudgetListener = Callable[[BudgetAlert], None]
+# (category, period) -> cents spent in the current bucket of that period
+Spend = Dict[Tuple[str, str], int]
+
+
+class BudgetEvaluator:
+    """Running spend of every budget in its current period
+
+    The spend is seeded once from Database.get_budget_spend, a single
+    aggregate query, and then kept up to date from change events: each
+    transaction costs one dictionary lookup by category plus the few
+    budgets of that category, whatever the number of budgets or rows.
+    Listeners are called with a BudgetAlert whenever a budget moves to a
+    more severe level.
+
+    The current period of each budget is the bucket containing today.
+    Transactions dated outside it, earlier or later, are ignored. Once
+    the calendar enters a later bucket, the next change event or
+    check_period call reloads the spend of the new period from the
+    database, so rows entered ahead of time are counted when it starts.
+    """
+
+    def __init__(self, budgets: Iterable[Budget] = (), today: Optional[date] = None):
+        """Index budgets by category; their spend starts at zero
+
+        today fixes the calendar date, e.g. for replaying past data;
+        by default the evaluator follows the system clock.
+        """
+        self._lock = threading.RLock()
+        self._listeners: List[BudgetListener] = []
+        self._database = None
+        self._today = today
+        self._set_budgets(budgets, today)
+
+    def today(self) -> date:
+        """The calendar date that selects the current periods"""
+        return self._today or date.today()
+
+    def _set_budgets(self, budgets: Iterable[Budget], today: Optional[date]):
+        """Replace the budgets and restart every period at today"""
+        if today is not None:
+            self._today = today
+        today = self.today()
+        self._by_category: Dict[str, List[Budget]] = {}
+        for budget in budgets:
+            self._by_category.setdefault(budget.category, []).append(budget)
+        periods = {b.period for budgets in self._by_category.values() for b in budgets}
+        self._starts: Dict[str, date] = {p: bucket_start(today, p) for p in periods}
+        self._ends = {p: next_bucket(start, p) for p, start in self._starts.items()}
+        self._spent: Spend = {}
+        self._levels: Dict[Tuple[str, str], str] = {}
+
+    @classmethod
+    def load(cls, db, today: Optional[date] = None) -> "BudgetEvaluator":
+        """Evaluator of the budgets stored in db, seeded with their spend"""
+        evaluator = cls()
+        evaluator.reload(db, today)
+        return evaluator
+
+    def reload(self, db, today: Optional[date] = None) -> List[BudgetAlert]:
+        """Read the budgets and their spend again, e.g. after a bulk import
+
+        Alerts for budgets whose level rose are sent to listeners and
+        returned.
+        """
+        budgets = db.get_budgets()
+        with self._lock:
+            previous = dict(self._levels)
+            self._set_budgets(budgets, today)
+            self.seed(db.get_budget_spend(self.period_starts()))
+            alerts = [
+                BudgetAlert(status, previous.get(status.budget.key, "ok"))
+                for status in self._statuses()
+                if _rose(previous.get(status.budget.key, "ok"), status.level)
+            ]
+        self._send(alerts)
+        return alerts
+
+    def seed(self, spend: Spend):
+        """Set the spend of the current periods, e.g. from get_budget_spend"""
+        with self._lock:
+            self._spent = {
+                key: cents for key, cents in spend.items()
+                if key[0] in self._by_category
+            }
+            self._levels = {s.budget.key: s.level for s in self._statuses()}
+
+    def period_starts(self) -> Dict[str, date]:
+        """First day of the current bucket of every period with a budget"""
+        with self._lock:
+            return dict(self._starts)
+
+    def subscribe(self, listener: BudgetListener):
+        """Call listener with every alert
+
+        Listeners run on the thread that applied the change.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: BudgetListener):
+        """Stop sending alerts to a listener"""
+        self._listeners.remove(listener)
+
+    def attach(self, db):
+        """Follow the change events of db, reloading on reset events"""
+        self._database = db
+        db.subscribe(self._on_change)
+
+    def detach(self):
+        """Stop following database changes"""
+        if self._database is not None:
+            self._database.unsubscribe(self._on_change)
+            self._database = None
+
+    def _on_change(self, event: ChangeEvent):
+        """Database listener applying events"""
+        if not self.apply(event):
+            self.reload(self._database)
+
+    def _period_over(self) -> bool:
+        """Whether the calendar has left the current bucket of a period"""
+        today = self.today()
+        return any(today >= end for end in self._ends.values())
+
+    def check_period(self, db=None) -> List[BudgetAlert]:
+        """Reload from db, by default the attached one, if a new period began
+
+        Call it regularly, e.g. from a timer, so the periods move on
+        even when nothing is written. Returns the alerts of the reload.
+        """
+        db = db or self._database
+        with self._lock:
+            over = self._period_over()
+        return self.reload(db) if over and db is not None else []
+
+    def _send(self, alerts: List[BudgetAlert]):
+        """Hand alerts to the listeners"""
+        for alert in alerts:
+            for listener in list(self._listeners):
+                listener(alert)
+
+    def _add(self, transaction: Transaction, sign: int, alerts: List[BudgetAlert]):
+        """Add (sign=1) or remove (sign=-1) one transaction from its budgets"""
+        if transaction.transaction_type != "expense":
+            return
+        budgets = self._by_category.get(transaction.category)
+        if budgets is None:
+            return
+        day = transaction.date.date()
+        for budget in budgets:
+            start = self._starts[budget.period]
+            if not start <= day < self._ends[budget.period]:
+                continue
+            key = budget.key
+            spent = self._spent.get(key, 0) + sign * transaction.amount
+            self._spent[key] = spent
+            level = budget.level(spent)
+            previous = self._levels.get(key, "ok")
+            self._levels[key] = level
+            if _rose(previous, level):
+                alerts.append(BudgetAlert(BudgetStatus(budget, spent, start), previous))
+
+    def apply(self, event: ChangeEvent) -> bool:
+        """Update the spend in place from a change event and send alerts
+
+        Returns False for reset events and once the calendar entered a
+        new period; both need a reload.
+        """
+        if event.kind == "reset":
+            return False
+        alerts: List[BudgetAlert] = []
+        with self._lock:
+            if self._period_over():
+                return False
+            for transaction in event.previous:
+                self._add(transaction, -1, alerts)
+            sign = -1 if event.kind == "delete" else 1
+            for transaction in event.transactions:
+                self._add(transaction, sign, alerts)
+        self._send(alerts)
+        return True
+
+    def _statuses(self) -> List[BudgetStatus]:
+        """Status of every budget; the lock must be held"""
+        return [
+            BudgetStatus(budget, self._spent.get(budget.key, 0), self._starts[budget.period])
+            for budgets in self._by_category.values()
+            for budget in budgets
+        ]
+
+    def statuses(self) -> List[BudgetStatus]:
+        """Status of every budget, most used first"""
+        with self._lock:
+            return sorted(self._statuses(), key=lambda status: -status.ratio)
+
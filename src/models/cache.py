@@ -0,0 +1,137 @@
+"""Memoization of read queries invalidated by data version"""
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass, fields, is_dataclass
+from functools import wraps
+from typing import Any, Callable, Hashable, Tuple
+from src.utils.profiling import profiler
+
+
+@dataclass
+class CacheStats:
+    """Counters of a QueryCache"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    size: int = 0
+    maxsize: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def make_key(name: str, args: tuple, kwargs: dict) -> Hashable:
+    """Hashable key for a call; dataclass arguments are keyed by their fields"""
+    return (name, _freeze(args), _freeze(kwargs))
+
+
+def _freeze(value: Any) -> Hashable:
+    """Convert lists, dicts and dataclasses into hashable tuples"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return (type(value).__name__,) + tuple(
+            _freeze(getattr(value, f.name)) for f in fields(value)
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+class QueryCache:
+    """Thread-safe LRU cache of query results for one data version
+
+    Every lookup passes the current data version. When it differs from
+    the version the entries were computed for, all entries are dropped,
+    and results computed for an older version are never stored.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """Initialize an empty cache holding at most maxsize results"""
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._version: Any = None
+        self._lock = threading.Lock()
+        self._stats = CacheStats(maxsize=maxsize)
+
+    def _sync(self, version: Any):
+        """Drop every entry if the data version changed; lock must be held"""
+        if version != self._version:
+            if self._entries:
+                self._stats.invalidations += 1
+                self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: Any) -> Tuple[bool, Any]:
+        """Return (found, value) for key at version"""
+        with self._lock:
+            self._sync(version)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return True, self._entries[key]
+            self._stats.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, version: Any, value: Any):
+        """Store a result computed at version, evicting the least recently used"""
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the hit, miss and eviction counters"""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                invalidations=self._stats.invalidations,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+
+def cached_query(copy: Callable[[Any], Any] = deepcopy):
+    """Memoize a Database read method in the database's query cache
+
+    Callers get copy(result), so they can modify what they receive
+    without changing the cached value.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+            try:
+                key = make_key(method.__name__, args, kwargs)
+                hash(key)
+            except TypeError:
+                return method(self, *args, **kwargs)
+            version = self.data_version()
+            found, value = cache.get(key, version)
+            profiler.count("cache_hits" if found else "cache_misses")
+            if not found:
+                value = method(self, *args, **kwargs)
+                cache.put(key, version, value)
+            return copy(value)
+        return wrapper
+    return decorator
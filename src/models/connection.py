@@ -0,0 +1,129 @@
+"""Long-lived SQLite connection management"""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+# Primary result codes of a database another connection is writing to
+BUSY_CODES = (5, 6)  # SQLITE_BUSY, SQLITE_LOCKED
+
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def is_busy(error: sqlite3.Error) -> bool:
+    """Whether an error means the database was busy or locked, i.e. worth retrying"""
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in BUSY_CODES
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+class ConnectionPool:
+    """Thread-aware pool keeping one long-lived connection per thread
+
+    SQLite connections are cheap to reuse but expensive to open: every
+    open parses the schema and sets up the journal. The pool hands each
+    thread its own connection, configured once with the requested pragmas,
+    and keeps compiled statements in the per-connection statement cache.
+
+    A read_only pool opens the file as immutable: SQLite takes no locks
+    and reads no journal, so the file must not change while it is open.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        cache_size: int = -16000,
+        mmap_size: int = 64 * 1024 * 1024,
+        cached_statements: int = 256,
+        busy_timeout: float = 5.0,
+        read_only: bool = False,
+    ):
+        """Initialize the pool without opening any connection yet"""
+        journal_mode = journal_mode.upper()
+        synchronous = synchronous.upper()
+        if journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"Unknown journal mode: {journal_mode}")
+        if synchronous not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Unknown synchronous level: {synchronous}")
+
+        self.db_path = db_path
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = int(cache_size)
+        self.mmap_size = int(mmap_size)
+        self.cached_statements = cached_statements
+        self.busy_timeout = busy_timeout
+        self.read_only = read_only
+        self._local = threading.local()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._dedicated: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        """Whether the pool has been closed"""
+        return self._closed
+
+    def connection(self) -> sqlite3.Connection:
+        """Get the connection owned by the calling thread"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._open()
+            self._local.connection = conn
+            with self._lock:
+                self._connections[threading.get_ident()] = conn
+        return conn
+
+    def dedicated(self) -> sqlite3.Connection:
+        """Open a connection owned by no thread, closed with the pool
+
+        It may be used from any thread; callers serialize access to it.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        conn = self._open()
+        with self._lock:
+            self._dedicated.append(conn)
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        """Open and configure a new connection"""
+        if self.read_only:
+            conn = sqlite3.connect(
+                f"{Path(self.db_path).resolve().as_uri()}?mode=ro&immutable=1",
+                uri=True,
+                cached_statements=self.cached_statements,
+                check_same_thread=False,
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout,
+                cached_statements=self.cached_statements,
+                check_same_thread=False,
+            )
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {self.cache_size}")
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def close(self):
+        """Close every connection opened by the pool"""
+        with self._lock:
+            connections = list(self._connections.values()) + self._dedicated
+            self._connections.clear()
+            self._dedicated = []
+            self._closed = True
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
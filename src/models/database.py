@@ -1,104 +1,1109 @@
 """Database management for expense tracker"""
 import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
-from datetime import datetime
-from typing import List
+from datetime import date, datetime, time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.utils.profiling import instrument, profiler
+from .analytics import TREND_PERIODS, Trends, next_bucket
+from .budgets import Budget
+from .cache import CacheStats, QueryCache, cached_query
+from .connection import ConnectionPool, is_busy
+from .events import ChangeEvent, ChangeListener
+from . import rollups, search
+from .query import SORT_COLUMNS, Cursor, Page, TransactionFilter
+from .recurring import RecurringRule
+from .summary import Summary
 from .transaction import Transaction
 
+if TYPE_CHECKING:
+    from .frame import TransactionFrame
 
+PERIOD_FORMATS = {
+    "day": "%Y-%m-%d",
+    "week": "%Y-W%W",
+    "month": "%Y-%m",
+    "year": "%Y",
+}
+
+# ISO date of the first day of each row's bucket, for day and week trends
+BUCKET_STARTS = {
+    "day": "date(date)",
+    "week": "date(date, '-6 days', 'weekday 1')",
+}
+
+# Current layout of the transactions table, created under a given name
+TRANSACTIONS_TABLE = """
+    CREATE TABLE {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        description TEXT NOT NULL,
+        category TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        transaction_type TEXT NOT NULL CHECK(transaction_type IN ('income', 'expense')),
+        date TEXT NOT NULL
+    )
+"""
+
+# Schema migrations applied in order; PRAGMA user_version records how many ran
+MIGRATIONS = [
+    # 1: lookups by type and date (duplicate detection, filtered queries)
+    (
+        "CREATE INDEX IF NOT EXISTS idx_transactions_type_date "
+        "ON transactions (transaction_type, date)",
+    ),
+    # 2: ordered and filtered listing (keyset pagination by date)
+    (
+        "CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_category_date "
+        "ON transactions (category, date)",
+    ),
+    # 3: trigger-maintained totals per type, category and month
+    rollups.migration_statements(),
+    # 4: store amounts as integer cents; the rebuilt table needs its
+    # indexes and rollup triggers recreated. Rounding to 6 places first
+    # drops float error, so 1.005 rounds half up to 101 like to_cents
+    (
+        TRANSACTIONS_TABLE.format(name="transactions_cents"),
+        "INSERT INTO transactions_cents "
+        "SELECT id, description, category, CAST(ROUND(ROUND(amount * 100, 6)) AS INTEGER), "
+        "transaction_type, date FROM transactions",
+        # Copying the rows created a sequence entry of the highest id left;
+        # the old one also counts deleted rows, so ids are never reused
+        "DELETE FROM sqlite_sequence WHERE name = 'transactions_cents'",
+        "INSERT INTO sqlite_sequence (name, seq) "
+        "SELECT 'transactions_cents', seq FROM sqlite_sequence WHERE name = 'transactions'",
+        "DROP TABLE transactions",
+        "ALTER TABLE transactions_cents RENAME TO transactions",
+        "CREATE INDEX idx_transactions_type_date ON transactions (transaction_type, date)",
+        "CREATE INDEX idx_transactions_date ON transactions (date)",
+        "CREATE INDEX idx_transactions_category_date ON transactions (category, date)",
+        *(f"DROP TABLE {table}" for table in rollups.ROLLUPS),
+        *rollups.migration_statements(),
+    ),
+    # 5: full-text index over descriptions and categories
+    search.migration_statements(),
+    # 6: spending limits per category and period
+    (
+        """
+        CREATE TABLE IF NOT EXISTS budgets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT NOT NULL,
+            period TEXT NOT NULL CHECK(period IN ('week', 'month', 'year')),
+            amount INTEGER NOT NULL CHECK(amount > 0),
+            warn_at REAL NOT NULL DEFAULT 0.8 CHECK(warn_at > 0 AND warn_at <= 1),
+            UNIQUE (category, period)
+        )
+        """,
+    ),
+    # 7: recurring transactions; materialized and next_date advance in the
+    # same database transaction as the rows they create
+    (
+        """
+        CREATE TABLE IF NOT EXISTS recurring_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            description TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount INTEGER NOT NULL CHECK(amount > 0),
+            transaction_type TEXT NOT NULL CHECK(transaction_type IN ('income', 'expense')),
+            frequency TEXT NOT NULL CHECK(frequency IN ('daily', 'weekly', 'monthly', 'yearly')),
+            interval INTEGER NOT NULL DEFAULT 1 CHECK(interval > 0),
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            materialized INTEGER NOT NULL DEFAULT 0,
+            next_date TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_recurring_rules_next_date ON recurring_rules (next_date)",
+    ),
+    # 8: keyset pagination per type by every sort column; indexes end in
+    # the rowid, so (transaction_type, column, id) pages need no sort.
+    # Date pages use idx_transactions_type_date.
+    (
+        "CREATE INDEX IF NOT EXISTS idx_transactions_type_amount "
+        "ON transactions (transaction_type, amount)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_type_description "
+        "ON transactions (transaction_type, description)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_type_category "
+        "ON transactions (transaction_type, category)",
+    ),
+]
+# Migration that rebuilds the REAL amount column of old files as cents
+CENTS_MIGRATION = 4
+
+TRANSACTION_COLUMNS = "id, description, category, amount, transaction_type, date"
+COLUMN_INDEX = {name: i for i, name in enumerate(TRANSACTION_COLUMNS.split(", "))}
+# Inserts of at least this many rows update rollups and search index per batch
+BULK_INSERT_ROWS = 1000
+RULE_COLUMNS = (
+    "id, description, category, amount, transaction_type, frequency, interval, "
+    "start_date, end_date, materialized"
+)
+
+
+@instrument("db")
 class Database:
-    """Handles all database operations for transactions"""
+    """Handles all database operations for transactions
+
+    Public methods are timed by src.utils.profiling while it is enabled,
+    which also counts the queries run and the rows read.
+    """
 
-    def __init__(self, db_path: str = "data/transactions.db"):
-        """Initialize database connection"""
+    def __init__(
+        self,
+        db_path: str = "data/transactions.db",
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        cache_size: int = -16000,
+        mmap_size: int = 64 * 1024 * 1024,
+        query_cache_size: int = 256,
+        read_only: bool = False,
+    ):
+        """Initialize database connection pool and schema
+
+        Connections are kept open until close() is called, one per thread.
+        Note that an in-memory path gives every thread its own database.
+        Up to query_cache_size read results are memoized; 0 disables the
+        cache. A read_only database must exist with an up-to-date schema
+        and must not be changed by anyone while it is open; writes raise
+        sqlite3.OperationalError.
+        """
         self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._initialize_db()
+        self.read_only = read_only
+        if not read_only:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        elif not self.db_path.exists():
+            raise FileNotFoundError(f"No database at {self.db_path}")
+        self._pool = ConnectionPool(
+            self.db_path,
+            journal_mode=journal_mode,
+            synchronous=synchronous,
+            cache_size=cache_size,
+            mmap_size=mmap_size,
+            read_only=read_only,
+        )
+        self._listeners: List[ChangeListener] = []
+        self.cache = QueryCache(query_cache_size) if query_cache_size > 0 else None
+        self._version = 0
+        self._version_lock = threading.Lock()
+        self._version_connection: Optional[sqlite3.Connection] = None
+        self._seen_data_version: Optional[int] = None
+        # Data version of the last commit made by each thread
+        self._committed = threading.local()
+        if read_only:
+            self._check_schema()
+        else:
+            self._initialize_db()
+
+    def __enter__(self) -> "Database":
+        """Use the database as a context manager"""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the database when leaving the context"""
+        self.close()
+
+    def close(self):
+        """Close all pooled connections"""
+        self._pool.close()
+
+    def subscribe(self, listener: ChangeListener):
+        """Call listener with a ChangeEvent after every committed write
+
+        Listeners run on the thread that performed the write.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: ChangeListener):
+        """Stop notifying a listener"""
+        self._listeners.remove(listener)
+
+    def _notify(self, event: ChangeEvent):
+        """Stamp an event with the version of the thread's last commit and send it
+
+        Reset events also bump the data version, as some of them, like
+        restore_from, replace the data without a commit of their own.
+        """
+        if event.kind == "reset":
+            with self._version_lock:
+                self._version += 1
+        event.version = getattr(self._committed, "version", 0)
+        for listener in list(self._listeners):
+            listener(event)
+
+    def data_version(self) -> int:
+        """Counter that changes after every committed write
+
+        Writes made through this Database bump it directly. Commits by
+        other connections, including other processes, are detected with
+        PRAGMA data_version on one dedicated connection shared by all
+        threads, so the first call of a new thread invalidates nothing.
+        Commits made through this Database and the version bump happen
+        under one lock, so a call made after a commit returns a newer
+        version than any call made before it.
+        """
+        with self._version_lock:
+            if self._version_connection is None:
+                self._version_connection = self._pool.dedicated()
+            profiler.count("queries")
+            external = self._version_connection.execute("PRAGMA data_version").fetchone()[0]
+            if self._seen_data_version is not None and external != self._seen_data_version:
+                self._version += 1
+            self._seen_data_version = external
+            return self._version
+
+    def cache_stats(self) -> CacheStats:
+        """Hit, miss and eviction counters of the query cache"""
+        if self.cache is None:
+            return CacheStats()
+        return self.cache.stats()
+
+    def read_versioned(self, method: Callable, *args, **kwargs) -> Tuple[Optional[int], Any]:
+        """Call a read method and return (data version, result)
+
+        The version is None if a write committed while the method ran,
+        as the result may or may not include it. Otherwise the result
+        includes exactly the changes whose event version is not above it.
+        """
+        before = self.data_version()
+        result = method(*args, **kwargs)
+        return (before if self.data_version() == before else None), result
+
+    @contextmanager
+    def _committing(self, conn: sqlite3.Connection) -> Iterator[None]:
+        """Like `with conn:`, but bumping the data version with each commit"""
+        try:
+            yield
+        except BaseException:
+            conn.rollback()
+            raise
+        if conn.in_transaction:
+            with self._version_lock:
+                try:
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+                self._version += 1
+                self._committed.version = self._version
+                # Our own commit changes PRAGMA data_version too; record it
+                # so data_version() only bumps for commits made elsewhere.
+                # A commit made elsewhere just before this read is covered
+                # by the same bump
+                if self._version_connection is not None:
+                    profiler.count("queries")
+                    self._seen_data_version = self._version_connection.execute(
+                        "PRAGMA data_version"
+                    ).fetchone()[0]
+
+    @contextmanager
+    def _cursor(self) -> Iterator[sqlite3.Cursor]:
+        """Yield a cursor on the thread's connection, committing on success"""
+        conn = self._pool.connection()
+        profiler.count("queries")
+        with self._committing(conn):
+            yield conn.cursor()
 
     def _initialize_db(self):
-        """Create tables if they don't exist"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS transactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    description TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    amount REAL NOT NULL,
-                    transaction_type TEXT NOT NULL CHECK(transaction_type IN ('income', 'expense')),
-                    date TEXT NOT NULL
-                )
-            """)
-            conn.commit()
+        """Create the current schema in a new file, or migrate an existing one
+
+        A new file gets the cents table directly and every migration
+        except the cents rebuild, which has nothing to convert.
+        """
+        conn = self._pool.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions'"
+            ).fetchone()
+            if not exists:
+                conn.execute(TRANSACTIONS_TABLE.format(name="transactions"))
+                for number, statements in enumerate(MIGRATIONS, 1):
+                    if number != CENTS_MIGRATION:
+                        for statement in statements:
+                            conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+        self._migrate()
+
+    def _check_schema(self):
+        """Fail if a database that cannot be migrated is out of date"""
+        version = self._pool.connection().execute("PRAGMA user_version").fetchone()[0]
+        if version != len(MIGRATIONS):
+            self.close()
+            raise sqlite3.OperationalError(
+                f"{self.db_path} has schema version {version}, expected {len(MIGRATIONS)}; "
+                "open it writable once to migrate it"
+            )
+
+    def _migrate(self):
+        """Apply pending schema migrations atomically"""
+        conn = self._pool.connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= len(MIGRATIONS):
+            return
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for statements in MIGRATIONS[version:]:
+                for statement in statements:
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+
+    @staticmethod
+    def _insert(cursor: sqlite3.Cursor, transaction: Transaction) -> int:
+        """Insert one transaction and return its id"""
+        cursor.execute("""
+            INSERT INTO transactions 
+            (description, category, amount, transaction_type, date)
+            VALUES (?, ?, ?, ?, ?)
+        """, (
+            transaction.description,
+            transaction.category,
+            transaction.amount,
+            transaction.transaction_type,
+            transaction.date.isoformat()
+        ))
+        return cursor.lastrowid
+
+    def _update(self, cursor: sqlite3.Cursor, transaction: Transaction) -> Optional[Transaction]:
+        """Overwrite one transaction and return its previous version, if it existed"""
+        cursor.execute(
+            f"SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE id = ?",
+            (transaction.id,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        cursor.execute("""
+            UPDATE transactions
+            SET description = ?, category = ?, amount = ?, transaction_type = ?, date = ?
+            WHERE id = ?
+        """, (
+            transaction.description,
+            transaction.category,
+            transaction.amount,
+            transaction.transaction_type,
+            transaction.date.isoformat(),
+            transaction.id
+        ))
+        return self._row_to_transaction(row)
+
+    def _delete(self, cursor: sqlite3.Cursor, transaction_id: int) -> Optional[Transaction]:
+        """Delete one transaction and return it, if it existed"""
+        cursor.execute(
+            f"SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE id = ?",
+            (transaction_id,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
+        return self._row_to_transaction(row)
 
     def add_transaction(self, transaction: Transaction) -> int:
         """Add a new transaction to database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO transactions 
-                (description, category, amount, transaction_type, date)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                transaction.description,
-                transaction.category,
-                transaction.amount,
-                transaction.transaction_type,
-                transaction.date.isoformat()
-            ))
-            conn.commit()
-            return cursor.lastrowid
+        with self._cursor() as cursor:
+            transaction_id = self._insert(cursor, transaction)
+        self._notify(ChangeEvent("insert", [replace(transaction, id=transaction_id)]))
+        return transaction_id
+
+    def add_transactions(self, transactions: Iterable[Transaction],
+                         skip_duplicates: bool = False,
+                         existing_before: Optional[int] = None) -> int:
+        """Add many transactions in a single database transaction
+
+        With skip_duplicates, rows identical to a stored transaction are not
+        inserted. Only transactions with an id up to existing_before are
+        compared when it is given, so repeated rows within one import are
+        kept. Returns the number of inserted rows.
+        """
+        rows = (
+            (t.description, t.category, t.amount, t.transaction_type, t.date.isoformat())
+            for t in transactions
+        )
+        with self._cursor() as cursor:
+            if not skip_duplicates:
+                cursor.executemany("""
+                    INSERT INTO transactions
+                    (description, category, amount, transaction_type, date)
+                    VALUES (?, ?, ?, ?, ?)
+                """, rows)
+                inserted = cursor.rowcount
+            else:
+                cursor.execute("""
+                    CREATE TEMP TABLE IF NOT EXISTS import_staging (
+                        description TEXT, category TEXT, amount INTEGER,
+                        transaction_type TEXT, date TEXT
+                    )
+                """)
+                cursor.execute("DELETE FROM import_staging")
+                cursor.executemany("INSERT INTO import_staging VALUES (?, ?, ?, ?, ?)", rows)
+                cursor.execute("""
+                    INSERT INTO transactions
+                    (description, category, amount, transaction_type, date)
+                    SELECT description, category, amount, transaction_type, date
+                    FROM import_staging s
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM transactions t
+                        WHERE t.transaction_type = s.transaction_type
+                          AND t.date = s.date
+                          AND t.amount = s.amount
+                          AND t.description = s.description
+                          AND t.category = s.category
+                          AND (? IS NULL OR t.id <= ?)
+                    )
+                """, (existing_before, existing_before))
+                inserted = cursor.rowcount
+                cursor.execute("DELETE FROM import_staging")
+        if inserted > 0:
+            self._notify(ChangeEvent("reset"))
+        return inserted
+
+    def get_last_id(self) -> int:
+        """Get the highest transaction id, or 0 for an empty table"""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM transactions")
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def _row_to_transaction(row: tuple) -> Transaction:
+        """Build a Transaction from a row selected with TRANSACTION_COLUMNS"""
+        return Transaction(
+            id=row[0],
+            description=row[1],
+            category=row[2],
+            amount=row[3],
+            transaction_type=row[4],
+            date=datetime.fromisoformat(row[5])
+        )
 
     def get_all_transactions(self) -> List[Transaction]:
         """Retrieve all transactions from database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, description, category, amount, transaction_type, date
+        with self._cursor() as cursor:
+            cursor.execute(f"""
+                SELECT {TRANSACTION_COLUMNS}
                 FROM transactions ORDER BY date DESC
             """)
-            transactions = []
-            for row in cursor.fetchall():
-                transaction = Transaction(
-                    id=row[0],
-                    description=row[1],
-                    category=row[2],
-                    amount=row[3],
-                    transaction_type=row[4],
-                    date=datetime.fromisoformat(row[5])
-                )
-                transactions.append(transaction)
-            return transactions
+            rows = cursor.fetchall()
+        profiler.count("rows", len(rows))
+        return [self._row_to_transaction(row) for row in rows]
+
+    @cached_query(copy=lambda page: Page(list(page.transactions), page.next_cursor))
+    def get_page(self, transaction_filter: Optional[TransactionFilter] = None,
+                 limit: int = 100, after: Optional[Cursor] = None,
+                 order_by: str = "date", descending: bool = True) -> Page:
+        """Get one page of matching transactions using keyset pagination
+
+        Pass the previous page's next_cursor as after to get the following
+        page; the cost does not grow with the page number.
+        """
+        return self._fetch_page(transaction_filter, limit, after, order_by, descending)
+
+    def _fetch_page(self, transaction_filter: Optional[TransactionFilter],
+                    limit: int, after: Optional[Cursor],
+                    order_by: str, descending: bool) -> Page:
+        """Query one page without going through the query cache"""
+        if order_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot order by: {order_by}")
+        where, params = (transaction_filter or TransactionFilter()).to_sql()
+        conditions = [where] if where else []
+        direction = "DESC" if descending else "ASC"
+        if after is not None:
+            conditions.append(f"({order_by}, id) {'<' if descending else '>'} (?, ?)")
+            params.extend(after)
+
+        query = f"SELECT {TRANSACTION_COLUMNS} FROM transactions"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {order_by} {direction}, id {direction} LIMIT ?"
+        params.append(limit)
+
+        with self._cursor() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        profiler.count("rows", len(rows))
+
+        page = Page([self._row_to_transaction(row) for row in rows])
+        if len(rows) == limit:
+            last = rows[-1]
+            page.next_cursor = (last[COLUMN_INDEX[order_by]], last[0])
+        return page
+
+    @cached_query()
+    def search(self, text: str, transaction_filter: Optional[TransactionFilter] = None,
+               limit: int = 50, candidates: int = 1000) -> List[Transaction]:
+        """Find transactions by the words of their description or category
+
+        Words are matched as described in search.fts_query and results
+        can be narrowed with a filter. Every result contains every word,
+        so the document frequencies bm25 weighs by are the same for all
+        of them; results are ranked by what remains, shorter texts first,
+        then newest first. The ranking is over a recency-limited
+        shortlist: only the candidates matches passing the filter with
+        the latest dates are ranked, which keeps very broad prefixes
+        cheap, so an older match can be left out even if its text is
+        shorter than every result.
+        """
+        match = search.fts_query(text)
+        if match is None:
+            return []
+        where, params = (transaction_filter or TransactionFilter()).to_sql()
+        query = f"""
+            SELECT {TRANSACTION_COLUMNS}
+            FROM (
+                SELECT rowid AS hit FROM {search.FTS_TABLE} WHERE {search.FTS_TABLE} MATCH ?
+            ) AS hits
+            JOIN transactions ON transactions.id = hits.hit
+        """
+        if where:
+            query += f" WHERE {where}"
+        query = f"""
+            SELECT * FROM ({query} ORDER BY date DESC, id DESC LIMIT ?)
+            ORDER BY length(description) + length(category), date DESC, id DESC LIMIT ?
+        """
+        with self._cursor() as cursor:
+            cursor.execute(query, [match, *params, candidates, limit])
+            rows = cursor.fetchall()
+        profiler.count("rows", len(rows))
+        return [self._row_to_transaction(row) for row in rows]
+
+    def iter_transactions(self, transaction_filter: Optional[TransactionFilter] = None,
+                          page_size: int = 500, order_by: str = "date",
+                          descending: bool = True) -> Iterator[Transaction]:
+        """Lazily iterate over matching transactions, one page at a time
+
+        Pages are not kept in the query cache.
+        """
+        cursor = None
+        while True:
+            page = self._fetch_page(transaction_filter, page_size, cursor, order_by, descending)
+            yield from page.transactions
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
+
+    def iter_row_chunks(self, transaction_filter: Optional[TransactionFilter] = None,
+                        chunk_size: int = 10000) -> Iterator[List[tuple]]:
+        """Stream matching raw rows, ordered by date, in lists of chunk_size
+
+        Rows have the TRANSACTION_COLUMNS layout with ISO date strings.
+        A single cursor is read with fetchmany; the date indexes return
+        rows in order, so SQLite needs no sort except for search filters.
+        """
+        where, params = (transaction_filter or TransactionFilter()).to_sql()
+        query = f"SELECT {TRANSACTION_COLUMNS} FROM transactions"
+        if where:
+            query += " WHERE " + where
+        query += " ORDER BY date, id"
+        with self._cursor() as cursor:
+            cursor.execute(query, params)
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    return
+                profiler.count("rows", len(chunk))
+                yield chunk
+
+    def get_frame(self, transaction_filter: Optional[TransactionFilter] = None,
+                  chunk_size: int = 50000) -> "TransactionFrame":
+        """Load matching transactions into a compact columnar TransactionFrame
+
+        Dates are converted to epoch seconds by SQLite, and rows are
+        streamed in chunks, so no Transaction objects are built. The
+        frame keeps whole seconds: microseconds are dropped. Stored dates
+        are naive, and strftime reads them as UTC while the frame turns
+        them back into naive dates from the same epoch, so apart from the
+        microseconds they come back unchanged.
+        """
+        from .frame import TransactionFrame
+
+        where, params = (transaction_filter or TransactionFilter()).to_sql()
+        query = """
+            SELECT id, description, category, amount,
+                   transaction_type, CAST(strftime('%s', date) AS INTEGER)
+            FROM transactions
+        """
+        if where:
+            query += " WHERE " + where
+        query += " ORDER BY date, id"
+
+        def rows():
+            with self._cursor() as cursor:
+                cursor.execute(query, params)
+                while True:
+                    chunk = cursor.fetchmany(chunk_size)
+                    if not chunk:
+                        return
+                    profiler.count("rows", len(chunk))
+                    yield from chunk
+
+        return TransactionFrame.from_rows(rows())
+
+    @cached_query()
+    def count_transactions(self, transaction_filter: Optional[TransactionFilter] = None) -> int:
+        """Count the transactions matching a filter"""
+        where, params = (transaction_filter or TransactionFilter()).to_sql()
+        query = "SELECT COUNT(*) FROM transactions"
+        if where:
+            query += " WHERE " + where
+        with self._cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchone()[0]
 
     def get_expenses(self) -> List[Transaction]:
         """Get all expenses"""
-        return [t for t in self.get_all_transactions() if t.transaction_type == "expense"]
+        return list(self.iter_transactions(TransactionFilter(transaction_type="expense")))
 
     def get_incomes(self) -> List[Transaction]:
         """Get all incomes"""
-        return [t for t in self.get_all_transactions() if t.transaction_type == "income"]
+        return list(self.iter_transactions(TransactionFilter(transaction_type="income")))
+
+    def get_transaction(self, transaction_id: int) -> Optional[Transaction]:
+        """Get a transaction by id"""
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE id = ?",
+                (transaction_id,)
+            )
+            row = cursor.fetchone()
+            return self._row_to_transaction(row) if row else None
+
+    def update_transaction(self, transaction: Transaction) -> bool:
+        """Overwrite a stored transaction with the same id"""
+        with self._cursor() as cursor:
+            previous = self._update(cursor, transaction)
+        if previous is None:
+            return False
+        self._notify(ChangeEvent("update", [replace(transaction)], [previous]))
+        return True
 
     def delete_transaction(self, transaction_id: int) -> bool:
         """Delete a transaction by id"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._cursor() as cursor:
+            deleted = self._delete(cursor, transaction_id)
+        if deleted is None:
+            return False
+        self._notify(ChangeEvent("delete", [deleted]))
+        return True
+
+    def write_batch(self, operations: List[Tuple[str, Any]]) -> List[Any]:
+        """Apply many inserts, updates and deletes with a single commit
+
+        operations are ("insert", Transaction), ("update", Transaction),
+        ("delete", transaction id), ("add_rule", RecurringRule) or
+        ("materialize", date or None). Results are in the same order: the
+        new id, whether the row existed, or the number of transactions
+        materialized. Each operation runs in its
+        own savepoint, so one that fails is rolled back alone and its
+        exception takes its place in the results. A busy or locked
+        database aborts the whole batch with sqlite3.OperationalError,
+        so it can be retried. Change events are sent after the commit,
+        with consecutive operations of one kind merged into one event.
+        """
+        results: List[Any] = []
+        events: List[ChangeEvent] = []
+        conn = self._pool.connection()
+        profiler.count("queries")
+        with self._committing(conn):
+            conn.execute("BEGIN IMMEDIATE")
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
-            conn.commit()
+            for kind, payload in operations:
+                cursor.execute("SAVEPOINT write_batch")
+                try:
+                    result, event = self._write_one(cursor, kind, payload)
+                except Exception as e:
+                    if isinstance(e, sqlite3.OperationalError) and is_busy(e):
+                        raise
+                    cursor.execute("ROLLBACK TO write_batch")
+                    result, event = e, None
+                cursor.execute("RELEASE write_batch")
+                results.append(result)
+                if event is None:
+                    continue
+                if events and events[-1].kind == event.kind:
+                    events[-1].transactions.extend(event.transactions)
+                    events[-1].previous.extend(event.previous)
+                else:
+                    events.append(event)
+        for event in events:
+            self._notify(event)
+        return results
+
+    def _write_one(self, cursor: sqlite3.Cursor, kind: str, payload: Any):
+        """Run one write_batch operation; returns its result and change event"""
+        if kind == "insert":
+            transaction_id = self._insert(cursor, payload)
+            return transaction_id, ChangeEvent("insert", [replace(payload, id=transaction_id)])
+        if kind == "update":
+            previous = self._update(cursor, payload)
+            if previous is None:
+                return False, None
+            return True, ChangeEvent("update", [replace(payload)], [previous])
+        if kind == "delete":
+            deleted = self._delete(cursor, payload)
+            if deleted is None:
+                return False, None
+            return True, ChangeEvent("delete", [deleted])
+        if kind == "add_rule":
+            return self._insert_rule(cursor, payload), None
+        if kind == "materialize":
+            inserted = self._materialize(cursor, payload)
+            return inserted, ChangeEvent("reset") if inserted else None
+        raise ValueError(f"Unknown write operation: {kind}")
+
+    @cached_query()
+    def get_summary(self) -> Summary:
+        """Get totals per type and per category from the category rollup"""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT transaction_type, category, total FROM totals_by_category")
+            summary = Summary()
+            for transaction_type, category, total in cursor:
+                summary.totals[transaction_type] = summary.totals.get(transaction_type, 0) + total
+                summary.by_category.setdefault(transaction_type, {})[category] = total
+            return summary
+
+    @cached_query()
+    def get_category_totals(self, transaction_type: str) -> Dict[str, int]:
+        """Get total cents per category for a transaction type"""
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT category, total
+                FROM totals_by_category
+                WHERE transaction_type = ?
+            """, (transaction_type,))
+            return dict(cursor.fetchall())
+
+    @cached_query()
+    def get_period_totals(self, period: str = "month",
+                          transaction_type: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Get total cents per period and type, ordered by period
+
+        Months and years are read from the monthly rollup; days and weeks
+        are aggregated from the transactions table.
+        """
+        if period not in PERIOD_FORMATS:
+            raise ValueError(f"Unknown period: {period}")
+        if period in ("month", "year"):
+            length = len("YYYY-MM") if period == "month" else len("YYYY")
+            query = f"SELECT substr(month, 1, {length}) AS period, transaction_type, SUM(total) FROM totals_by_month"
+            params = []
+        else:
+            query = "SELECT strftime(?, date) AS period, transaction_type, SUM(amount) FROM transactions"
+            params = [PERIOD_FORMATS[period]]
+        if transaction_type is not None:
+            query += " WHERE transaction_type = ?"
+            params.append(transaction_type)
+        query += " GROUP BY period, transaction_type ORDER BY period"
+        with self._cursor() as cursor:
+            cursor.execute(query, params)
+            totals = {}
+            for period_key, row_type, total in cursor:
+                totals.setdefault(period_key, {})[row_type] = total
+            return totals
+
+    @cached_query()
+    def get_trends(self, period: str = "month") -> Trends:
+        """Get totals per time bucket, type and category in one query
+
+        Months and years are read from the monthly rollup; days and weeks
+        are aggregated from the transactions table.
+        """
+        if period not in TREND_PERIODS:
+            raise ValueError(f"Unknown period: {period}")
+        if period in ("month", "year"):
+            start = "month || '-01'" if period == "month" else "substr(month, 1, 4) || '-01-01'"
+            query = f"SELECT {start} AS bucket, transaction_type, category, SUM(total) FROM totals_by_month"
+        else:
+            query = f"SELECT {BUCKET_STARTS[period]} AS bucket, transaction_type, category, SUM(amount) FROM transactions"
+        query += " GROUP BY bucket, transaction_type, category"
+        with self._cursor() as cursor:
+            cursor.execute(query)
+            trends = Trends(period)
+            for bucket, transaction_type, category, total in cursor:
+                trends.add(datetime.fromisoformat(bucket).date(), transaction_type, category, total)
+            return trends
+
+    @cached_query()
+    def _sum_amount(self, transaction_type: str) -> int:
+        """Sum the amounts of one transaction type in cents"""
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT COALESCE(SUM(total), 0) FROM totals_by_type WHERE transaction_type = ?",
+                (transaction_type,)
+            )
+            return cursor.fetchone()[0]
+
+    @cached_query()
+    def get_balance(self) -> int:
+        """Calculate current balance (incomes - expenses) in cents"""
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT COALESCE(SUM(CASE WHEN transaction_type = 'income' THEN total ELSE -total END), 0)
+                FROM totals_by_type
+            """)
+            return cursor.fetchone()[0]
+
+    def get_total_expenses(self) -> int:
+        """Get total cents spent on expenses"""
+        return self._sum_amount("expense")
+
+    def get_total_incomes(self) -> int:
+        """Get total cents of incomes"""
+        return self._sum_amount("income")
+
+    def copy_to(self, path: str):
+        """Write a consistent copy of the database to path with the SQLite backup API
+
+        Every page is copied in one step, within one read transaction on
+        the calling thread's connection: with WAL, writers are not blocked
+        meanwhile and the copy is the database as of the start of the copy.
+        """
+        target = sqlite3.connect(path)
+        try:
+            self._pool.connection().backup(target)
+        finally:
+            target.close()
+
+    def restore_from(self, path: str):
+        """Replace every row of the database with the database file at path
+
+        Uses the SQLite backup API, so connections open on this database
+        see the restored data, then migrates it if it is older and sends
+        a reset event.
+        """
+        source = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            source.backup(self._pool.connection())
+        finally:
+            source.close()
+        self._migrate()
+        self._notify(ChangeEvent("reset"))
+
+    def verify_rollups(self) -> List[rollups.Drift]:
+        """Recompute the summary tables and report rows that drifted"""
+        with self._cursor() as cursor:
+            return rollups.verify(cursor)
+
+    def rebuild_rollups(self) -> List[rollups.Drift]:
+        """Recompute the summary tables from scratch
+
+        Returns the drift found before rebuilding.
+        """
+        with self._cursor() as cursor:
+            drifts = rollups.verify(cursor)
+            rollups.rebuild(cursor)
+        self._notify(ChangeEvent("reset"))
+        return drifts
+
+    def rebuild_search_index(self):
+        """Recreate the full-text index from the transactions table"""
+        with self._cursor() as cursor:
+            search.rebuild(cursor)
+
+    def set_budget(self, budget: Budget) -> int:
+        """Store a budget, replacing the one of its category and period
+
+        Returns its id.
+        """
+        with self._cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO budgets (category, period, amount, warn_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (category, period) DO UPDATE SET
+                amount = excluded.amount, warn_at = excluded.warn_at
+            """, (budget.category, budget.period, budget.limit, budget.warn_at))
+            cursor.execute(
+                "SELECT id FROM budgets WHERE category = ? AND period = ?",
+                (budget.category, budget.period)
+            )
+            return cursor.fetchone()[0]
+
+    def get_budgets(self) -> List[Budget]:
+        """Get every budget ordered by category and period"""
+        with self._cursor() as cursor:
+            cursor.execute(
+                "SELECT id, category, period, amount, warn_at FROM budgets ORDER BY category, period"
+            )
+            return [
+                Budget(category=category, limit=amount, period=period, warn_at=warn_at, id=budget_id)
+                for budget_id, category, period, amount, warn_at in cursor
+            ]
+
+    def delete_budget(self, category: str, period: str = "month") -> bool:
+        """Remove the budget of a category and period"""
+        with self._cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM budgets WHERE category = ? AND period = ?", (category, period)
+            )
             return cursor.rowcount > 0
 
-    def get_balance(self) -> float:
-        """Calculate current balance (incomes - expenses)"""
-        transactions = self.get_all_transactions()
-        balance = sum(t.amount for t in transactions if t.transaction_type == "income")
-        balance -= sum(t.amount for t in transactions if t.transaction_type == "expense")
-        return balance
-
-    def get_total_expenses(self) -> float:
-        """Get total amount spent on expenses"""
-        expenses = self.get_expenses()
-        return sum(t.amount for t in expenses)
-
-    def get_total_incomes(self) -> float:
-        """Get total amount of incomes"""
-        incomes = self.get_incomes()
-        return sum(t.amount for t in incomes)
+    def get_budget_spend(self, starts: Dict[str, date]) -> Dict[Tuple[str, str], int]:
+        """Get cents spent per budgeted category in the buckets beginning at starts
+
+        starts maps budget periods to the first day of their bucket, as
+        given by BudgetEvaluator.period_starts. Every period is summed in
+        one pass over the expenses since the earliest start.
+        """
+        if not starts:
+            return {}
+        periods = list(starts)
+        columns = ", ".join(
+            "SUM(CASE WHEN date >= ? AND date < ? THEN amount ELSE 0 END)" for _ in periods
+        )
+        params: List[Any] = []
+        for period in periods:
+            params += [starts[period].isoformat(), next_bucket(starts[period], period).isoformat()]
+        params += [
+            min(starts.values()).isoformat(),
+            max(next_bucket(start, period) for period, start in starts.items()).isoformat(),
+        ]
+        with self._cursor() as cursor:
+            cursor.execute(f"""
+                SELECT category, {columns}
+                FROM transactions
+                WHERE transaction_type = 'expense' AND date >= ? AND date < ?
+                  AND category IN (SELECT category FROM budgets)
+                GROUP BY category
+            """, params)
+            spend = {}
+            for category, *totals in cursor:
+                for period, total in zip(periods, totals):
+                    if total:
+                        spend[category, period] = total
+            return spend
+
+    @staticmethod
+    def _row_to_rule(row: tuple) -> RecurringRule:
+        """Convert a recurring_rules row (RULE_COLUMNS) to a RecurringRule"""
+        (rule_id, description, category, amount, transaction_type, frequency, interval,
+         start_date, end_date, materialized) = row
+        return RecurringRule(
+            description=description,
+            category=category,
+            amount=amount,
+            transaction_type=transaction_type,
+            frequency=frequency,
+            start=date.fromisoformat(start_date),
+            interval=interval,
+            end=date.fromisoformat(end_date) if end_date else None,
+            materialized=materialized,
+            id=rule_id,
+        )
+
+    @staticmethod
+    def _insert_rule(cursor: sqlite3.Cursor, rule: RecurringRule) -> int:
+        """Insert one recurring rule and return its id"""
+        next_date = rule.next_date
+        cursor.execute(f"""
+            INSERT INTO recurring_rules ({RULE_COLUMNS.removeprefix("id, ")}, next_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            rule.description,
+            rule.category,
+            rule.amount,
+            rule.transaction_type,
+            rule.frequency,
+            rule.interval,
+            rule.start.isoformat(),
+            rule.end.isoformat() if rule.end else None,
+            rule.materialized,
+            next_date.isoformat() if next_date else None,
+        ))
+        return cursor.lastrowid
+
+    def add_recurring_rule(self, rule: RecurringRule) -> int:
+        """Store a recurring rule; its occurrences are created by materialize_recurring"""
+        with self._cursor() as cursor:
+            return self._insert_rule(cursor, rule)
+
+    def get_recurring_rules(self) -> List[RecurringRule]:
+        """Get every recurring rule in creation order"""
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT {RULE_COLUMNS} FROM recurring_rules ORDER BY id")
+            return [self._row_to_rule(row) for row in cursor]
+
+    def delete_recurring_rule(self, rule_id: int) -> bool:
+        """Stop a recurring rule; transactions it created are kept"""
+        with self._cursor() as cursor:
+            cursor.execute("DELETE FROM recurring_rules WHERE id = ?", (rule_id,))
+            return cursor.rowcount > 0
+
+    @staticmethod
+    def _insert_rows(cursor: sqlite3.Cursor, rows: List[tuple]):
+        """Insert many transaction rows inside an explicit database transaction
+
+        From BULK_INSERT_ROWS rows on, the per-row insert triggers of the
+        rollups and the search index are dropped and the new rows are
+        added to both with one set-based statement each, which is several
+        times faster. The triggers are recreated before the transaction
+        commits, and rolled back with it on errors, so other connections
+        never see them missing.
+        """
+        insert = """
+            INSERT INTO transactions
+            (description, category, amount, transaction_type, date)
+            VALUES (?, ?, ?, ?, ?)
+        """
+        if len(rows) < BULK_INSERT_ROWS:
+            cursor.executemany(insert, rows)
+            return
+        triggers = (rollups.INSERT_TRIGGER, search.INSERT_TRIGGER)
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name IN (?, ?)", triggers
+        )
+        definitions = [sql for (sql,) in cursor.fetchall()]
+        # AUTOINCREMENT ids only grow, so the new rows are those above the current maximum
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM transactions")
+        after_id = cursor.fetchone()[0]
+        for trigger in triggers:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.executemany(insert, rows)
+        rollups.add_rows(cursor, after_id)
+        search.add_rows(cursor, after_id)
+        for sql in definitions:
+            cursor.execute(sql)
+
+    def _materialize(self, cursor: sqlite3.Cursor, until: Optional[date]) -> int:
+        """Insert the occurrences of every rule due up to until and advance the rules"""
+        until = until or date.today()
+        cursor.execute(
+            f"SELECT {RULE_COLUMNS} FROM recurring_rules WHERE next_date <= ?",
+            (until.isoformat(),)
+        )
+        rules = [self._row_to_rule(row) for row in cursor.fetchall()]
+        rows = []
+        progress = []
+        midnight = time()
+        for rule in rules:
+            days = [day for _, day in rule.due(until)]
+            rows.extend(
+                (rule.description, rule.category, rule.amount, rule.transaction_type,
+                 datetime.combine(day, midnight).isoformat())
+                for day in days
+            )
+            rule.materialized += len(days)
+            next_date = rule.next_date
+            progress.append((rule.materialized, next_date.isoformat() if next_date else None, rule.id))
+        self._insert_rows(cursor, rows)
+        cursor.executemany(
+            "UPDATE recurring_rules SET materialized = ?, next_date = ? WHERE id = ?", progress
+        )
+        return len(rows)
+
+    def materialize_recurring(self, until: Optional[date] = None) -> int:
+        """Create every missed occurrence of the recurring rules up to until (default today)
+
+        All occurrences are inserted in one batch, in the database
+        transaction that advances each rule past them, and BEGIN
+        IMMEDIATE keeps concurrent callers from reading the same rules,
+        so running it again, after a restart or from another process,
+        never creates an occurrence twice. Returns the number of
+        transactions created.
+        """
+        conn = self._pool.connection()
+        profiler.count("queries")
+        with self._committing(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            inserted = self._materialize(conn.cursor(), until)
+        if inserted:
+            self._notify(ChangeEvent("reset"))
+        return inserted
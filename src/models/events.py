@@ -0,0 +1,25 @@
+"""Change notifications for stored transactions"""
+from dataclasses import dataclass, field
+from typing import Callable, List, Literal
+from .transaction import Transaction
+
+ChangeKind = Literal["insert", "delete", "update", "reset"]
+
+
+@dataclass
+class ChangeEvent:
+    """Describes a change to the transactions table
+
+    insert and delete carry the affected rows, update carries the new rows
+    and their previous versions, and reset means many rows changed at once
+    (e.g. a bulk import) so listeners should reload instead. version is
+    the Database.data_version its commit produced: a query result read
+    at that version or a later one already includes the change.
+    """
+    kind: ChangeKind
+    transactions: List[Transaction] = field(default_factory=list)
+    previous: List[Transaction] = field(default_factory=list)
+    version: int = 0
+
+
+ChangeListener = Callable[[ChangeEvent], None]
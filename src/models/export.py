@@ -0,0 +1,198 @@
+"""Streaming export of transactions to CSV, JSONL and Parquet"""
+import csv
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, IO, List, Optional, Type
+from src.utils.money import format_cents
+from .database import Database
+from .query import TransactionFilter
+
+# Column order of every format; matches the importer's CSV columns plus id
+EXPORT_COLUMNS = ("id", "date", "description", "category", "amount", "transaction_type")
+
+# Raw row layout from Database.iter_row_chunks
+_ID, _DESCRIPTION, _CATEGORY, _AMOUNT, _TYPE, _DATE = range(6)
+
+
+@dataclass
+class ExportResult:
+    """Outcome of an export run"""
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        """Export throughput"""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class ExportWriter:
+    """Base of the per-format writers, which receive chunks of raw rows"""
+
+    # Whether the writer needs a binary stream
+    binary = False
+
+    @staticmethod
+    def check():
+        """Raise ImportError if an optional dependency is missing"""
+
+    def write(self, rows: List[tuple]):
+        """Write one chunk of raw rows"""
+        raise NotImplementedError
+
+    def close(self):
+        """Flush anything the format buffers"""
+
+
+class CsvExportWriter(ExportWriter):
+    """Write rows as CSV with decimal amounts, readable by the importer"""
+
+    def __init__(self, output: IO[str]):
+        """Write the header row"""
+        self._writer = csv.writer(output)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def write(self, rows: List[tuple]):
+        """Write one chunk of raw rows"""
+        self._writer.writerows(
+            (row[_ID], row[_DATE], row[_DESCRIPTION], row[_CATEGORY],
+             format_cents(row[_AMOUNT]), row[_TYPE])
+            for row in rows
+        )
+
+
+class JsonlExportWriter(ExportWriter):
+    """Write one Transaction.to_dict() object per line; amounts are cents"""
+
+    def __init__(self, output: IO[str]):
+        """Remember the output stream"""
+        self._output = output
+
+    def write(self, rows: List[tuple]):
+        """Write one chunk of raw rows"""
+        self._output.writelines(
+            json.dumps({
+                "id": row[_ID],
+                "description": row[_DESCRIPTION],
+                "category": row[_CATEGORY],
+                "amount": row[_AMOUNT],
+                "transaction_type": row[_TYPE],
+                "date": row[_DATE],
+            }, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+class ParquetExportWriter(ExportWriter):
+    """Write one Parquet row group per chunk; needs pyarrow
+
+    Amounts are int64 cents, dates are microsecond timestamps and
+    categories and types are dictionary-encoded.
+    """
+
+    binary = True
+
+    @staticmethod
+    def check():
+        """Raise ImportError if pyarrow is not installed"""
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Parquet export needs pyarrow (pip install pyarrow)") from e
+
+    def __init__(self, output: IO[bytes]):
+        """Open a Parquet writer on the output stream"""
+        self.check()
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.int64()),
+            ("date", pa.timestamp("us")),
+            ("description", pa.string()),
+            ("category", pa.dictionary(pa.int32(), pa.string())),
+            ("amount", pa.int64()),
+            ("transaction_type", pa.dictionary(pa.int8(), pa.string())),
+        ], metadata={"amount_unit": "cents"})
+        self._writer = pq.ParquetWriter(output, self._schema)
+
+    def write(self, rows: List[tuple]):
+        """Write one chunk of raw rows as a row group"""
+        pa = self._pa
+        columns = list(zip(*rows))
+        self._writer.write_table(pa.table([
+            pa.array(columns[_ID], pa.int64()),
+            pa.array(columns[_DATE], pa.string()).cast(pa.timestamp("us")),
+            pa.array(columns[_DESCRIPTION], pa.string()),
+            pa.array(columns[_CATEGORY], pa.string()).dictionary_encode(),
+            pa.array(columns[_AMOUNT], pa.int64()),
+            pa.array(columns[_TYPE], pa.string()).dictionary_encode().cast(
+                pa.dictionary(pa.int8(), pa.string())
+            ),
+        ], schema=self._schema))
+
+    def close(self):
+        """Write the Parquet footer"""
+        self._writer.close()
+
+
+WRITERS: Dict[str, Type[ExportWriter]] = {
+    "csv": CsvExportWriter,
+    "jsonl": JsonlExportWriter,
+    "parquet": ParquetExportWriter,
+}
+
+
+def format_for(path: Path) -> str:
+    """Export format implied by a file suffix"""
+    suffix = Path(path).suffix.lower().lstrip(".")
+    if suffix == "json":
+        suffix = "jsonl"
+    if suffix not in WRITERS:
+        raise ValueError(f"Unknown export format: {suffix or path}")
+    return suffix
+
+
+def export_transactions(db: Database, output, export_format: Optional[str] = None,
+                        transaction_filter: Optional[TransactionFilter] = None,
+                        chunk_size: int = 10000,
+                        progress: Optional[Callable[[ExportResult], None]] = None) -> ExportResult:
+    """Stream matching transactions, ordered by date, to a file or stream
+
+    output is a path or an open stream (text for CSV/JSONL, binary for
+    Parquet). Rows are read with one database cursor chunk_size at a
+    time and written straight away, so memory use does not depend on
+    the number of rows.
+    """
+    if export_format is None:
+        export_format = format_for(output)
+    if export_format not in WRITERS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    writer_class = WRITERS[export_format]
+    writer_class.check()
+
+    result = ExportResult()
+    start = time.perf_counter()
+    if isinstance(output, (str, Path)):
+        mode = "wb" if writer_class.binary else "w"
+        encoding = None if writer_class.binary else "utf-8"
+        stream = open(output, mode, newline=None if writer_class.binary else "", encoding=encoding)
+    else:
+        stream = output
+    try:
+        writer = writer_class(stream)
+        for rows in db.iter_row_chunks(transaction_filter, chunk_size):
+            writer.write(rows)
+            result.rows += len(rows)
+            result.seconds = time.perf_counter() - start
+            if progress is not None:
+                progress(result)
+        writer.close()
+    finally:
+        if stream is not output:
+            stream.close()
+    result.seconds = time.perf_counter() - start
+    return result
@@ -0,0 +1,180 @@
+"""Columnar in-memory storage for many transactions"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence
+import numpy as np
+from .transaction import Transaction
+
+# Bit per transaction type in TransactionFrame.type_mask
+TYPE_BITS = {"income": 1, "expense": 2}
+_TYPE_NAMES = {bit: name for name, bit in TYPE_BITS.items()}
+
+_EPOCH = datetime(1970, 1, 1)
+_SECONDS_PER_DAY = 86400
+
+# numpy datetime unit used for each time bucket; weeks start on Monday
+BUCKET_UNITS = {"day": "D", "week": "D", "month": "M", "year": "Y"}
+
+
+class TransactionFrame:
+    """Transactions stored as parallel NumPy columns
+
+    Amounts are int64 cents, dates are int64 days since 1970-01-01 plus
+    int32 seconds within the day (microseconds are not kept), categories and descriptions are
+    dictionary-encoded int32 codes and types are a uint8 bitmask. Filters
+    and aggregations are vectorized; Transaction objects are only created
+    by transactions() or indexing.
+    """
+
+    def __init__(self, ids: np.ndarray, amounts: np.ndarray, days: np.ndarray,
+                 seconds: np.ndarray, type_mask: np.ndarray,
+                 category_codes: np.ndarray, categories: Sequence[str],
+                 description_codes: np.ndarray, descriptions: Sequence[str]):
+        """Wrap existing columns; all arrays must have the same length"""
+        self.ids = ids
+        self.amounts = amounts
+        self.days = days
+        self.seconds = seconds
+        self.type_mask = type_mask
+        self.category_codes = category_codes
+        self.categories = list(categories)
+        self.description_codes = description_codes
+        self.descriptions = list(descriptions)
+
+    @classmethod
+    def from_rows(cls, rows: Iterator[tuple]) -> "TransactionFrame":
+        """Build a frame from (id, description, category, cents, type, epoch seconds) rows"""
+        categories: Dict[str, int] = {}
+        descriptions: Dict[str, int] = {}
+        ids, amounts, stamps, types, category_codes, description_codes = [], [], [], [], [], []
+        for row_id, description, category, cents, transaction_type, stamp in rows:
+            ids.append(row_id)
+            description_codes.append(descriptions.setdefault(description, len(descriptions)))
+            category_codes.append(categories.setdefault(category, len(categories)))
+            amounts.append(cents)
+            types.append(TYPE_BITS[transaction_type])
+            stamps.append(stamp)
+
+        stamps = np.array(stamps, dtype=np.int64)
+        return cls(
+            ids=np.array(ids, dtype=np.int64),
+            amounts=np.array(amounts, dtype=np.int64),
+            days=stamps // _SECONDS_PER_DAY,
+            seconds=(stamps % _SECONDS_PER_DAY).astype(np.int32),
+            type_mask=np.array(types, dtype=np.uint8),
+            category_codes=np.array(category_codes, dtype=np.int32),
+            categories=list(categories),
+            description_codes=np.array(description_codes, dtype=np.int32),
+            descriptions=list(descriptions),
+        )
+
+    def __len__(self) -> int:
+        """Number of transactions"""
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> Transaction:
+        """Create a Transaction view of one row"""
+        return self._transaction(index)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the numeric columns"""
+        return sum(column.nbytes for column in (
+            self.ids, self.amounts, self.days, self.seconds, self.type_mask,
+            self.category_codes, self.description_codes
+        ))
+
+    def _transaction(self, index: int) -> Transaction:
+        """Build the Transaction stored at a row"""
+        return Transaction(
+            id=int(self.ids[index]),
+            description=self.descriptions[self.description_codes[index]],
+            category=self.categories[self.category_codes[index]],
+            amount=int(self.amounts[index]),
+            transaction_type=_TYPE_NAMES[int(self.type_mask[index])],
+            date=_EPOCH + timedelta(days=int(self.days[index]), seconds=int(self.seconds[index]))
+        )
+
+    def transactions(self) -> Iterator[Transaction]:
+        """Lazily create Transaction views of every row"""
+        for index in range(len(self)):
+            yield self._transaction(index)
+
+    def take(self, mask: np.ndarray) -> "TransactionFrame":
+        """Select rows by boolean mask or index array"""
+        return TransactionFrame(
+            self.ids[mask], self.amounts[mask], self.days[mask], self.seconds[mask],
+            self.type_mask[mask], self.category_codes[mask], self.categories,
+            self.description_codes[mask], self.descriptions
+        )
+
+    def mask(self, transaction_type: Optional[str] = None,
+             category: Optional[str] = None,
+             start_date: Optional[datetime] = None,
+             end_date: Optional[datetime] = None,
+             min_amount: Optional[int] = None,
+             max_amount: Optional[int] = None) -> np.ndarray:
+        """Boolean mask of rows matching every given criterion; amounts are cents"""
+        selected = np.ones(len(self), dtype=bool)
+        if transaction_type is not None:
+            selected &= (self.type_mask & TYPE_BITS[transaction_type]) != 0
+        if category is not None:
+            if category not in self.categories:
+                return np.zeros(len(self), dtype=bool)
+            selected &= self.category_codes == self.categories.index(category)
+        if start_date is not None or end_date is not None:
+            stamps = self.days * _SECONDS_PER_DAY + self.seconds
+            if start_date is not None:
+                selected &= stamps >= int((start_date - _EPOCH).total_seconds())
+            if end_date is not None:
+                selected &= stamps < int((end_date - _EPOCH).total_seconds())
+        if min_amount is not None:
+            selected &= self.amounts >= min_amount
+        if max_amount is not None:
+            selected &= self.amounts <= max_amount
+        return selected
+
+    def filter(self, **criteria) -> "TransactionFrame":
+        """Rows matching the criteria accepted by mask()"""
+        return self.take(self.mask(**criteria))
+
+    def total(self) -> int:
+        """Sum of all amounts in cents"""
+        return int(self.amounts.sum())
+
+    def sum_by_category(self) -> Dict[str, int]:
+        """Total cents per category"""
+        sums = np.zeros(len(self.categories), dtype=np.int64)
+        np.add.at(sums, self.category_codes, self.amounts)
+        counts = np.bincount(self.category_codes, minlength=len(self.categories))
+        return {
+            self.categories[code]: int(sums[code])
+            for code in np.flatnonzero(counts)
+        }
+
+    def sum_by_type(self) -> Dict[str, int]:
+        """Total cents per transaction type"""
+        return {
+            name: int(self.amounts[(self.type_mask & bit) != 0].sum())
+            for name, bit in TYPE_BITS.items()
+        }
+
+    def bucket_labels(self, period: str = "month") -> np.ndarray:
+        """Bucket start of every row as numpy datetime64 values"""
+        if period not in BUCKET_UNITS:
+            raise ValueError(f"Unknown period: {period}")
+        days = self.days
+        if period == "week":
+            # 1970-01-01 was a Thursday
+            days = days - (days + 3) % 7
+        return days.astype("datetime64[D]").astype(f"datetime64[{BUCKET_UNITS[period]}]")
+
+    def sum_by_period(self, period: str = "month") -> Dict[str, int]:
+        """Total cents per time bucket, ordered by bucket"""
+        buckets, inverse = np.unique(self.bucket_labels(period), return_inverse=True)
+        sums = np.zeros(len(buckets), dtype=np.int64)
+        np.add.at(sums, inverse.ravel(), self.amounts)
+        return {str(bucket): int(total) for bucket, total in zip(buckets, sums)}
+
+    def to_list(self) -> List[Transaction]:
+        """Materialize every row as a Transaction"""
+        return list(self.transactions())
@@ -0,0 +1,296 @@
+"""Streaming import of bank statements"""
+import csv
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.utils.money import to_cents
+from .database import Database
+from .transaction import Transaction
+
+# Raw rows are (line number, field mapping) pairs
+RawRow = Tuple[int, Dict[str, str]]
+
+DEFAULT_COLUMNS = {
+    "description": "description",
+    "category": "category",
+    "amount": "amount",
+    "transaction_type": "transaction_type",
+    "date": "date",
+}
+
+TYPE_ALIASES = {
+    "income": "income",
+    "credit": "income",
+    "expense": "expense",
+    "debit": "expense",
+}
+
+DECIMAL_MARKS = (".", ",")
+
+MAX_REPORTED_ERRORS = 100
+
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+# Digits with decimal marks and thousands separators, ending in a digit
+_AMOUNT_DIGITS = re.compile(r"[\d.,'\s]*\d")
+
+
+@dataclass
+class ImportResult:
+    """Outcome of an import run"""
+    rows_read: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str):
+        """Record an invalid row, keeping only the first few messages"""
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line}: {message}")
+
+
+def read_csv(path: Path, columns: Optional[Dict[str, str]] = None,
+             delimiter: str = ",", encoding: str = "utf-8") -> Iterator[RawRow]:
+    """Yield rows of a CSV file one at a time, keyed by transaction field
+
+    columns maps Transaction field names to CSV header names.
+    """
+    mapping = {**DEFAULT_COLUMNS, **(columns or {})}
+    with open(path, newline="", encoding=encoding) as handle:
+        reader = csv.DictReader(handle, delimiter=delimiter)
+        for row in reader:
+            yield reader.line_num, {
+                name: row.get(header, "") or ""
+                for name, header in mapping.items()
+            }
+
+
+def read_ofx(path: Path, encoding: str = "latin-1") -> Iterator[RawRow]:
+    """Yield the STMTTRN records of an OFX file one at a time"""
+    record = None
+    with open(path, encoding=encoding) as handle:
+        for line_num, line in enumerate(handle, start=1):
+            upper = line.upper()
+            if "<STMTTRN>" in upper:
+                record = {"_line": line_num}
+            if record is not None:
+                for tag, value in _OFX_FIELD.findall(line):
+                    record[tag.upper()] = value.strip()
+            if "</STMTTRN>" in upper and record is not None:
+                yield record.pop("_line"), {
+                    "description": record.get("NAME") or record.get("MEMO", ""),
+                    "category": record.get("MEMO", "") if record.get("NAME") else "",
+                    # OFX amounts have no thousands separators but may
+                    # use a decimal comma
+                    "amount": record.get("TRNAMT", "").replace(",", "."),
+                    "transaction_type": "",
+                    "date": record.get("DTPOSTED", ""),
+                }
+                record = None
+
+
+def _parse_date(value: str, date_format: Optional[str]) -> datetime:
+    """Parse an ISO, OFX (YYYYMMDD...) or custom-formatted date"""
+    value = value.strip()
+    if date_format:
+        return datetime.strptime(value, date_format)
+    if len(value) >= 8 and value[:8].isdigit():
+        return datetime.strptime(value[:8], "%Y%m%d")
+    return datetime.fromisoformat(value)
+
+
+def _strip_currency(text: str) -> str:
+    """Remove currency symbols, codes and spaces around an amount"""
+    def is_currency(ch: str) -> bool:
+        return ch.isalpha() or ch.isspace() or unicodedata.category(ch) == "Sc"
+
+    start, end = 0, len(text)
+    while start < end and is_currency(text[start]):
+        start += 1
+    while end > start and is_currency(text[end - 1]):
+        end -= 1
+    return text[start:end]
+
+
+def _check_groups(integer: str, separators: str, value: str):
+    """Raise ValueError unless thousands separators split integer into groups
+
+    The first group has one to three digits and the last one three;
+    groups of two in between allow Indian lakh grouping.
+    """
+    groups = re.split(f"[{re.escape(separators)}\\s]", integer)
+    if len(groups) == 1:
+        return
+    if (not 1 <= len(groups[0]) <= 3 or len(groups[-1]) != 3
+            or any(len(group) not in (2, 3) for group in groups[1:-1])):
+        raise ValueError(f"misplaced thousands separator in amount '{value}'")
+
+
+def parse_amount(value: str, decimal: Optional[str] = None) -> int:
+    """Parse an amount such as '-1,234.56', '1.234,56 EUR' or '($12.00)' into cents
+
+    decimal is the decimal mark, '.' or ','; the other one, apostrophes
+    and spaces are thousands separators. By default the mark is the last
+    separator if both appear, and otherwise a separator that occurs once
+    and is not followed by exactly three digits. Parentheses and a
+    leading or trailing sign make the amount negative; currency symbols
+    and codes around it are ignored. Raises ValueError for anything else
+    and for amounts like '1,234' that could mean either.
+    """
+    if decimal is not None and decimal not in DECIMAL_MARKS:
+        raise ValueError(f"decimal mark must be '.' or ',', not '{decimal}'")
+    text = value.strip()
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    text = _strip_currency(text)
+    sign = ""
+    if text[:1] in ("+", "-"):
+        sign, text = text[0], _strip_currency(text[1:])
+    elif text[-1:] in ("+", "-"):
+        sign, text = text[-1], _strip_currency(text[:-1])
+    if not _AMOUNT_DIGITS.fullmatch(text) or (negative and sign):
+        raise ValueError(f"invalid amount '{value}'")
+
+    marks = [ch for ch in text if ch in DECIMAL_MARKS]
+    if decimal is None:
+        if len(set(marks)) == 2:
+            decimal = marks[-1]
+        elif len(marks) == 1:
+            fraction = text.rsplit(marks[0], 1)[1]
+            integer = text.split(marks[0], 1)[0].strip()
+            if len(fraction) == 3 and integer not in ("", "0"):
+                raise ValueError(
+                    f"ambiguous amount '{value}': set the decimal mark to '.' or ','"
+                )
+            decimal = marks[0]
+    if decimal is not None and marks.count(decimal) > 1:
+        raise ValueError(f"invalid amount '{value}'")
+    integer, _, fraction = text.partition(decimal) if decimal else (text, "", "")
+    separators = "".join(mark for mark in DECIMAL_MARKS if mark != decimal) + "'"
+    if any(not ch.isdigit() for ch in fraction):
+        raise ValueError(f"invalid amount '{value}'")
+    integer = integer.strip()
+    _check_groups(integer, separators, value)
+    digits = re.sub(r"\D", "", integer) or "0"
+    cents = to_cents(f"{digits}.{fraction or '0'}")
+    return -cents if negative or sign == "-" else cents
+
+
+def parse_row(row: Dict[str, str], default_category: str = "Uncategorized",
+              date_format: Optional[str] = None, decimal: Optional[str] = None) -> Transaction:
+    """Validate a raw row and build a Transaction from it
+
+    decimal is passed on to parse_amount.
+    """
+    description = row["description"].strip()
+    if not description:
+        raise ValueError("missing description")
+
+    amount = parse_amount(row["amount"], decimal)
+    raw_type = row["transaction_type"].strip().lower()
+    if raw_type:
+        if raw_type not in TYPE_ALIASES:
+            raise ValueError(f"unknown transaction type '{raw_type}'")
+        transaction_type = TYPE_ALIASES[raw_type]
+    else:
+        transaction_type = "expense" if amount < 0 else "income"
+    if amount == 0:
+        raise ValueError("zero amount")
+
+    return Transaction(
+        description=description,
+        category=row["category"].strip() or default_category,
+        amount=abs(amount),
+        transaction_type=transaction_type,
+        date=_parse_date(row["date"], date_format)
+    )
+
+
+def _chunks(rows: Iterable[RawRow], size: int) -> Iterator[List[RawRow]]:
+    """Split an iterable into lists of at most size items"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class StatementImporter:
+    """Import CSV/OFX statements into a database in batches
+
+    Rows are streamed from disk, validated one chunk at a time and written
+    with executemany, one database transaction per chunk, so memory use
+    depends on the batch size and not on the file size.
+    """
+
+    def __init__(self, db: Database, batch_size: int = 5000,
+                 skip_duplicates: bool = True,
+                 progress: Optional[Callable[[ImportResult], None]] = None,
+                 default_category: str = "Uncategorized",
+                 date_format: Optional[str] = None,
+                 decimal: Optional[str] = None):
+        """Initialize importer
+
+        decimal is the decimal mark of CSV amounts, '.' or ','; by
+        default it is recognized per amount, see parse_amount.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.db = db
+        self.batch_size = batch_size
+        self.skip_duplicates = skip_duplicates
+        self.progress = progress
+        self.default_category = default_category
+        self.date_format = date_format
+        self.decimal = decimal
+
+    def import_file(self, path, columns: Optional[Dict[str, str]] = None) -> ImportResult:
+        """Import a .csv or .ofx/.qfx file"""
+        path = Path(path)
+        if path.suffix.lower() in (".ofx", ".qfx"):
+            # OFX has its own date and amount formats, whatever CSVs use
+            return self._import_rows(read_ofx(path), date_format=None, decimal=".")
+        return self.import_rows(read_csv(path, columns))
+
+    def import_rows(self, rows: Iterable[RawRow], decimal: Optional[str] = None) -> ImportResult:
+        """Validate and insert raw rows chunk by chunk
+
+        decimal overrides the importer's decimal mark for these rows.
+        """
+        return self._import_rows(rows, self.date_format, decimal or self.decimal)
+
+    def _import_rows(self, rows: Iterable[RawRow], date_format: Optional[str],
+                     decimal: Optional[str]) -> ImportResult:
+        """Validate and insert raw rows with the given date format and decimal mark"""
+        result = ImportResult()
+        # Duplicates are only checked against rows stored before this import
+        existing_before = self.db.get_last_id() if self.skip_duplicates else None
+
+        for chunk in _chunks(rows, self.batch_size):
+            transactions = []
+            for line, row in chunk:
+                try:
+                    transactions.append(
+                        parse_row(row, self.default_category, date_format, decimal)
+                    )
+                except (KeyError, ValueError) as e:
+                    result.add_error(line, str(e))
+
+            result.rows_read += len(chunk)
+            inserted = self.db.add_transactions(
+                transactions, self.skip_duplicates, existing_before
+            )
+            result.imported += inserted
+            result.duplicates += len(transactions) - inserted
+
+            if self.progress is not None:
+                self.progress(result)
+
+        return result
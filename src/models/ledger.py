@@ -0,0 +1,351 @@
+"""Transactions partitioned into one SQLite file per account and year"""
+import heapq
+import itertools
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from src.utils.profiling import instrument
+from .analytics import Trends
+from .database import Database
+from .query import TransactionFilter
+from .summary import Summary
+from .transaction import Transaction
+
+DEFAULT_ACCOUNT = "main"
+ACCOUNT_NAME = re.compile(r"^[A-Za-z0-9_]+$")
+PARTITION_FILE = re.compile(r"^(?P<account>[A-Za-z0-9_]+)-(?P<year>\d{4})(?P<archived>\.archive)?\.db$")
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Partition:
+    """One account's transactions of one calendar year"""
+    account: str
+    year: int
+    path: Path
+    archived: bool = False
+
+    @property
+    def name(self) -> str:
+        """account-year, as used in the file name"""
+        return f"{self.account}-{self.year}"
+
+
+def _check_account(account: str) -> str:
+    """Reject account names that cannot be used in a file name"""
+    if not ACCOUNT_NAME.match(account):
+        raise ValueError(f"Invalid account name: {account!r} (use letters, digits and _)")
+    return account
+
+
+def _filter_years(transaction_filter: Optional[TransactionFilter]) -> Optional[range]:
+    """Years a filter's date range overlaps, or None if it is unbounded"""
+    if transaction_filter is None:
+        return None
+    start, end = transaction_filter.start_date, transaction_filter.end_date
+    if start is None and end is None:
+        return None
+    first = start.year if start is not None else datetime.min.year
+    if end is None:
+        last = datetime.max.year
+    else:
+        # end is exclusive, so a range ending on 1 January stops the year before
+        last = end.year if end > datetime(end.year, 1, 1) else end.year - 1
+    return range(first, last + 1)
+
+
+@instrument("ledger")
+class Ledger:
+    """Transactions stored as one Database file per account and year
+
+    Files named account-year.db live in root and are opened on first
+    use. Writes are routed by account and transaction date, listings
+    only open the partitions their filter's dates overlap, and
+    aggregates run on every selected partition in parallel and are
+    merged. Transaction ids are only unique within a partition.
+
+    Archived partitions (account-year.archive.db) are compacted,
+    read-only files opened as immutable, so queries on them need no
+    locking and they are skipped entirely by date-pruned queries.
+    """
+
+    def __init__(self, root: str = "data/ledger", workers: Optional[int] = None,
+                 **database_options):
+        """Discover the partitions in root
+
+        database_options are passed to every partition's Database.
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.workers = workers or min(8, (os.cpu_count() or 1) + 4)
+        self._database_options = database_options
+        self._partitions: Dict[Tuple[str, int], Partition] = {}
+        self._databases: Dict[Tuple[str, int], Database] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        for path in self.root.iterdir():
+            match = PARTITION_FILE.match(path.name)
+            if match:
+                partition = Partition(match["account"], int(match["year"]), path,
+                                      bool(match["archived"]))
+                self._partitions[(partition.account, partition.year)] = partition
+
+    def __enter__(self) -> "Ledger":
+        """Use the ledger as a context manager"""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the ledger when leaving the context"""
+        self.close()
+
+    def close(self):
+        """Close every open partition and stop the query threads"""
+        with self._lock:
+            databases = list(self._databases.values())
+            self._databases.clear()
+        for db in databases:
+            db.close()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def accounts(self) -> List[str]:
+        """Names of the accounts with at least one partition"""
+        return sorted({account for account, _ in self._partitions})
+
+    def partitions(self, accounts: Optional[Iterable[str]] = None,
+                   years: Optional[Iterable[int]] = None) -> List[Partition]:
+        """Existing partitions of some accounts and years, oldest first"""
+        accounts = set(accounts) if accounts is not None else None
+        if years is not None and not isinstance(years, range):
+            years = set(years)
+        return sorted(
+            (
+                partition for (account, year), partition in self._partitions.items()
+                if (accounts is None or account in accounts) and (years is None or year in years)
+            ),
+            key=lambda partition: (partition.year, partition.account)
+        )
+
+    def database(self, partition: Partition) -> Database:
+        """The open Database of a partition, opening it if needed"""
+        with self._lock:
+            return self._open((partition.account, partition.year))
+
+    def _open(self, key: Tuple[str, int]) -> Database:
+        """The open Database of a known partition; the caller holds the lock"""
+        db = self._databases.get(key)
+        if db is None:
+            partition = self._partitions[key]
+            db = Database(partition.path, read_only=partition.archived,
+                          **self._database_options)
+            self._databases[key] = db
+        return db
+
+    def _writable(self, account: str, year: int) -> Database:
+        """Database receiving new transactions of an account and year
+
+        The partition is looked up, created and opened under one lock, so
+        concurrent first writes to a year share a single Database.
+        """
+        key = (_check_account(account), year)
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is None:
+                partition = Partition(account, year, self.root / f"{account}-{year}.db")
+                self._partitions[key] = partition
+            elif partition.archived:
+                raise PermissionError(f"Partition {partition.name} is archived; unarchive it first")
+            return self._open(key)
+
+    def _fan_out(self, partitions: List[Partition], query: Callable[[Database], T]) -> List[T]:
+        """Run query on every partition, in parallel when there are several"""
+        databases = [self.database(partition) for partition in partitions]
+        if len(databases) < 2:
+            return [query(db) for db in databases]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="ledger")
+        return list(self._executor.map(query, databases))
+
+    def add_transaction(self, transaction: Transaction, account: str = DEFAULT_ACCOUNT) -> int:
+        """Store a transaction in its account's partition for its year
+
+        Returns its id within that partition.
+        """
+        return self._writable(account, transaction.date.year).add_transaction(transaction)
+
+    def add_transactions(self, transactions: Iterable[Transaction],
+                         account: str = DEFAULT_ACCOUNT, skip_duplicates: bool = False) -> int:
+        """Store many transactions with one database transaction per year
+
+        Returns the number of inserted rows.
+        """
+        by_year: Dict[int, List[Transaction]] = defaultdict(list)
+        for transaction in transactions:
+            by_year[transaction.date.year].append(transaction)
+        return sum(
+            self._writable(account, year).add_transactions(rows, skip_duplicates=skip_duplicates)
+            for year, rows in sorted(by_year.items())
+        )
+
+    def delete_transaction(self, transaction: Transaction, account: str = DEFAULT_ACCOUNT) -> bool:
+        """Delete a stored transaction, found by its id and date"""
+        partition = self._partitions.get((account, transaction.date.year))
+        if partition is None:
+            return False
+        if partition.archived:
+            raise PermissionError(f"Partition {partition.name} is archived; unarchive it first")
+        return self.database(partition).delete_transaction(transaction.id)
+
+    def import_database(self, db: Database, account: str = DEFAULT_ACCOUNT,
+                        chunk_size: int = 10000) -> int:
+        """Copy every transaction of a single-file database into partitions
+
+        Transactions get new ids in their partitions. Returns the number
+        of copied rows.
+        """
+        copied = 0
+        transactions = db.iter_transactions(page_size=chunk_size, descending=False)
+        while True:
+            chunk = list(itertools.islice(transactions, chunk_size))
+            if not chunk:
+                return copied
+            copied += self.add_transactions(chunk, account)
+
+    def iter_transactions(self, transaction_filter: Optional[TransactionFilter] = None,
+                          accounts: Optional[Iterable[str]] = None,
+                          descending: bool = True) -> Iterator[Transaction]:
+        """Lazily iterate over matching transactions ordered by date
+
+        Only partitions whose year overlaps the filter's dates are read,
+        and their pages are merged as they are consumed.
+        """
+        partitions = self.partitions(accounts, _filter_years(transaction_filter))
+        streams = [
+            self.database(partition).iter_transactions(transaction_filter, descending=descending)
+            for partition in partitions
+        ]
+        return heapq.merge(*streams, key=lambda t: t.date, reverse=descending)
+
+    def search(self, text: str, transaction_filter: Optional[TransactionFilter] = None,
+               accounts: Optional[Iterable[str]] = None, limit: int = 50) -> List[Transaction]:
+        """Best full-text matches over all selected partitions
+
+        Ranked like Database.search: shorter texts first, then newest.
+        """
+        partitions = self.partitions(accounts, _filter_years(transaction_filter))
+        results = self._fan_out(partitions, lambda db: db.search(text, transaction_filter, limit))
+        matches = [transaction for found in results for transaction in found]
+        matches.sort(key=lambda t: (len(t.description) + len(t.category), -t.date.timestamp()))
+        return matches[:limit]
+
+    def count_transactions(self, transaction_filter: Optional[TransactionFilter] = None,
+                           accounts: Optional[Iterable[str]] = None) -> int:
+        """Count the transactions matching a filter"""
+        partitions = self.partitions(accounts, _filter_years(transaction_filter))
+        return sum(self._fan_out(partitions, lambda db: db.count_transactions(transaction_filter)))
+
+    def get_summary(self, accounts: Optional[Iterable[str]] = None,
+                    years: Optional[Iterable[int]] = None) -> Summary:
+        """Totals per type and category over the selected partitions"""
+        summary = Summary()
+        for partial in self._fan_out(self.partitions(accounts, years), Database.get_summary):
+            summary.merge(partial)
+        return summary
+
+    def get_category_totals(self, transaction_type: str,
+                            accounts: Optional[Iterable[str]] = None,
+                            years: Optional[Iterable[int]] = None) -> Dict[str, int]:
+        """Total cents per category of one type over the selected partitions"""
+        totals: Dict[str, int] = {}
+        results = self._fan_out(self.partitions(accounts, years),
+                                lambda db: db.get_category_totals(transaction_type))
+        for partial in results:
+            for category, total in partial.items():
+                totals[category] = totals.get(category, 0) + total
+        return totals
+
+    def get_period_totals(self, period: str = "month", transaction_type: Optional[str] = None,
+                          accounts: Optional[Iterable[str]] = None,
+                          years: Optional[Iterable[int]] = None) -> Dict[str, Dict[str, int]]:
+        """Total cents per period and type, ordered by period
+
+        Weeks spanning New Year are reported by two partitions and summed.
+        """
+        totals: Dict[str, Dict[str, int]] = {}
+        results = self._fan_out(self.partitions(accounts, years),
+                                lambda db: db.get_period_totals(period, transaction_type))
+        for partial in results:
+            for key, types in partial.items():
+                merged = totals.setdefault(key, {})
+                for row_type, total in types.items():
+                    merged[row_type] = merged.get(row_type, 0) + total
+        return dict(sorted(totals.items()))
+
+    def get_trends(self, period: str = "month", accounts: Optional[Iterable[str]] = None,
+                   years: Optional[Iterable[int]] = None) -> Trends:
+        """Totals per time bucket, type and category over the selected partitions"""
+        trends = Trends(period)
+        for partial in self._fan_out(self.partitions(accounts, years),
+                                     lambda db: db.get_trends(period)):
+            trends.merge(partial)
+        return trends
+
+    def get_balance(self, accounts: Optional[Iterable[str]] = None,
+                    years: Optional[Iterable[int]] = None) -> int:
+        """Incomes minus expenses in cents over the selected partitions"""
+        return sum(self._fan_out(self.partitions(accounts, years), Database.get_balance))
+
+    def archive(self, account: str, year: int) -> Partition:
+        """Compact a partition and make it a read-only archive
+
+        The file is checkpointed out of WAL mode, vacuumed, renamed to
+        account-year.archive.db and made read-only on disk.
+        """
+        partition = self._partitions[(account, year)]
+        if partition.archived:
+            return partition
+        self._close_partition(partition)
+        # Opening it writable once applies any pending migrations
+        Database(partition.path, **self._database_options).close()
+        conn = sqlite3.connect(partition.path)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("PRAGMA journal_mode = DELETE")
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        path = partition.path.with_name(f"{partition.name}.archive.db")
+        partition.path.rename(path)
+        path.chmod(0o444)
+        archived = replace(partition, path=path, archived=True)
+        self._partitions[(account, year)] = archived
+        return archived
+
+    def unarchive(self, account: str, year: int) -> Partition:
+        """Make an archived partition writable again"""
+        partition = self._partitions[(account, year)]
+        if not partition.archived:
+            return partition
+        self._close_partition(partition)
+        path = partition.path.with_name(f"{partition.name}.db")
+        partition.path.chmod(0o644)
+        partition.path.rename(path)
+        restored = replace(partition, path=path, archived=False)
+        self._partitions[(account, year)] = restored
+        return restored
+
+    def _close_partition(self, partition: Partition):
+        """Close a partition's Database if it is open"""
+        with self._lock:
+            db = self._databases.pop((partition.account, partition.year), None)
+        if db is not None:
+            db.close()
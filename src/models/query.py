@@ -0,0 +1,104 @@
+"""Filters and pagination for transaction queries"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from . import search
+from .transaction import Transaction
+
+# Columns transactions can be ordered by; ties are broken by id
+SORT_COLUMNS = ("date", "amount", "description", "category")
+
+# Keyset cursor: (sort column value, id) of the last row of a page
+Cursor = Tuple[Any, int]
+
+
+def _escape_like(text: str) -> str:
+    """Escape LIKE wildcards so text is matched literally"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@dataclass
+class TransactionFilter:
+    """Criteria selecting a subset of transactions
+
+    Dates are compared as start_date <= date < end_date, amounts are
+    inclusive bounds in cents and description matches a case-insensitive
+    substring. search uses the full-text index: every word must start a
+    word of the description or category.
+    """
+    transaction_type: Optional[str] = None
+    category: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    min_amount: Optional[int] = None
+    max_amount: Optional[int] = None
+    description: Optional[str] = None
+    search: Optional[str] = None
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        """Build the WHERE conditions and parameters for this filter"""
+        conditions = []
+        params: List[Any] = []
+        if self.transaction_type is not None:
+            conditions.append("transaction_type = ?")
+            params.append(self.transaction_type)
+        if self.category is not None:
+            conditions.append("category = ?")
+            params.append(self.category)
+        if self.start_date is not None:
+            conditions.append("date >= ?")
+            params.append(self.start_date.isoformat())
+        if self.end_date is not None:
+            conditions.append("date < ?")
+            params.append(self.end_date.isoformat())
+        if self.min_amount is not None:
+            conditions.append("amount >= ?")
+            params.append(self.min_amount)
+        if self.max_amount is not None:
+            conditions.append("amount <= ?")
+            params.append(self.max_amount)
+        if self.description:
+            conditions.append("description LIKE ? ESCAPE '\\'")
+            params.append(f"%{_escape_like(self.description)}%")
+        match = search.fts_query(self.search) if self.search else None
+        if match is not None:
+            conditions.append(
+                f"id IN (SELECT rowid FROM {search.FTS_TABLE} WHERE {search.FTS_TABLE} MATCH ?)"
+            )
+            params.append(match)
+        return " AND ".join(conditions), params
+
+    def matches(self, transaction: Transaction) -> bool:
+        """Check whether a transaction satisfies this filter"""
+        if self.transaction_type is not None and transaction.transaction_type != self.transaction_type:
+            return False
+        if self.category is not None and transaction.category != self.category:
+            return False
+        if self.start_date is not None and transaction.date < self.start_date:
+            return False
+        if self.end_date is not None and transaction.date >= self.end_date:
+            return False
+        if self.min_amount is not None and transaction.amount < self.min_amount:
+            return False
+        if self.max_amount is not None and transaction.amount > self.max_amount:
+            return False
+        if self.description and self.description.lower() not in transaction.description.lower():
+            return False
+        if self.search and not search.matches(self.search, transaction.description, transaction.category):
+            return False
+        return True
+
+
+def sort_key(transaction: Transaction, order_by: str) -> Cursor:
+    """Get the (sort value, id) key of a transaction as SQLite orders it"""
+    value = getattr(transaction, order_by)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return value, transaction.id
+
+
+@dataclass
+class Page:
+    """One page of transactions and the cursor to fetch the next one"""
+    transactions: List[Transaction] = field(default_factory=list)
+    next_cursor: Optional[Cursor] = None
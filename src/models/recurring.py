@@ -0,0 +1,110 @@
+"""Rules creating a transaction at regular intervals"""
+import calendar
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, Literal, Optional, Tuple
+from .transaction import Transaction
+
+FREQUENCIES = ("daily", "weekly", "monthly", "yearly")
+RRULE_FREQUENCIES = {"DAILY": "daily", "WEEKLY": "weekly", "MONTHLY": "monthly", "YEARLY": "yearly"}
+
+
+def _add_months(day: date, months: int) -> date:
+    """Same day months later, clamped to the end of shorter months"""
+    year, month = divmod(day.month - 1 + months, 12)
+    year += day.year
+    month += 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+@dataclass
+class RecurringRule:
+    """A transaction repeated every interval days, weeks, months or years
+
+    Occurrences are counted from start: occurrence n falls n * interval
+    periods after it, so a rule starting on the 31st is due on the last
+    day of shorter months and back on the 31st afterwards. materialized
+    is how many occurrences have been stored as transactions so far;
+    the rule ends after end, if given.
+    """
+    description: str
+    category: str
+    amount: int
+    transaction_type: Literal["income", "expense"]
+    frequency: str = "monthly"
+    start: date = None
+    interval: int = 1
+    end: Optional[date] = None
+    materialized: int = 0
+    id: int = None
+
+    def __post_init__(self):
+        """Default start to today and validate the schedule"""
+        if self.start is None:
+            self.start = date.today()
+        if isinstance(self.start, datetime):
+            self.start = self.start.date()
+        if self.frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency: {self.frequency}")
+        if self.interval < 1:
+            raise ValueError("interval must be positive")
+        if self.amount <= 0:
+            raise ValueError("amount must be positive")
+
+    @classmethod
+    def from_rrule(cls, rrule: str, **fields) -> "RecurringRule":
+        """Rule from an iCalendar RRULE such as FREQ=MONTHLY;INTERVAL=2
+
+        FREQ, INTERVAL and UNTIL (YYYYMMDD) are supported; the remaining
+        fields are passed on as keyword arguments.
+        """
+        parts = dict(part.split("=", 1) for part in rrule.upper().removeprefix("RRULE:").split(";"))
+        unsupported = parts.keys() - {"FREQ", "INTERVAL", "UNTIL"}
+        if unsupported:
+            raise ValueError(f"Unsupported RRULE parts: {', '.join(sorted(unsupported))}")
+        if parts.get("FREQ") not in RRULE_FREQUENCIES:
+            raise ValueError(f"Unsupported RRULE frequency: {parts.get('FREQ')}")
+        fields["frequency"] = RRULE_FREQUENCIES[parts["FREQ"]]
+        fields["interval"] = int(parts.get("INTERVAL", 1))
+        if "UNTIL" in parts:
+            fields["end"] = datetime.strptime(parts["UNTIL"][:8], "%Y%m%d").date()
+        return cls(**fields)
+
+    def occurrence(self, index: int) -> date:
+        """Date of occurrence index, counting the start as 0"""
+        step = index * self.interval
+        if self.frequency == "daily":
+            return self.start + timedelta(days=step)
+        if self.frequency == "weekly":
+            return self.start + timedelta(weeks=step)
+        if self.frequency == "monthly":
+            return _add_months(self.start, step)
+        return _add_months(self.start, 12 * step)
+
+    @property
+    def next_date(self) -> Optional[date]:
+        """Date of the first occurrence not materialized, None once the rule ended"""
+        day = self.occurrence(self.materialized)
+        if self.end is not None and day > self.end:
+            return None
+        return day
+
+    def due(self, until: date) -> Iterator[Tuple[int, date]]:
+        """Index and date of every occurrence not materialized up to until"""
+        last = until if self.end is None else min(until, self.end)
+        index = self.materialized
+        day = self.occurrence(index)
+        while day <= last:
+            yield index, day
+            index += 1
+            day = self.occurrence(index)
+
+    def transaction(self, day: date) -> Transaction:
+        """The transaction of the occurrence on day"""
+        return Transaction(
+            description=self.description,
+            category=self.category,
+            amount=self.amount,
+            transaction_type=self.transaction_type,
+            date=datetime.combine(day, time()),
+        )
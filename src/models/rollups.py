@@ -0,0 +1,143 @@
+"""Summary tables kept up to date by triggers on transactions"""
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# Trigger adding each inserted row; bulk inserts may replace it with add_rows
+INSERT_TRIGGER = "rollups_insert"
+
+# Rollup table -> (key columns, key expressions over transactions)
+ROLLUPS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "totals_by_type": (
+        ("transaction_type",),
+        ("{row}.transaction_type",),
+    ),
+    "totals_by_category": (
+        ("transaction_type", "category"),
+        ("{row}.transaction_type", "{row}.category"),
+    ),
+    "totals_by_month": (
+        ("month", "transaction_type", "category"),
+        ("strftime('%Y-%m', {row}.date)", "{row}.transaction_type", "{row}.category"),
+    ),
+}
+
+
+def _create_table(table: str) -> str:
+    """CREATE TABLE statement for a rollup"""
+    keys, _ = ROLLUPS[table]
+    columns = ", ".join(f"{key} TEXT NOT NULL" for key in keys)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table} ("
+        f"{columns}, total INTEGER NOT NULL, count INTEGER NOT NULL, "
+        f"PRIMARY KEY ({', '.join(keys)})) WITHOUT ROWID"
+    )
+
+
+def _add_row(table: str) -> str:
+    """Trigger statement adding NEW to a rollup"""
+    keys, expressions = ROLLUPS[table]
+    values = ", ".join(e.format(row="NEW") for e in expressions)
+    return (
+        f"INSERT INTO {table} ({', '.join(keys)}, total, count) "
+        f"VALUES ({values}, NEW.amount, 1) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET "
+        f"total = total + excluded.total, count = count + 1;"
+    )
+
+
+def _remove_row(table: str) -> str:
+    """Trigger statements subtracting OLD from a rollup"""
+    keys, expressions = ROLLUPS[table]
+    match = " AND ".join(
+        f"{key} = {e.format(row='OLD')}" for key, e in zip(keys, expressions)
+    )
+    return (
+        f"UPDATE {table} SET total = total - OLD.amount, count = count - 1 WHERE {match}; "
+        f"DELETE FROM {table} WHERE {match} AND count <= 0;"
+    )
+
+
+def _aggregate(table: str, where: str = "") -> str:
+    """SELECT recomputing a rollup from the transactions table"""
+    keys, expressions = ROLLUPS[table]
+    key_sql = ", ".join(
+        f"{e.format(row='transactions')} AS {key}" for key, e in zip(keys, expressions)
+    )
+    return (
+        f"SELECT {key_sql}, SUM(amount), COUNT(*) FROM transactions {where} "
+        f"GROUP BY {', '.join(keys)}"
+    )
+
+
+def _populate(table: str) -> str:
+    """INSERT filling an empty rollup from the transactions table"""
+    return f"INSERT INTO {table} {_aggregate(table)}"
+
+
+def migration_statements() -> Tuple[str, ...]:
+    """Statements creating, filling and maintaining all rollups"""
+    tables = list(ROLLUPS)
+    statements = [_create_table(table) for table in tables]
+    statements += [_populate(table) for table in tables]
+    add = " ".join(_add_row(table) for table in tables)
+    remove = " ".join(_remove_row(table) for table in tables)
+    statements += [
+        f"CREATE TRIGGER IF NOT EXISTS {INSERT_TRIGGER} AFTER INSERT ON transactions "
+        f"BEGIN {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS rollups_delete AFTER DELETE ON transactions "
+        f"BEGIN {remove} END",
+        f"CREATE TRIGGER IF NOT EXISTS rollups_update AFTER UPDATE ON transactions "
+        f"BEGIN {remove} {add} END",
+    ]
+    return tuple(statements)
+
+
+@dataclass
+class Drift:
+    """A rollup row that does not match the transactions table"""
+    table: str
+    key: tuple
+    stored: Tuple[int, int]
+    actual: Tuple[int, int]
+
+
+def verify(cursor: sqlite3.Cursor) -> List[Drift]:
+    """Compare every rollup with a fresh aggregate of transactions"""
+    drifts = []
+    for table, (keys, _) in ROLLUPS.items():
+        width = len(keys)
+        cursor.execute(f"SELECT * FROM {table}")
+        stored = {row[:width]: row[width:] for row in cursor.fetchall()}
+        cursor.execute(_aggregate(table))
+        actual = {row[:width]: row[width:] for row in cursor.fetchall()}
+        for key in stored.keys() | actual.keys():
+            have = stored.get(key, (0, 0))
+            want = actual.get(key, (0, 0))
+            if have != want:
+                drifts.append(Drift(table, key, have, want))
+    return drifts
+
+
+def add_rows(cursor: sqlite3.Cursor, after_id: int):
+    """Add the transactions with an id above after_id to every rollup
+
+    One grouped upsert per table, for bulk inserts made without the
+    insert trigger.
+    """
+    for table, (keys, _) in ROLLUPS.items():
+        columns = ", ".join(keys)
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}, total, count) "
+            f"{_aggregate(table, 'WHERE id > ?')} "
+            f"ON CONFLICT ({columns}) DO UPDATE SET "
+            f"total = total + excluded.total, count = count + excluded.count",
+            (after_id,)
+        )
+
+
+def rebuild(cursor: sqlite3.Cursor):
+    """Recompute every rollup from scratch"""
+    for table in ROLLUPS:
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(_populate(table))
@@ -0,0 +1,92 @@
+"""Full-text index over transaction descriptions and categories"""
+import re
+import sqlite3
+import unicodedata
+from typing import List, Optional, Tuple
+
+FTS_TABLE = "transactions_fts"
+# Trigger indexing each inserted row; bulk inserts may replace it with add_rows
+INSERT_TRIGGER = "search_insert"
+
+_TOKEN = re.compile(r"\w+")
+
+
+def migration_statements() -> Tuple[str, ...]:
+    """Statements creating, filling and maintaining the FTS5 index
+
+    The index stores no text of its own (external content); triggers keep
+    it in step with inserts, deletes and edits of the indexed columns.
+    """
+    insert = (
+        f"INSERT INTO {FTS_TABLE} (rowid, description, category) "
+        f"VALUES (NEW.id, NEW.description, NEW.category);"
+    )
+    delete = (
+        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, description, category) "
+        f"VALUES ('delete', OLD.id, OLD.description, OLD.category);"
+    )
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"description, category, content='transactions', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='1 2 3 4 5')",
+        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')",
+        f"CREATE TRIGGER IF NOT EXISTS {INSERT_TRIGGER} AFTER INSERT ON transactions "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS search_delete AFTER DELETE ON transactions "
+        f"BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS search_update "
+        f"AFTER UPDATE OF description, category ON transactions "
+        f"BEGIN {delete} {insert} END",
+    )
+
+
+def _fold(text: str) -> str:
+    """Lower-case text and strip diacritics like the unicode61 tokenizer"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokens(text: str) -> List[str]:
+    """Words of text as the index sees them"""
+    return _TOKEN.findall(_fold(text))
+
+
+def fts_query(text: str) -> Optional[str]:
+    """MATCH expression for search-as-you-type input
+
+    Every word must appear, except the last one, which is still being
+    typed and may be the start of a word. User input is tokenized and
+    quoted, so FTS5 operators in it are searched for literally. Returns
+    None if text has no words.
+    """
+    words = tokens(text)
+    if not words:
+        return None
+    return " ".join([f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*'])
+
+
+def matches(text: str, *fields: str) -> bool:
+    """Whether fields satisfy fts_query(text), evaluated in Python"""
+    words = tokens(text)
+    if not words:
+        return True
+    indexed = {token for field in fields for token in tokens(field)}
+    last = words[-1]
+    return (
+        all(word in indexed for word in words[:-1])
+        and any(token.startswith(last) for token in indexed)
+    )
+
+
+def add_rows(cursor: sqlite3.Cursor, after_id: int):
+    """Index the transactions with an id above after_id in one statement"""
+    cursor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, description, category) "
+        f"SELECT id, description, category FROM transactions WHERE id > ?",
+        (after_id,)
+    )
+
+
+def rebuild(cursor: sqlite3.Cursor):
+    """Recreate the index from the transactions table"""
+    cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
@@ -0,0 +1,70 @@
+"""Pre-aggregated transaction summaries"""
+from dataclasses import dataclass, field
+from typing import Dict
+from .events import ChangeEvent
+from .transaction import Transaction
+
+
+@dataclass
+class Summary:
+    """Aggregated totals in cents per transaction type and per category"""
+    totals: Dict[str, int] = field(default_factory=dict)
+    by_category: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def total_expenses(self) -> int:
+        """Total amount of expenses"""
+        return self.totals.get("expense", 0)
+
+    @property
+    def total_incomes(self) -> int:
+        """Total amount of incomes"""
+        return self.totals.get("income", 0)
+
+    @property
+    def balance(self) -> int:
+        """Current balance (incomes - expenses)"""
+        return self.total_incomes - self.total_expenses
+
+    def categories(self, transaction_type: str) -> Dict[str, int]:
+        """Get per-category totals for a transaction type"""
+        return dict(self.by_category.get(transaction_type, {}))
+
+    def merge(self, other: "Summary") -> "Summary":
+        """Add the totals of another summary to this one and return it"""
+        for transaction_type, total in other.totals.items():
+            self.totals[transaction_type] = self.totals.get(transaction_type, 0) + total
+        for transaction_type, categories in other.by_category.items():
+            merged = self.by_category.setdefault(transaction_type, {})
+            for category, total in categories.items():
+                merged[category] = merged.get(category, 0) + total
+        return self
+
+    def _add(self, transaction: Transaction, sign: int):
+        """Add (sign=1) or remove (sign=-1) one transaction from the totals"""
+        amount = sign * transaction.amount
+        transaction_type = transaction.transaction_type
+        self.totals[transaction_type] = self.totals.get(transaction_type, 0) + amount
+        categories = self.by_category.setdefault(transaction_type, {})
+        total = categories.get(transaction.category, 0) + amount
+        if total == 0:
+            categories.pop(transaction.category, None)
+        else:
+            categories[transaction.category] = total
+
+    def apply(self, event: ChangeEvent) -> bool:
+        """Update totals in place from a change event
+
+        Returns False for reset events, which need a fresh summary.
+        """
+        if event.kind == "reset":
+            return False
+        for transaction in event.previous:
+            self._add(transaction, -1)
+        if event.kind == "delete":
+            for transaction in event.transactions:
+                self._add(transaction, -1)
+        else:
+            for transaction in event.transactions:
+                self._add(transaction, 1)
+        return True
@@ -2,14 +2,18 @@
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Literal
+from src.utils.money import format_money
 
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
-    """Represents a financial transaction (income or expense)"""
+    """Represents a financial transaction (income or expense)
+
+    amount is a positive number of cents; the type gives its sign.
+    """
     description: str
     category: str
-    amount: float
+    amount: int
     transaction_type: Literal["income", "expense"]
     date: datetime = None
     id: int = None
@@ -22,7 +26,7 @@ class Transaction:
     def __str__(self) -> str:
         """String representation of transaction"""
         sign = "+" if self.transaction_type == "income" else "-"
-        return f"{self.description} ({self.category}): {sign}€{self.amount:.2f}"
+        return f"{self.description} ({self.category}): {sign}{format_money(self.amount)}"
 
     def to_dict(self) -> dict:
         """Convert transaction to dictionary"""
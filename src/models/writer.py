@@ -0,0 +1,166 @@
+"""Single writer thread committing queued writes in groups"""
+import queue
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional
+from .connection import is_busy
+from .database import Database
+from .transaction import Transaction
+
+
+@dataclass
+class WriterStats:
+    """Counters of a WriteQueue"""
+    writes: int = 0
+    batches: int = 0
+    retries: int = 0
+    failed_batches: int = 0
+
+    @property
+    def writes_per_batch(self) -> float:
+        """Average group commit size"""
+        return self.writes / self.batches if self.batches else 0.0
+
+
+@dataclass
+class _Request:
+    """One queued write and the future receiving its result"""
+    kind: str
+    payload: Any
+    future: Future
+
+
+class WriteQueue:
+    """Send all writes of a Database through one thread and queue
+
+    Writes return futures at once. The writer thread takes the first
+    queued write, waits up to max_delay seconds for up to max_batch more
+    and commits them together with Database.write_batch, so a burst of
+    writes costs one commit instead of one each. The transaction starts
+    with BEGIN IMMEDIATE, so another process holding the write lock
+    makes it wait for the busy timeout instead of failing halfway; if
+    the database is still busy the batch is retried with exponential
+    backoff and jitter, up to retries times.
+    """
+
+    def __init__(self, db: Database, max_batch: int = 500, max_delay: float = 0.005,
+                 retries: int = 10, backoff: float = 0.01, max_backoff: float = 1.0):
+        """Start the writer thread"""
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stats = WriterStats()
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "WriteQueue":
+        """Use the queue as a context manager"""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Commit what is queued and stop the writer when leaving the context"""
+        self.close()
+
+    def submit(self, kind: str, payload: Any) -> Future:
+        """Queue one write_batch operation and return its future"""
+        future: Future = Future()
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("WriteQueue is closed")
+            self._queue.put(_Request(kind, payload, future))
+        return future
+
+    def add_transaction(self, transaction: Transaction) -> Future:
+        """Queue an insert; the future gives the new id"""
+        return self.submit("insert", transaction)
+
+    def add_transactions(self, transactions: Iterable[Transaction]) -> List[Future]:
+        """Queue inserts; the futures give the new ids in order"""
+        return [self.submit("insert", transaction) for transaction in transactions]
+
+    def update_transaction(self, transaction: Transaction) -> Future:
+        """Queue an update; the future tells whether the row existed"""
+        return self.submit("update", transaction)
+
+    def delete_transaction(self, transaction_id: int) -> Future:
+        """Queue a delete; the future tells whether the row existed"""
+        return self.submit("delete", transaction_id)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Commit every queued write, then stop the writer thread
+
+        Returns False if the thread did not finish within timeout.
+        """
+        with self._close_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _run(self):
+        """Collect and commit batches until close() is called"""
+        stopping = False
+        while not stopping:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    request = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._commit(batch)
+
+    def _commit(self, batch: List[_Request]):
+        """Write a batch, retrying while busy, and resolve its futures"""
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        operations = [(request.kind, request.payload) for request in batch]
+        attempt = 0
+        while True:
+            try:
+                results = self.db.write_batch(operations)
+                break
+            except sqlite3.OperationalError as e:
+                if not is_busy(e) or attempt >= self.retries:
+                    self._fail(batch, e)
+                    return
+            except Exception as e:
+                self._fail(batch, e)
+                return
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.5, 1.5))
+            attempt += 1
+            self.stats.retries += 1
+
+        self.stats.batches += 1
+        self.stats.writes += len(batch)
+        for request, result in zip(batch, results):
+            if isinstance(result, Exception):
+                request.future.set_exception(result)
+            else:
+                request.future.set_result(result)
+
+    def _fail(self, batch: List[_Request], error: Exception):
+        """Fail every write of a batch that could not be committed"""
+        self.stats.failed_batches += 1
+        for request in batch:
+            request.future.set_exception(error)
@@ -0,0 +1,25 @@
+"""Qt signal bridge for budget alerts"""
+from PyQt6.QtCore import QObject, pyqtSignal
+from src.models import BudgetAlert, BudgetEvaluator
+
+
+class BudgetSignals(QObject):
+    """Re-emit BudgetEvaluator alerts as a Qt signal
+
+    Alerts are raised on the thread that wrote the transaction (the
+    WriteQueue thread in the app); slots connected to alert run on the
+    GUI thread.
+    """
+
+    alert = pyqtSignal(BudgetAlert)
+
+    def __init__(self, evaluator: BudgetEvaluator, parent=None):
+        """Subscribe to budget alerts"""
+        super().__init__(parent)
+        self.evaluator = evaluator
+        self._listener = self.alert.emit
+        evaluator.subscribe(self._listener)
+
+    def detach(self):
+        """Stop forwarding alerts"""
+        self.evaluator.unsubscribe(self._listener)
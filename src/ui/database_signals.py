@@ -0,0 +1,24 @@
+"""Qt signal bridge for database change events"""
+from PyQt6.QtCore import QObject, pyqtSignal
+from src.models import ChangeEvent, Database
+
+
+class DatabaseSignals(QObject):
+    """Re-emit Database change events as a Qt signal
+
+    Slots connected to changed run on the thread owning this object (the
+    GUI thread), even when the write happened on another thread.
+    """
+
+    changed = pyqtSignal(ChangeEvent)
+
+    def __init__(self, db: Database, parent=None):
+        """Subscribe to database changes"""
+        super().__init__(parent)
+        self.db = db
+        self._listener = self.changed.emit
+        db.subscribe(self._listener)
+
+    def detach(self):
+        """Stop forwarding database changes"""
+        self.db.unsubscribe(self._listener)
@@ -0,0 +1,104 @@
+"""Background execution of database work"""
+from typing import Callable, Dict, Optional, Set
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    """Signals reporting the outcome of a worker"""
+
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(Exception)
+
+
+class Worker(QRunnable):
+    """Run one callable on a pool thread"""
+
+    def __init__(self, func: Callable, *args, **kwargs):
+        """Initialize worker"""
+        super().__init__()
+        self.setAutoDelete(False)
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+        self.signals = WorkerSignals()
+
+    def run(self):
+        """Call the function and emit its result or error"""
+        if self.cancelled:
+            # Still report back so the executor can release the worker
+            self.signals.finished.emit(None)
+            return
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+
+class DatabaseExecutor(QObject):
+    """Run database queries off the GUI thread and deliver results there
+
+    Each request has a key; submitting a new request with the same key
+    cancels the previous one if it has not started and drops its result
+    if it has, so only the latest refresh reaches the UI.
+    """
+
+    def __init__(self, parent=None, max_threads: int = 2):
+        """Initialize executor with its own thread pool"""
+        super().__init__(parent)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        # Idle threads would otherwise exit after 30 s, and each new one
+        # opens a new pooled SQLite connection
+        self.pool.setExpiryTimeout(-1)
+        self._latest: Dict[str, Worker] = {}
+        # Keeps workers alive until they report back
+        self._workers: Set[Worker] = set()
+
+    def submit(self, key: str, func: Callable, *args,
+               on_result: Optional[Callable] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               **kwargs) -> Worker:
+        """Queue func(*args, **kwargs), replacing any pending request for key"""
+        self.cancel(key)
+        worker = Worker(func, *args, **kwargs)
+        worker.signals.finished.connect(
+            lambda result, w=worker: self._deliver(key, w, on_result, result)
+        )
+        worker.signals.failed.connect(
+            lambda error, w=worker: self._deliver(key, w, on_error, error)
+        )
+        self._latest[key] = worker
+        self._workers.add(worker)
+        self.pool.start(worker)
+        return worker
+
+    def cancel(self, key: str):
+        """Cancel the pending request for key, if any"""
+        worker = self._latest.pop(key, None)
+        if worker is not None:
+            worker.cancelled = True
+            if self.pool.tryTake(worker):
+                self._workers.discard(worker)
+
+    def is_pending(self, key: str) -> bool:
+        """Whether a request for key has not delivered its result yet"""
+        return key in self._latest
+
+    def _deliver(self, key: str, worker: Worker, callback: Optional[Callable], value):
+        """Hand a result to its callback unless a newer request replaced it"""
+        self._workers.discard(worker)
+        if worker.cancelled or self._latest.get(key) is not worker:
+            return
+        del self._latest[key]
+        if callback is not None:
+            callback(value)
+
+    def shutdown(self, timeout_ms: int = 5000) -> bool:
+        """Cancel queued work and wait for running workers to finish"""
+        for key in list(self._latest):
+            self.cancel(key)
+        self.pool.clear()
+        return self.pool.waitForDone(timeout_ms)
@@ -1,25 +1,86 @@
 """Main application window"""
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QLabel, QTabWidget, QMessageBox
+    QLabel, QTabWidget, QMessageBox, QInputDialog
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont, QIcon
-from src.models import Database, Transaction
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QFont, QIcon, QKeySequence, QShortcut
+from src.models import (
+    BackupStore, BudgetAlert, BudgetEvaluator, ChangeEvent, Database, RecurringRule, Summary,
+    Transaction, TransactionFilter, TransferResult, Trends, WriteQueue
+)
+from src.ui.budget_signals import BudgetSignals
+from src.ui.database_signals import DatabaseSignals
+from src.ui.executor import DatabaseExecutor
 from src.ui.widgets.transaction_form import TransactionForm
 from src.ui.widgets.transaction_list import TransactionList
-from src.ui.widgets.charts import PieChart, BarChart
+from src.utils.money import format_money
+from src.utils.profiling import profiler, traced
+
+# Delay used to coalesce bursts of changes into one redraw
+REFRESH_DEBOUNCE_MS = 50
+# How long notices such as budget alerts stay in the status bar
+STATUS_MESSAGE_MS = 10000
+# How often due recurring transactions are created and budget periods checked
+RECURRING_CHECK_MS = 60 * 60 * 1000
 
 
 class MainWindow(QMainWindow):
-    """Main application window"""
+    """Main application window
+
+    Only the first tab is built up front; the others, and matplotlib with
+    them, are created when first opened. Data is loaded once the event
+    loop starts, after the window has been shown.
+    """
+
+    data_loaded = pyqtSignal()
+    # (future, on_result, on_error) of a finished write, moved to the GUI thread
+    _write_finished = pyqtSignal(object, object, object)
 
     def __init__(self):
         """Initialize main window"""
         super().__init__()
         self.db = Database()
+        self.writer = WriteQueue(self.db)
+        self.backups = BackupStore()
+        self._write_finished.connect(self._on_write_finished)
+        self.summary = Summary()
+        self.trends = Trends()
+        self.bar_chart = None
+        self.trend_chart = None
+        self.transaction_lists: Dict[str, TransactionList] = {}
+        self.category_charts = {}
+        self.profiler_panel = None
+        self.budgets = None
+        self.budget_signals = None
+        self.total_labels: Dict[str, QLabel] = {}
+        self._tab_builders: Dict[int, Callable[[QWidget], None]] = {}
+        self._dirty_types = set()
+        self._reload_pending = False
+        # Data versions the shown summary and trends were read at
+        self._summary_version = 0
+        self._trends_version = 0
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(REFRESH_DEBOUNCE_MS)
+        self._refresh_timer.timeout.connect(self._flush_changes)
+
+        self._recurring_timer = QTimer(self)
+        self._recurring_timer.setInterval(RECURRING_CHECK_MS)
+        self._recurring_timer.timeout.connect(self._materialize_recurring)
+        self._recurring_timer.timeout.connect(self._check_budget_periods)
+
+        self.executor = DatabaseExecutor(self)
+        self.db_signals = DatabaseSignals(self.db, self)
+        self.db_signals.changed.connect(self._on_database_changed)
+
         self._setup_ui()
-        self._load_data()
+        self._setup_menu()
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, self._show_profiler_panel)
+        QTimer.singleShot(0, self._load_data)
 
     def _setup_ui(self):
         """Setup the user interface"""
@@ -55,127 +116,380 @@ class MainWindow(QMainWindow):
         
         self.transaction_form = TransactionForm()
         self.transaction_form.transaction_added.connect(self._add_transaction)
+        self.transaction_form.rule_added.connect(self._add_recurring_rule)
         transaction_layout.addWidget(self.transaction_form)
         
         transaction_tab.setLayout(transaction_layout)
         self.tabs.addTab(transaction_tab, "Add Transaction")
 
-        # Overview Tab
-        overview_tab = QWidget()
+        # Remaining tabs are built on first activation
+        self._add_lazy_tab("Overview", self._build_overview_tab)
+        self._add_lazy_tab("Expenses", lambda tab: self._build_type_tab(tab, "expense"))
+        self._add_lazy_tab("Incomes", lambda tab: self._build_type_tab(tab, "income"))
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+
+        main_layout.addWidget(self.tabs)
+        central_widget.setLayout(main_layout)
+
+    def _setup_menu(self):
+        """Create the File menu"""
+        file_menu = self.menuBar().addMenu("&File")
+        backup_action = file_menu.addAction("Back Up Now")
+        backup_action.setShortcut(QKeySequence("Ctrl+B"))
+        backup_action.triggered.connect(self._back_up)
+        restore_action = file_menu.addAction("Restore Backup...")
+        restore_action.triggered.connect(self._restore_backup)
+
+    def _add_lazy_tab(self, title: str, builder: Callable[[QWidget], None]):
+        """Add an empty tab that builder fills when it is first shown"""
+        index = self.tabs.addTab(QWidget(), title)
+        self._tab_builders[index] = builder
+
+    def _on_tab_changed(self, index: int):
+        """Build a lazy tab the first time it is activated"""
+        builder = self._tab_builders.pop(index, None)
+        if builder is not None:
+            builder(self.tabs.widget(index))
+            self._dirty_types.update(("expense", "income"))
+            self._render_summary()
+
+    def _build_overview_tab(self, overview_tab: QWidget):
+        """Create the overview charts"""
+        from src.ui.widgets.charts import BarChart, TrendChart
+
         overview_layout = QHBoxLayout()
         
         charts_container = QVBoxLayout()
         self.bar_chart = BarChart("Expenses vs Incomes")
         charts_container.addWidget(self.bar_chart)
+        self.trend_chart = TrendChart("Monthly Trends")
+        charts_container.addWidget(self.trend_chart)
         overview_layout.addLayout(charts_container)
         
         overview_tab.setLayout(overview_layout)
-        self.tabs.addTab(overview_tab, "Overview")
 
-        # Expenses Tab
-        expenses_tab = QWidget()
-        expenses_layout = QHBoxLayout()
-        
-        expenses_list_layout = QVBoxLayout()
-        expenses_list_layout.addWidget(QLabel("Recent Expenses:"))
-        self.expenses_list = TransactionList()
-        expenses_list_layout.addWidget(self.expenses_list)
-        expenses_layout.addLayout(expenses_list_layout)
-        
-        expenses_chart_layout = QVBoxLayout()
-        expenses_chart_layout.addWidget(QLabel("Expenses by Category:"))
-        self.expenses_chart = PieChart("Expenses Breakdown")
-        expenses_chart_layout.addWidget(self.expenses_chart)
-        expenses_layout.addLayout(expenses_chart_layout)
-        
-        expenses_info_layout = QVBoxLayout()
-        expenses_info_layout.addWidget(QLabel("Total Expenses:"))
-        self.total_expenses_label = QLabel("€0.00")
-        self.total_expenses_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-        self.total_expenses_label.setStyleSheet("color: #dc3545;")
-        expenses_info_layout.addWidget(self.total_expenses_label)
-        expenses_info_layout.addStretch()
-        expenses_layout.addLayout(expenses_info_layout)
-        
-        expenses_tab.setLayout(expenses_layout)
-        self.tabs.addTab(expenses_tab, "Expenses")
+    def _build_type_tab(self, tab: QWidget, transaction_type: str):
+        """Create the list, category chart and total of one transaction type"""
+        from src.ui.widgets.charts import PieChart
 
-        # Incomes Tab
-        incomes_tab = QWidget()
-        incomes_layout = QHBoxLayout()
+        name = "Expenses" if transaction_type == "expense" else "Incomes"
+        color = "#dc3545" if transaction_type == "expense" else "#28a745"
+        layout = QHBoxLayout()
         
-        incomes_list_layout = QVBoxLayout()
-        incomes_list_layout.addWidget(QLabel("Recent Incomes:"))
-        self.incomes_list = TransactionList()
-        incomes_list_layout.addWidget(self.incomes_list)
-        incomes_layout.addLayout(incomes_list_layout)
+        list_layout = QVBoxLayout()
+        list_layout.addWidget(QLabel(f"Recent {name}:"))
+        transaction_list = TransactionList(
+            self.db, TransactionFilter(transaction_type=transaction_type),
+            executor=self.executor, key=f"list_{transaction_type}"
+        )
+        transaction_list.transaction_deleted.connect(self._delete_transaction)
+        transaction_list.model.load_failed.connect(self._on_load_failed)
+        list_layout.addWidget(transaction_list)
+        layout.addLayout(list_layout)
+        self.transaction_lists[transaction_type] = transaction_list
         
-        incomes_chart_layout = QVBoxLayout()
-        incomes_chart_layout.addWidget(QLabel("Incomes by Category:"))
-        self.incomes_chart = PieChart("Incomes Breakdown")
-        incomes_chart_layout.addWidget(self.incomes_chart)
-        incomes_layout.addLayout(incomes_chart_layout)
+        chart_layout = QVBoxLayout()
+        chart_layout.addWidget(QLabel(f"{name} by Category:"))
+        self.category_charts[transaction_type] = PieChart(f"{name} Breakdown")
+        chart_layout.addWidget(self.category_charts[transaction_type])
+        layout.addLayout(chart_layout)
         
-        incomes_info_layout = QVBoxLayout()
-        incomes_info_layout.addWidget(QLabel("Total Incomes:"))
-        self.total_incomes_label = QLabel("€0.00")
-        self.total_incomes_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-        self.total_incomes_label.setStyleSheet("color: #28a745;")
-        incomes_info_layout.addWidget(self.total_incomes_label)
-        incomes_info_layout.addStretch()
-        incomes_layout.addLayout(incomes_info_layout)
+        info_layout = QVBoxLayout()
+        info_layout.addWidget(QLabel(f"Total {name}:"))
+        total_label = QLabel("€0.00")
+        total_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        total_label.setStyleSheet(f"color: {color};")
+        info_layout.addWidget(total_label)
+        info_layout.addStretch()
+        layout.addLayout(info_layout)
+        self.total_labels[transaction_type] = total_label
         
-        incomes_tab.setLayout(incomes_layout)
-        self.tabs.addTab(incomes_tab, "Incomes")
-
-        main_layout.addWidget(self.tabs)
-        central_widget.setLayout(main_layout)
+        tab.setLayout(layout)
 
     def _load_data(self):
         """Load and display all data from database"""
         self._update_display()
+        self._materialize_recurring()
+        self._recurring_timer.start()
+        self.executor.submit(
+            "budgets", BudgetEvaluator.load, self.db,
+            on_result=self._on_budgets_loaded,
+            on_error=self._on_load_failed
+        )
+
+    def _on_budgets_loaded(self, evaluator: BudgetEvaluator):
+        """Start checking budgets on every write"""
+        self.budgets = evaluator
+        self.budget_signals = BudgetSignals(evaluator, self)
+        self.budget_signals.alert.connect(self._on_budget_alert)
+        evaluator.attach(self.db)
+        # Writes committed while the budgets loaded (e.g. the recurring
+        # schedules materialized at startup) reached no listener yet
+        self.executor.submit(
+            "budget_reload", evaluator.reload, self.db,
+            on_error=self._on_load_failed
+        )
+
+    def _check_budget_periods(self):
+        """Move budgets on to a new week, month or year once it begins"""
+        if self.budgets is not None:
+            self.executor.submit(
+                "budget_periods", self.budgets.check_period,
+                on_error=self._on_load_failed
+            )
 
+    def _on_budget_alert(self, alert: BudgetAlert):
+        """Show a budget that reached its warning level or limit"""
+        status = alert.status
+        budget = status.budget
+        state = "over budget" if alert.level == "exceeded" else f"{status.ratio:.0%} of budget"
+        self.statusBar().showMessage(
+            f"{budget.category}: {format_money(status.spent)} spent this {budget.period}, "
+            f"{state} ({format_money(budget.limit)})",
+            STATUS_MESSAGE_MS
+        )
+
+    @traced(category="ui")
     def _update_display(self):
         """Refresh all displays with current data"""
-        # Get data from database
-        all_transactions = self.db.get_all_transactions()
-        expenses = self.db.get_expenses()
-        incomes = self.db.get_incomes()
-        balance = self.db.get_balance()
+        profiler.begin_refresh("update_display")
+        self._update_summary()
+
+        # Update lists
+        for transaction_list in self.transaction_lists.values():
+            transaction_list.refresh()
+
+    def _update_summary(self):
+        """Reload the summary and trends in the background and redraw them when ready"""
+        self._load_summary()
+        self._update_trends()
+
+    def _load_summary(self):
+        """Reload the summary in the background"""
+        self.executor.submit(
+            "summary", self.db.read_versioned, self.db.get_summary,
+            on_result=self._on_summary_loaded,
+            on_error=self._on_load_failed
+        )
+
+    def _update_trends(self):
+        """Reload the monthly trends in the background"""
+        self.executor.submit(
+            "trends", self.db.read_versioned, self.db.get_trends, "month",
+            on_result=self._on_trends_loaded,
+            on_error=self._on_load_failed
+        )
+
+    @traced(category="ui")
+    def _on_summary_loaded(self, loaded: Tuple[Optional[int], Summary]):
+        """Show a freshly loaded summary, or query again if a write overlapped it"""
+        version, summary = loaded
+        if version is None:
+            self._load_summary()
+            return
+        self.summary = summary
+        self._summary_version = version
+        self._dirty_types.update(("expense", "income"))
+        self._render_summary()
+        self.data_loaded.emit()
+
+    @traced(category="ui")
+    def _on_trends_loaded(self, loaded: Tuple[Optional[int], Trends]):
+        """Show freshly loaded trends, or query again if a write overlapped them"""
+        version, trends = loaded
+        if version is None:
+            self._update_trends()
+            return
+        self.trends = trends
+        self._trends_version = version
+        if self.trend_chart is not None:
+            self.trend_chart.update_data(trends)
+
+    def _on_load_failed(self, error: Exception):
+        """Report a failed background query"""
+        QMessageBox.critical(self, "Error", f"Failed to load data: {str(error)}")
+
+    @traced(category="ui")
+    def _render_summary(self):
+        """Show balance, totals and the charts of changed types"""
+        summary = self.summary
+        balance = summary.balance
 
         # Update balance
         balance_color = "#28a745" if balance >= 0 else "#dc3545"
-        self.balance_display.setText(f"€{balance:.2f}")
+        self.balance_display.setText(format_money(balance))
         self.balance_display.setStyleSheet(f"color: {balance_color};")
 
-        # Update lists
-        self.expenses_list.update_transactions(expenses)
-        self.incomes_list.update_transactions(incomes)
-
-        # Update charts
-        total_expenses = self.db.get_total_expenses()
-        total_incomes = self.db.get_total_incomes()
-        
-        self.bar_chart.update_data(total_expenses, total_incomes)
-        self.expenses_chart.update_data(expenses)
-        self.incomes_chart.update_data(incomes)
+        # Update charts of the tabs built so far
+        if self.bar_chart is not None:
+            self.bar_chart.update_data(summary)
+        if self.trend_chart is not None:
+            self.trend_chart.update_data(self.trends)
+        for transaction_type, chart in self.category_charts.items():
+            if transaction_type in self._dirty_types:
+                chart.update_data(summary.categories(transaction_type))
+        self._dirty_types.clear()
 
         # Update totals
-        self.total_expenses_label.setText(f"€{total_expenses:.2f}")
-        self.total_incomes_label.setText(f"€{total_incomes:.2f}")
+        for transaction_type, label in self.total_labels.items():
+            label.setText(format_money(summary.totals.get(transaction_type, 0)))
 
-    def _add_transaction(self, transaction: Transaction):
-        """Handle new transaction"""
-        try:
-            self.db.add_transaction(transaction)
+    @traced(category="ui")
+    def _on_database_changed(self, event: ChangeEvent):
+        """Apply a change to totals and lists, then schedule one redraw"""
+        if event.kind == "reset":
+            self._reload_pending = True
+            self._refresh_timer.start()
+            return
+        # A result read at the event's version or later already includes
+        # it; one still in flight may or may not, so it is queried again
+        if self.executor.is_pending("summary"):
+            self._update_summary()
+        elif event.version > self._summary_version:
+            self.summary.apply(event)
+        if self.executor.is_pending("trends"):
+            self._update_trends()
+        elif event.version > self._trends_version:
+            self.trends.apply(event)
+
+        removed = event.previous + (event.transactions if event.kind == "delete" else [])
+        added = event.transactions if event.kind != "delete" else []
+        for transaction_list in self.transaction_lists.values():
+            for transaction in removed:
+                transaction_list.remove_transaction(transaction.id)
+            for transaction in added:
+                transaction_list.add_transaction(transaction)
+
+        self._dirty_types.update(t.transaction_type for t in removed + added)
+        self._refresh_timer.start()
+
+    def _flush_changes(self):
+        """Redraw once after a burst of changes"""
+        if self._reload_pending:
+            self._reload_pending = False
             self._update_display()
-            QMessageBox.information(
+        else:
+            profiler.begin_refresh("flush_changes")
+            self._render_summary()
+
+    def _show_profiler_panel(self):
+        """Open the profiling debug panel (Ctrl+Shift+P)"""
+        from src.ui.widgets.profiler_panel import ProfilerPanel
+
+        if self.profiler_panel is None:
+            self.profiler_panel = ProfilerPanel(parent=self)
+        self.profiler_panel.show()
+        self.profiler_panel.raise_()
+
+    def _when_written(self, future: Future, on_result: Callable, on_error: Callable):
+        """Call on_result or on_error on the GUI thread once a queued write is done"""
+        future.add_done_callback(
+            lambda done: self._write_finished.emit(done, on_result, on_error)
+        )
+
+    def _on_write_finished(self, future: Future, on_result: Callable, on_error: Callable):
+        """Hand the outcome of a write to its callback"""
+        error = future.exception()
+        if error is None:
+            on_result(future.result())
+        else:
+            on_error(error)
+
+    def _add_transaction(self, transaction: Transaction):
+        """Queue a new transaction; lists and charts update from its change event"""
+        self._when_written(
+            self.writer.add_transaction(transaction),
+            lambda _: QMessageBox.information(
                 self,
                 "Success",
                 f"Transaction added: {transaction.description}"
+            ),
+            lambda e: QMessageBox.critical(self, "Error", f"Failed to add transaction: {str(e)}")
+        )
+
+    def _delete_transaction(self, transaction_id: int):
+        """Queue deletion of a transaction"""
+        self._when_written(
+            self.writer.delete_transaction(transaction_id),
+            lambda _: None,
+            lambda e: QMessageBox.critical(self, "Error", f"Failed to delete transaction: {str(e)}")
+        )
+
+    def _add_recurring_rule(self, rule: RecurringRule):
+        """Queue a recurring rule and create its first occurrence"""
+        self._when_written(
+            self.writer.submit("add_rule", rule),
+            lambda _: QMessageBox.information(
+                self,
+                "Success",
+                f"Recurring transaction added: {rule.description} ({rule.frequency})"
+            ),
+            lambda e: QMessageBox.critical(
+                self, "Error", f"Failed to add recurring transaction: {str(e)}"
+            )
+        )
+        self._materialize_recurring()
+
+    def _materialize_recurring(self):
+        """Queue creation of every recurring transaction due by today"""
+        self._when_written(
+            self.writer.submit("materialize", None),
+            self._on_recurring_materialized,
+            lambda e: QMessageBox.critical(
+                self, "Error", f"Failed to add recurring transactions: {str(e)}"
             )
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to add transaction: {str(e)}")
+        )
+
+    def _on_recurring_materialized(self, created: int):
+        """Mention recurring transactions that were added"""
+        if created:
+            self.statusBar().showMessage(f"{created} recurring transactions added",
+                                         STATUS_MESSAGE_MS)
+
+    def _back_up(self):
+        """Snapshot the database in the background"""
+        if self.executor.is_pending("backup"):
+            return
+        self.statusBar().showMessage("Backing up...")
+        self.executor.submit(
+            "backup", self.backups.backup, self.db,
+            on_result=self._on_backup_finished,
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Backup failed: {str(e)}")
+        )
+
+    def _on_backup_finished(self, result: TransferResult):
+        """Report a finished backup"""
+        self.statusBar().showMessage(
+            f"Backup {result.snapshot.id} saved: {result.stored_bytes / 1e6:.1f} MB written "
+            f"for {result.bytes / 1e6:.1f} MB at {result.mb_per_sec:.0f} MB/s",
+            STATUS_MESSAGE_MS
+        )
+
+    def _restore_backup(self):
+        """Replace all data with a chosen snapshot, in the background"""
+        snapshots = list(reversed(self.backups.snapshots()))
+        if not snapshots:
+            QMessageBox.information(self, "Restore Backup", "There are no backups yet.")
+            return
+        choices = [
+            f"Backup {snapshot.id} of {snapshot.created.replace('T', ' ')} "
+            f"({snapshot.size / 1e6:.1f} MB)"
+            for snapshot in snapshots
+        ]
+        choice, accepted = QInputDialog.getItem(
+            self, "Restore Backup", "Replace all transactions with:", choices, 0, False
+        )
+        if not accepted or self.executor.is_pending("restore"):
+            return
+        self.statusBar().showMessage("Restoring...")
+        self.executor.submit(
+            "restore", self.backups.restore, self.db, snapshots[choices.index(choice)],
+            on_result=lambda result: self.statusBar().showMessage(
+                f"Backup {result.snapshot.id} restored at {result.mb_per_sec:.0f} MB/s",
+                STATUS_MESSAGE_MS
+            ),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Restore failed: {str(e)}")
+        )
 
     def closeEvent(self, event):
         """Handle application close"""
@@ -186,6 +500,13 @@ class MainWindow(QMainWindow):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if reply == QMessageBox.StandardButton.Yes:
+            self._recurring_timer.stop()
+            self.writer.close()
+            if self.budgets is not None:
+                self.budgets.detach()
+            self.db_signals.detach()
+            self.executor.shutdown()
+            self.db.close()
             event.accept()
         else:
             event.ignore()
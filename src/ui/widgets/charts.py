@@ -1,103 +1,242 @@
 """Chart widgets for data visualization"""
+import math
 from PyQt6.QtWidgets import QWidget, QVBoxLayout
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter, date2num
 from matplotlib.figure import Figure
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Union
 from collections import defaultdict
+from src.models import Summary, Trends
+from src.utils.money import format_money
+from src.utils.profiling import profiler, traced
 
 
-class PieChart(QWidget):
-    """Pie chart widget for category breakdown"""
+class TracedCanvas(FigureCanvas):
+    """Qt canvas whose full draws show up as profiling spans"""
 
-    def __init__(self, title: str = "Breakdown"):
-        """Initialize pie chart"""
+    def draw(self):
+        """Render the figure"""
+        with profiler.span("FigureCanvas.draw", "chart"):
+            super().draw()
+
+
+class ChartWidget(QWidget):
+    """Base widget holding one figure that is redrawn only when needed
+
+    Data that equals what is already shown is ignored, and charts that are
+    hidden (e.g. in another tab) defer their redraw until they are shown.
+    """
+
+    def __init__(self, title: str, figsize: tuple):
+        """Initialize chart"""
         super().__init__()
         self.title = title
+        self.figsize = figsize
+        self._data: Any = None
+        self._stale = False
         self._setup_ui()
 
     def _setup_ui(self):
         """Setup the user interface"""
         layout = QVBoxLayout()
-        
-        self.figure = Figure(figsize=(5, 4), dpi=100)
-        self.canvas = FigureCanvas(self.figure)
-        
+
+        self.figure = Figure(figsize=self.figsize, dpi=100)
+        self.canvas = TracedCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_title(self.title, fontsize=12, fontweight='bold')
+
         layout.addWidget(self.canvas)
         self.setLayout(layout)
 
+    def _set_data(self, data: Any):
+        """Store new data and redraw now, or later if the chart is hidden"""
+        if data == self._data:
+            return
+        self._data = data
+        self._stale = True
+        if self.isVisible():
+            self._redraw()
+
+    def showEvent(self, event):
+        """Redraw data that arrived while the chart was hidden"""
+        super().showEvent(event)
+        if self._stale:
+            self._redraw()
+
+    def _redraw(self):
+        """Update artists for the current data and schedule a repaint"""
+        self._stale = False
+        with profiler.span(f"{type(self).__name__}._render", "chart"):
+            self._render(self._data)
+        self.canvas.draw_idle()
+
+    def _render(self, data: Any):
+        """Update the axes for data"""
+        raise NotImplementedError
+
+
+class PieChart(ChartWidget):
+    """Pie chart widget for category breakdown"""
+
+    def __init__(self, title: str = "Breakdown"):
+        """Initialize pie chart"""
+        self._wedges = []
+        self._labels = []
+        self._autotexts = []
+        super().__init__(title, (5, 4))
+
+    @traced(category="chart")
     def plot(self, data: Dict[str, float]):
         """Plot pie chart with transaction data"""
-        if not data:
-            self.figure.clear()
-            self.canvas.draw()
+        self._set_data(dict(data))
+
+    def _render(self, data: Dict[str, float]):
+        """Move existing wedges, or rebuild them when categories changed"""
+        if data and [label.get_text() for label in self._labels] == list(data):
+            self._update_wedges(list(data.values()))
             return
 
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
-        ax.pie(
-            data.values(),
-            labels=data.keys(),
-            autopct='%1.1f%%',
-            startangle=90
-        )
-        ax.set_title(self.title, fontsize=12, fontweight='bold')
-        
-        self.figure.tight_layout()
-        self.canvas.draw()
+        self.ax.clear()
+        self._wedges, self._labels, self._autotexts = [], [], []
+        self.ax.set_visible(bool(data))
+        if data:
+            self._wedges, self._labels, self._autotexts = self.ax.pie(
+                data.values(),
+                labels=data.keys(),
+                autopct='%1.1f%%',
+                startangle=90
+            )
+            self.ax.set_title(self.title, fontsize=12, fontweight='bold')
+            self.figure.tight_layout()
+
+    def _update_wedges(self, values: List[float]):
+        """Resize wedges in place, as ax.pie would lay them out"""
+        total = sum(values)
+        theta = 90.0
+        for wedge, label, autotext, value in zip(
+                self._wedges, self._labels, self._autotexts, values):
+            fraction = value / total if total else 0.0
+            theta1, theta2 = theta, theta + 360.0 * fraction
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+
+            middle = math.radians((theta1 + theta2) / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text(f"{100 * fraction:1.1f}%")
+            theta = theta2
+
+    def update_data(self, transactions: Union[List, Dict[str, int]]):
+        """Update chart with transactions or pre-aggregated category totals"""
+        if isinstance(transactions, dict):
+            self.plot(transactions)
+            return
+
+        data = defaultdict(int)
 
-    def update_data(self, transactions: List):
-        """Update chart with transaction data"""
-        data = defaultdict(float)
-        
         for transaction in transactions:
             data[transaction.category] += transaction.amount
-        
+
         self.plot(dict(data))
 
 
-class BarChart(QWidget):
+class BarChart(ChartWidget):
     """Bar chart widget for expense/income comparison"""
 
     def __init__(self, title: str = "Summary"):
         """Initialize bar chart"""
-        super().__init__()
-        self.title = title
-        self._setup_ui()
+        super().__init__(title, (6, 4))
 
     def _setup_ui(self):
-        """Setup the user interface"""
-        layout = QVBoxLayout()
-        
-        self.figure = Figure(figsize=(6, 4), dpi=100)
-        self.canvas = FigureCanvas(self.figure)
-        
-        layout.addWidget(self.canvas)
-        self.setLayout(layout)
+        """Setup the user interface and the two bars"""
+        super()._setup_ui()
 
-    def plot(self, expenses: float, incomes: float):
-        """Plot bar chart with expenses and incomes"""
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
         categories = ['Expenses', 'Incomes']
-        values = [expenses, incomes]
         colors = ['#dc3545', '#28a745']
-        
-        ax.bar(categories, values, color=colors, alpha=0.7, edgecolor='black')
-        ax.set_ylabel('Amount (€)', fontsize=10)
-        ax.set_title(self.title, fontsize=12, fontweight='bold')
-        
+
+        self._bars = self.ax.bar(categories, [0, 0], color=colors, alpha=0.7, edgecolor='black')
+        self.ax.set_ylabel('Amount (€)', fontsize=10)
+
         # Add value labels on bars
-        for i, (category, value) in enumerate(zip(categories, values)):
-            ax.text(i, value, f'€{value:.2f}', ha='center', va='bottom')
-        
+        self._value_labels = [
+            self.ax.text(i, 0, '', ha='center', va='bottom')
+            for i in range(len(categories))
+        ]
         self.figure.tight_layout()
-        self.canvas.draw()
 
-    def update_data(self, expenses: float, incomes: float):
-        """Update chart with new data"""
+    @traced(category="chart")
+    def plot(self, expenses: int, incomes: int):
+        """Plot bar chart with expenses and incomes in cents"""
+        self._set_data((expenses, incomes))
+
+    def _render(self, values: tuple):
+        """Set bar heights and labels, then rescale the y axis"""
+        for i, (bar, label, value) in enumerate(zip(self._bars, self._value_labels, values)):
+            bar.set_height(value / 100)
+            label.set_position((i, value / 100))
+            label.set_text(format_money(value))
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+    def update_data(self, expenses: Union[int, Summary], incomes: Optional[int] = None):
+        """Update chart with new totals or a pre-aggregated summary"""
+        if isinstance(expenses, Summary):
+            expenses, incomes = expenses.total_expenses, expenses.total_incomes
         self.plot(expenses, incomes)
+
+
+class TrendChart(ChartWidget):
+    """Line chart of incomes, expenses and the rolling net per time bucket"""
+
+    def __init__(self, title: str = "Trends", window: int = 3):
+        """Initialize trend chart; window is the rolling average length in buckets"""
+        self.window = window
+        super().__init__(title, (6, 4))
+
+    def _setup_ui(self):
+        """Setup the user interface and the three lines"""
+        super()._setup_ui()
+
+        self._lines = [
+            self.ax.plot([], [], color=color, marker=marker, linestyle=style, label=label)[0]
+            for label, color, marker, style in (
+                ('Incomes', '#28a745', 'o', '-'),
+                ('Expenses', '#dc3545', 'o', '-'),
+                (f'Net ({self.window}-period average)', '#007bff', '', '--'),
+            )
+        ]
+        self.ax.xaxis_date()
+        locator = AutoDateLocator()
+        self.ax.xaxis.set_major_locator(locator)
+        self.ax.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+        self.ax.axhline(0, color='gray', linewidth=0.5)
+        self.ax.set_ylabel('Amount (€)', fontsize=10)
+        self.ax.legend(loc='upper left', fontsize=8)
+        self.figure.tight_layout()
+
+    @traced(category="chart")
+    def plot(self, trends: Trends):
+        """Plot the series of trends"""
+        self._set_data((
+            tuple(trends.starts()),
+            tuple(trends.series("income")),
+            tuple(trends.series("expense")),
+            tuple(trends.rolling_average(window=self.window)),
+        ))
+
+    def _render(self, data: tuple):
+        """Set line data in currency units, then rescale both axes"""
+        starts, *series = data
+        x = date2num(starts) if starts else []
+        for line, values in zip(self._lines, series):
+            line.set_data(x, [value / 100 for value in values])
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+    def update_data(self, trends: Trends):
+        """Update chart with new trends"""
+        self.plot(trends)
@@ -0,0 +1,151 @@
+"""Debug panel showing where the time of recent refreshes went"""
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QCheckBox, QPushButton, QLabel,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog
+)
+from PyQt6.QtCore import Qt, QTimer
+from src.utils.profiling import Profiler, profiler as default_profiler
+
+# Counters shown per refresh, as (header, counter name)
+COUNTER_COLUMNS = [
+    ("Queries", "queries"),
+    ("Rows", "rows"),
+    ("Cache hits", "cache_hits"),
+]
+
+UPDATE_INTERVAL_MS = 500
+
+
+def _item(value) -> QTableWidgetItem:
+    """Read-only table cell; numbers are right-aligned"""
+    if isinstance(value, float):
+        item = QTableWidgetItem(f"{value:.1f}")
+    else:
+        item = QTableWidgetItem(str(value))
+    if isinstance(value, (int, float)):
+        item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+    return item
+
+
+class ProfilerPanel(QWidget):
+    """Recent refreshes with their counters and slowest spans
+
+    Recording can be switched on and off here, and everything recorded
+    can be exported as a Chrome trace for a full timeline.
+    """
+
+    def __init__(self, profiler: Profiler = default_profiler, parent=None):
+        """Initialize panel"""
+        super().__init__(parent, Qt.WindowType.Tool)
+        self.profiler = profiler
+        self._shown_refreshes = None
+        self._refreshes = []
+        self._timer = QTimer(self)
+        self._timer.setInterval(UPDATE_INTERVAL_MS)
+        self._timer.timeout.connect(self.update_tables)
+        self._setup_ui()
+
+    def _setup_ui(self):
+        """Setup the user interface"""
+        self.setWindowTitle("Profiler")
+        self.resize(700, 500)
+        layout = QVBoxLayout()
+
+        controls = QHBoxLayout()
+        self.record_box = QCheckBox("Record")
+        self.record_box.setChecked(self.profiler.enabled)
+        self.record_box.toggled.connect(self._on_record_toggled)
+        controls.addWidget(self.record_box)
+        controls.addStretch()
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self._on_clear)
+        controls.addWidget(clear_btn)
+        export_btn = QPushButton("Export Trace...")
+        export_btn.clicked.connect(self._on_export)
+        controls.addWidget(export_btn)
+        layout.addLayout(controls)
+
+        layout.addWidget(QLabel("Refreshes (newest first):"))
+        headers = ["Refresh", "ms"] + [header for header, _ in COUNTER_COLUMNS]
+        self.refresh_table = self._table(headers)
+        self.refresh_table.itemSelectionChanged.connect(self._update_spans)
+        layout.addWidget(self.refresh_table)
+
+        layout.addWidget(QLabel("Slowest spans of the selected refresh:"))
+        self.span_table = self._table(["Span", "Total ms", "Calls"])
+        layout.addWidget(self.span_table)
+
+        self.setLayout(layout)
+
+    @staticmethod
+    def _table(headers) -> QTableWidget:
+        """Read-only table with one selectable row at a time"""
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.verticalHeader().hide()
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        return table
+
+    def showEvent(self, event):
+        """Update the tables while the panel is visible"""
+        super().showEvent(event)
+        self.update_tables()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        """Stop updating while hidden"""
+        super().hideEvent(event)
+        self._timer.stop()
+
+    def update_tables(self):
+        """Show the recorded refreshes, keeping the selected row"""
+        refreshes = list(reversed(self.profiler.refreshes))
+        state = [(refresh.name, refresh.end_us, sum(refresh.counters.values()))
+                 for refresh in refreshes]
+        if state == self._shown_refreshes:
+            return
+        self._shown_refreshes = state
+        self._refreshes = refreshes
+
+        selected = max(self.refresh_table.currentRow(), 0)
+        self.refresh_table.setRowCount(len(refreshes))
+        for row, refresh in enumerate(refreshes):
+            values = [refresh.name, refresh.duration_ms]
+            values += [refresh.counters.get(name, 0) for _, name in COUNTER_COLUMNS]
+            for column, value in enumerate(values):
+                self.refresh_table.setItem(row, column, _item(value))
+        if refreshes:
+            self.refresh_table.selectRow(min(selected, len(refreshes) - 1))
+        self._update_spans()
+
+    def _update_spans(self):
+        """Show the slowest spans of the selected refresh"""
+        row = self.refresh_table.currentRow()
+        spans = self._refreshes[row].slowest(top=20) if 0 <= row < len(self._refreshes) else []
+        self.span_table.setRowCount(len(spans))
+        for i, values in enumerate(spans):
+            for column, value in enumerate(values):
+                self.span_table.setItem(i, column, _item(value))
+
+    def _on_record_toggled(self, checked: bool):
+        """Start or stop recording"""
+        if checked:
+            self.profiler.enable()
+        else:
+            self.profiler.disable()
+
+    def _on_clear(self):
+        """Forget everything recorded"""
+        self.profiler.clear()
+        self.update_tables()
+
+    def _on_export(self):
+        """Save the recording as a Chrome trace"""
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", "trace.json", "Chrome trace (*.json)"
+        )
+        if path:
+            self.profiler.export_chrome_trace(path)
@@ -4,13 +4,21 @@ from PyQt6.QtWidgets import (
     QLineEdit, QDoubleSpinBox, QComboBox, QPushButton
 )
 from PyQt6.QtCore import pyqtSignal
-from src.models import Transaction
+from src.models import RecurringRule, Transaction
+from src.utils.money import to_cents
+
+REPEAT_CHOICES = ["Never", "Daily", "Weekly", "Monthly", "Yearly"]
 
 
 class TransactionForm(QWidget):
-    """Form for adding new transactions"""
+    """Form for adding new transactions
+
+    A transaction set to repeat is emitted as a RecurringRule starting
+    today instead.
+    """
     
     transaction_added = pyqtSignal(Transaction)
+    rule_added = pyqtSignal(RecurringRule)
 
     def __init__(self):
         """Initialize the transaction form"""
@@ -55,6 +63,14 @@ class TransactionForm(QWidget):
         type_layout.addWidget(self.type_combo)
         layout.addLayout(type_layout)
 
+        # Repeat
+        repeat_layout = QHBoxLayout()
+        repeat_layout.addWidget(QLabel("Repeat:"))
+        self.repeat_combo = QComboBox()
+        self.repeat_combo.addItems(REPEAT_CHOICES)
+        repeat_layout.addWidget(self.repeat_combo)
+        layout.addLayout(repeat_layout)
+
         # Submit button
         self.submit_btn = QPushButton("Add Transaction")
         self.submit_btn.clicked.connect(self._on_submit)
@@ -72,10 +88,22 @@ class TransactionForm(QWidget):
         if not description or not category or amount == 0:
             return
 
+        repeat = self.repeat_combo.currentText()
+        if repeat != "Never":
+            self.rule_added.emit(RecurringRule(
+                description=description,
+                category=category,
+                amount=to_cents(amount),
+                transaction_type=transaction_type,
+                frequency=repeat.lower()
+            ))
+            self._clear_form()
+            return
+
         transaction = Transaction(
             description=description,
             category=category,
-            amount=amount,
+            amount=to_cents(amount),
             transaction_type=transaction_type
         )
         
@@ -88,3 +116,4 @@ class TransactionForm(QWidget):
         self.category_input.clear()
         self.amount_input.setValue(0.0)
         self.type_combo.setCurrentIndex(0)
+        self.repeat_combo.setCurrentIndex(0)
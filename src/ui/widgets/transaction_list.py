@@ -1,23 +1,260 @@
 """Transaction list display widget"""
+from typing import List, Optional
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QListWidget, 
-    QListWidgetItem, QPushButton
+    QWidget, QVBoxLayout, QLabel, QLineEdit, QTableView,
+    QHeaderView, QAbstractItemView, QPushButton
 )
-from PyQt6.QtCore import pyqtSignal, Qt
+from PyQt6.QtCore import pyqtSignal, Qt, QAbstractTableModel, QModelIndex, QTimer
 from PyQt6.QtGui import QColor
-from src.models import Transaction
+from src.models import Database, Transaction, TransactionFilter, search
+from src.models.query import Cursor, Page, sort_key
+from src.ui.executor import DatabaseExecutor
+from src.utils.money import format_money
+from src.utils.profiling import traced
+
+# (header, column used for database-side ordering)
+COLUMNS = [
+    ("Date", "date"),
+    ("Description", "description"),
+    ("Category", "category"),
+    ("Amount", "amount"),
+]
+
+# Delay after the last keystroke before the search runs
+SEARCH_DEBOUNCE_MS = 50
+
+
+class TransactionTableModel(QAbstractTableModel):
+    """Table model fetching transactions from the database page by page
+
+    Only the pages the view has scrolled to are loaded. Sorting and
+    filtering are done by the database, and single inserts or deletes
+    update the loaded rows without a reset. While search text is set the
+    model shows the best page_size full-text matches instead, ranked by
+    relevance until a column is sorted.
+
+    With an executor, pages and search results are queried on its
+    threads under key, so a newer load replaces one still in flight,
+    and rows are inserted when the result reaches the GUI thread.
+    """
+
+    load_failed = pyqtSignal(Exception)
+
+    def __init__(self, db: Optional[Database] = None,
+                 transaction_filter: Optional[TransactionFilter] = None,
+                 page_size: int = 200, executor: Optional[DatabaseExecutor] = None,
+                 key: str = "transactions"):
+        """Initialize transaction model"""
+        super().__init__()
+        self.db = db
+        self.transaction_filter = transaction_filter or TransactionFilter()
+        self.page_size = page_size
+        self.executor = executor
+        self.key = key
+        self.order_by = "date"
+        self.descending = True
+        self.search_text = ""
+        self._rows: List[Transaction] = []
+        self._cursor: Optional[Cursor] = None
+        self._exhausted = True
+        self._loading = False
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        """Number of loaded rows"""
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        """Number of columns"""
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        """Column headers"""
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """Display text and colors for a cell"""
+        if not index.isValid():
+            return None
+        transaction = self._rows[index.row()]
+        column = COLUMNS[index.column()][1]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == "date":
+                return transaction.date.strftime("%Y-%m-%d %H:%M")
+            if column == "amount":
+                sign = "+" if transaction.transaction_type == "income" else "-"
+                return f"{sign} {format_money(transaction.amount)}"
+            return getattr(transaction, column)
+        if role == Qt.ItemDataRole.ForegroundRole and column == "amount":
+            # Color code: green for income, red for expense
+            return QColor("#28a745" if transaction.transaction_type == "income" else "#dc3545")
+        if role == Qt.ItemDataRole.TextAlignmentRole and column == "amount":
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    @property
+    def searching(self) -> bool:
+        """Whether rows are full-text search results"""
+        return search.fts_query(self.search_text) is not None
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        """Whether more rows are available and none are being loaded"""
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    @traced(category="ui")
+    def fetchMore(self, parent=QModelIndex()):
+        """Load the next page of rows"""
+        if parent.isValid() or self._exhausted or self._loading or self.db is None:
+            return
+        self._load()
+
+    def _load(self):
+        """Query the next page or the search results, in the background if possible"""
+        if self.searching:
+            query = (self.db.search, self.search_text, self.transaction_filter, self.page_size)
+        else:
+            query = (
+                self.db.get_page, self.transaction_filter, self.page_size, self._cursor,
+                self.order_by, self.descending
+            )
+        if self.executor is None:
+            self._on_loaded(query[0](*query[1:]))
+            return
+        self._loading = True
+        self.executor.submit(
+            self.key, *query, on_result=self._on_loaded, on_error=self._on_load_failed
+        )
+
+    def _on_load_failed(self, error: Exception):
+        """Stop loading and report the error"""
+        self._loading = False
+        self.load_failed.emit(error)
+
+    @traced(category="ui")
+    def _on_loaded(self, result):
+        """Append a loaded page or the search results"""
+        self._loading = False
+        if isinstance(result, Page):
+            rows = result.transactions
+            self._cursor = result.next_cursor
+            self._exhausted = result.next_cursor is None
+        else:
+            rows = result
+            self._exhausted = True
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        """Reload rows ordered by a column; search results are sorted in place"""
+        self.order_by = COLUMNS[column][1]
+        self.descending = order == Qt.SortOrder.DescendingOrder
+        if not self.searching:
+            self.refresh()
+            return
+        self.layoutAboutToBeChanged.emit()
+        self._rows.sort(key=lambda t: sort_key(t, self.order_by), reverse=self.descending)
+        self.layoutChanged.emit()
+
+    def set_filter(self, transaction_filter: TransactionFilter):
+        """Reload rows matching a new filter"""
+        self.transaction_filter = transaction_filter
+        self.refresh()
+
+    def set_search(self, text: str):
+        """Show the best full-text matches for text, or all rows if it has no words"""
+        self.search_text = text
+        self.refresh()
+
+    @traced(category="ui")
+    def refresh(self):
+        """Drop loaded rows and fetch the first page again"""
+        self.clear()
+        self._exhausted = self.db is None
+        self.fetchMore()
+
+    def clear(self):
+        """Drop all loaded rows, cancelling a load in flight"""
+        if self._loading:
+            self.executor.cancel(self.key)
+            self._loading = False
+        self.beginResetModel()
+        self._rows = []
+        self._cursor = None
+        self._exhausted = True
+        self.endResetModel()
+
+    def transaction_at(self, row: int) -> Transaction:
+        """Get the transaction shown at a row"""
+        return self._rows[row]
+
+    def _position(self, transaction: Transaction) -> int:
+        """Find the row where a transaction belongs in the current order"""
+        key = sort_key(transaction, self.order_by)
+        low, high = 0, len(self._rows)
+        while low < high:
+            middle = (low + high) // 2
+            row_key = sort_key(self._rows[middle], self.order_by)
+            if (row_key > key) if self.descending else (row_key < key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def insert_transaction(self, transaction: Transaction):
+        """Insert one stored transaction if it matches the filter"""
+        if not self.transaction_filter.matches(transaction):
+            return
+        if self._loading:
+            # The rows in flight may have been read before this one was stored
+            self._load()
+        if self.searching:
+            # Search results are ranked as a whole; rank them again
+            if search.matches(self.search_text, transaction.description, transaction.category):
+                self.refresh()
+            return
+        row = self._position(transaction)
+        if row == len(self._rows) and not self._exhausted:
+            # Belongs after the loaded rows; a later fetchMore returns it
+            return
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.insert(row, transaction)
+        self.endInsertRows()
+
+    def remove_transaction(self, transaction_id: int) -> bool:
+        """Remove a loaded transaction by id"""
+        for row, transaction in enumerate(self._rows):
+            if transaction.id == transaction_id:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._rows[row]
+                self.endRemoveRows()
+                return True
+        if self._loading:
+            # The rows in flight may have been read before this one was deleted
+            self._load()
+        return False
 
 
 class TransactionList(QWidget):
     """Display list of transactions"""
-    
+
     transaction_deleted = pyqtSignal(int)
 
-    def __init__(self):
-        """Initialize transaction list"""
+    def __init__(self, db: Optional[Database] = None,
+                 transaction_filter: Optional[TransactionFilter] = None,
+                 executor: Optional[DatabaseExecutor] = None, key: str = "transactions"):
+        """Initialize transaction list; see TransactionTableModel for executor and key"""
         super().__init__()
+        self.model = TransactionTableModel(db, transaction_filter, executor=executor, key=key)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._on_search)
         self._setup_ui()
-        self.transactions = {}
 
     def _setup_ui(self):
         """Setup the user interface"""
@@ -27,39 +264,58 @@ class TransactionList(QWidget):
         title.setStyleSheet("font-size: 14px; font-weight: bold;")
         layout.addWidget(title)
 
-        self.list_widget = QListWidget()
-        layout.addWidget(self.list_widget)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search description or category...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(lambda _: self._search_timer.start())
+        layout.addWidget(self.search_input)
+
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_view.verticalHeader().hide()
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table_view.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.table_view.horizontalHeader().setSortIndicator(0, Qt.SortOrder.DescendingOrder)
+        # Sorts, and so loads the first page, by the indicator set above
+        self.table_view.setSortingEnabled(True)
+        layout.addWidget(self.table_view)
+
+        self.delete_btn = QPushButton("Delete Selected")
+        self.delete_btn.clicked.connect(self._on_delete)
+        layout.addWidget(self.delete_btn)
 
         self.setLayout(layout)
 
+    def _on_search(self):
+        """Show results for the text typed so far"""
+        self.model.set_search(self.search_input.text())
+
+    def _on_delete(self):
+        """Emit the id of the selected transaction"""
+        selected = self.table_view.selectionModel().selectedRows()
+        if selected:
+            self.transaction_deleted.emit(self.model.transaction_at(selected[0].row()).id)
+
     def add_transaction(self, transaction: Transaction):
-        """Add a transaction to the list"""
-        item = QListWidgetItem()
-        
-        # Color code: green for income, red for expense
-        if transaction.transaction_type == "income":
-            color = QColor("#28a745")
-            text = f"+ €{transaction.amount:.2f}"
-        else:
-            color = QColor("#dc3545")
-            text = f"- €{transaction.amount:.2f}"
-        
-        display_text = f"{transaction.description} ({transaction.category}) {text}"
-        item.setText(display_text)
-        item.setForeground(color)
-        
-        self.list_widget.insertItem(0, item)
-        self.transactions[id(item)] = transaction.id
-
-    def update_transactions(self, transactions: list):
-        """Replace all transactions in the list"""
-        self.list_widget.clear()
-        self.transactions.clear()
-        
-        for transaction in transactions:
-            self.add_transaction(transaction)
+        """Add a stored transaction to the list"""
+        self.model.insert_transaction(transaction)
+
+    def remove_transaction(self, transaction_id: int):
+        """Remove a transaction from the list"""
+        self.model.remove_transaction(transaction_id)
+
+    def set_filter(self, transaction_filter: TransactionFilter):
+        """Show only transactions matching a filter"""
+        self.model.set_filter(transaction_filter)
+
+    @traced(category="ui")
+    def refresh(self):
+        """Reload the list from the database"""
+        self.model.refresh()
 
     def clear(self):
         """Clear all transactions from the list"""
-        self.list_widget.clear()
-        self.transactions.clear()
+        self.model.clear()
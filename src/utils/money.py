@@ -0,0 +1,36 @@
+"""Conversions between amounts and integer cents"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Union
+
+CURRENCY_SYMBOL = "€"
+
+
+def to_cents(value: Union[str, float, Decimal]) -> int:
+    """Convert an amount in currency units to integer cents
+
+    Floats go through their shortest string form, so 0.1 becomes 10
+    cents rather than a binary approximation. Half cents round away
+    from zero.
+    """
+    if isinstance(value, float):
+        value = repr(value)
+    amount = Decimal(value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return int(amount * 100)
+
+
+def from_cents(cents: int) -> Decimal:
+    """Convert integer cents to an exact Decimal amount"""
+    return Decimal(cents).scaleb(-2)
+
+
+def format_cents(cents: int) -> str:
+    """Format cents as a plain amount, e.g. 1234 -> '12.34'"""
+    sign = "-" if cents < 0 else ""
+    units, rest = divmod(abs(cents), 100)
+    return f"{sign}{units}.{rest:02d}"
+
+
+def format_money(cents: int) -> str:
+    """Format cents with the currency symbol, e.g. 1234 -> '€12.34'"""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{CURRENCY_SYMBOL}{format_cents(abs(cents))}"
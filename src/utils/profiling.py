@@ -0,0 +1,245 @@
+"""Opt-in timing spans and counters for finding slow refreshes
+
+Instrumented code calls span(), traced() or count() on the module-level
+profiler. Nothing is recorded until the profiler is enabled, and the
+disabled cost is one attribute check per call. Recorded spans can be
+exported as Chrome trace-event JSON (chrome://tracing, Perfetto).
+
+Work is grouped into refreshes: begin_refresh() starts a new one, and
+every span and counter recorded until the next one, on any thread, is
+attributed to it, so background queries count towards the refresh that
+requested them. Set EXPENSE_TRACKER_TRACE to a file path to record from
+startup and write the trace there at exit.
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional
+
+TRACE_ENV = "EXPENSE_TRACKER_TRACE"
+
+
+@dataclass
+class Refresh:
+    """Spans and counters recorded since one call of begin_refresh"""
+    name: str
+    start_us: float
+    end_us: float = 0.0
+    counters: Counter = field(default_factory=Counter)
+    span_us: Dict[str, float] = field(default_factory=dict)
+    span_calls: Counter = field(default_factory=Counter)
+
+    @property
+    def duration_ms(self) -> float:
+        """Time from the start to the end of the last recorded span"""
+        return max(0.0, self.end_us - self.start_us) / 1000
+
+    def slowest(self, top: int = 10) -> List[tuple]:
+        """(name, total ms, calls) of the spans with the most total time"""
+        names = sorted(self.span_us, key=self.span_us.get, reverse=True)[:top]
+        return [(name, self.span_us[name] / 1000, self.span_calls[name]) for name in names]
+
+
+class _Span:
+    """Context manager recording one complete trace event"""
+
+    __slots__ = ("profiler", "name", "category", "args", "start")
+
+    def __init__(self, profiler: "Profiler", name: str, category: str, args: dict):
+        """Remember what to record"""
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> dict:
+        """Start the clock; the returned args can be extended in the block"""
+        self.start = self.profiler.now_us()
+        return self.args
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Record the span"""
+        if exc_type is not None and issubclass(exc_type, Exception):
+            self.args["error"] = exc_type.__name__
+        self.profiler.record(self.name, self.category, self.start,
+                             self.profiler.now_us() - self.start, self.args)
+
+
+class _NullSpan:
+    """Context manager doing nothing, used while the profiler is disabled"""
+
+    def __enter__(self) -> dict:
+        """Give the block a throwaway args dict"""
+        return {}
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Do nothing"""
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """Collect spans and counters in memory while enabled
+
+    At most max_events trace events are kept; older ones are dropped.
+    """
+
+    def __init__(self, max_events: int = 200_000, max_refreshes: int = 100):
+        """Start disabled with empty buffers"""
+        self.enabled = False
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._events: Deque[dict] = deque(maxlen=max_events)
+        self._threads: Dict[int, str] = {}
+        self.refreshes: Deque[Refresh] = deque(maxlen=max_refreshes)
+
+    def now_us(self) -> float:
+        """Microseconds since the profiler was created"""
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    def enable(self):
+        """Start recording"""
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording, keeping what was recorded"""
+        self.enabled = False
+
+    def clear(self):
+        """Forget recorded events and refreshes"""
+        with self._lock:
+            self._events.clear()
+            self._threads.clear()
+            self.refreshes.clear()
+
+    def span(self, name: str, category: str = "app", **args):
+        """Context manager timing a block as one trace event"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def record(self, name: str, category: str, start_us: float, duration_us: float,
+               args: Optional[dict] = None):
+        """Store a finished span and add it to the current refresh"""
+        thread = threading.current_thread()
+        event = {
+            "name": name, "cat": category, "ph": "X",
+            "ts": start_us, "dur": duration_us,
+            "pid": os.getpid(), "tid": thread.ident,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+            if self.refreshes:
+                refresh = self.refreshes[-1]
+                refresh.end_us = max(refresh.end_us, start_us + duration_us)
+                refresh.span_us[name] = refresh.span_us.get(name, 0.0) + duration_us
+                refresh.span_calls[name] += 1
+
+    def count(self, name: str, n: int = 1):
+        """Add n to a counter of the current refresh, e.g. queries or rows"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if not self.refreshes:
+                return
+            counters = self.refreshes[-1].counters
+            counters[name] += n
+            self._events.append({
+                "name": name, "ph": "C", "ts": self.now_us(),
+                "pid": os.getpid(), "args": {name: counters[name]},
+            })
+
+    def begin_refresh(self, name: str):
+        """Attribute what follows to a new refresh"""
+        if not self.enabled:
+            return
+        now = self.now_us()
+        with self._lock:
+            self.refreshes.append(Refresh(name, now, now))
+            self._events.append({
+                "name": name, "ph": "i", "s": "p", "ts": now, "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            })
+
+    def trace_events(self) -> List[dict]:
+        """Recorded events plus thread name metadata, in Chrome's format"""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": ident,
+             "args": {"name": name}}
+            for ident, name in threads.items()
+        ]
+        return metadata + events
+
+    def export_chrome_trace(self, path: Path):
+        """Write the recorded events as a Chrome trace-event JSON file"""
+        trace = {"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}
+        Path(path).write_text(json.dumps(trace), encoding="utf-8")
+
+
+profiler = Profiler()
+
+
+def _wrap(func: Callable, name: str, category: str) -> Callable:
+    """Wrap func in a span; generators are timed until exhausted"""
+    if inspect.isgeneratorfunction(func):
+        def timed(generator):
+            with profiler.span(name, category):
+                yield from generator
+
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            return timed(func(*args, **kwargs))
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not profiler.enabled:
+            return func(*args, **kwargs)
+        with profiler.span(name, category):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def traced(name: Optional[str] = None, category: str = "app"):
+    """Decorator timing every call of a function as a span
+
+    The span is named after the function's qualified name by default.
+    """
+    def decorator(func):
+        return _wrap(func, name or func.__qualname__, category)
+    return decorator
+
+
+def instrument(category: str):
+    """Class decorator timing every public method defined on the class"""
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.isfunction(value):
+                continue
+            setattr(cls, attr, _wrap(value, f"{cls.__name__}.{attr}", category))
+        return cls
+    return decorator
+
+
+def enable_from_environment() -> Optional[Path]:
+    """Enable the profiler if TRACE_ENV is set and return the trace path"""
+    path = os.environ.get(TRACE_ENV)
+    if not path:
+        return None
+    profiler.enable()
+    return Path(path)
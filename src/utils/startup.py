@@ -0,0 +1,62 @@
+"""Startup profiling helpers"""
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+_IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(.+)")
+
+
+class StartupProfiler:
+    """Record how long each startup phase took"""
+
+    def __init__(self):
+        """Start the clock"""
+        self.start = time.perf_counter()
+        self._last = self.start
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, phase: str):
+        """Close a phase, recording milliseconds since the previous mark"""
+        now = time.perf_counter()
+        self.phases[phase] = (now - self._last) * 1000
+        self._last = now
+
+    @property
+    def total_ms(self) -> float:
+        """Milliseconds from start to the last mark"""
+        return (self._last - self.start) * 1000
+
+    def report(self, import_summary: bool = True) -> dict:
+        """Collect phases, total time and optionally the slowest imports"""
+        report = {"phases_ms": self.phases, "total_ms": self.total_ms}
+        if import_summary:
+            report["slowest_imports_us"] = import_time_summary()
+        return report
+
+    def dump(self, import_summary: bool = True):
+        """Print the report as JSON"""
+        print(json.dumps(self.report(import_summary), indent=2))
+
+
+def import_time_summary(module: str = "src.ui.main_window",
+                        top: int = 10) -> List[Tuple[str, int]]:
+    """Import module in a fresh interpreter with -X importtime
+
+    Returns the top packages by cumulative import time in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=PROJECT_ROOT
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            timings.append((match.group(3).strip(), int(match.group(2))))
+    timings.sort(key=lambda item: item[1], reverse=True)
+    return timings[:top]
@@ -0,0 +1,84 @@
+"""Trend buckets from the database and from change events"""
+from dataclasses import replace
+from datetime import date, datetime
+
+import pytest
+
+from src.models import Database, Transaction
+from src.models.analytics import bucket_start, next_bucket, rolling_mean
+
+
+def _transaction(amount, when, transaction_type="expense", category="Food"):
+    return Transaction("Test", category, amount, transaction_type, when)
+
+
+@pytest.fixture
+def db(tmp_path):
+    """January and March 2024 with nothing in February"""
+    with Database(tmp_path / "trends.db", query_cache_size=0) as db:
+        db.add_transactions([
+            _transaction(5000, datetime(2024, 1, 1), "income", "Salary"),
+            _transaction(100, datetime(2024, 1, 7, 23, 59)),
+            _transaction(200, datetime(2024, 1, 8)),
+            _transaction(300, datetime(2024, 3, 31), category="Home"),
+        ])
+        yield db
+
+
+def test_bucket_boundaries():
+    assert bucket_start(datetime(2024, 1, 7, 23, 59), "week") == date(2024, 1, 1)
+    assert bucket_start(date(2024, 1, 8), "week") == date(2024, 1, 8)
+    assert bucket_start(date(2024, 2, 29), "month") == date(2024, 2, 1)
+    assert next_bucket(date(2024, 12, 1), "month") == date(2025, 1, 1)
+    assert next_bucket(date(2024, 12, 30), "week") == date(2025, 1, 6)
+    with pytest.raises(ValueError):
+        bucket_start(date(2024, 1, 1), "fortnight")
+
+
+def test_month_buckets_include_empty_periods(db):
+    trends = db.get_trends("month")
+    assert trends.starts() == [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+    assert trends.series("expense") == [300, 0, 300]
+    assert trends.net() == [4700, 0, -300]
+    assert trends.running_balance() == [4700, 4700, 4400]
+    assert trends.rolling_average("expense", window=2) == [300, 150, 150]
+    assert trends.category_deltas("expense") == {"Food": [None, -300, 0], "Home": [None, 0, 300]}
+
+
+def test_week_buckets_start_on_monday(db):
+    trends = db.get_trends("week")
+    starts = trends.starts()
+    assert starts[:2] == [date(2024, 1, 1), date(2024, 1, 8)]
+    assert starts[-1] == date(2024, 3, 25)
+    assert all(start.weekday() == 0 for start in starts)
+    assert trends.series("expense")[:3] == [100, 200, 0]
+    assert sum(trends.series("expense")) == 600
+    assert trends.series("income")[0] == 5000
+
+
+def test_empty_database_has_no_buckets(tmp_path):
+    with Database(tmp_path / "empty.db") as db:
+        trends = db.get_trends("week")
+    assert trends.starts() == []
+    assert trends.net() == []
+    assert trends.category_deltas("expense") == {}
+
+
+@pytest.mark.parametrize("period", ["week", "month"])
+def test_apply_matches_a_full_reload(db, period):
+    trends = db.get_trends(period)
+    db.subscribe(lambda event: trends.apply(event))
+
+    new_id = db.add_transaction(_transaction(700, datetime(2024, 2, 14)))
+    moved = replace(db.get_transaction(new_id), date=datetime(2024, 5, 2), category="Travel")
+    db.update_transaction(moved)
+    first = min(db.get_all_transactions(), key=lambda t: t.id)
+    db.delete_transaction(first.id)
+
+    assert trends.buckets == db.get_trends(period).buckets
+
+
+def test_rolling_mean_uses_shorter_history_first():
+    assert rolling_mean([3, 6, 9, 12], 3) == [3, 4.5, 6, 9]
+    with pytest.raises(ValueError):
+        rolling_mean([1], 0)
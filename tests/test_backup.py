@@ -0,0 +1,85 @@
+"""BackupStore: incremental snapshots, restore and corruption checks"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models import BackupStore, ChecksumError, Database, Transaction
+
+
+def _rows(db: Database):
+    """Every stored transaction as comparable tuples"""
+    return sorted(
+        (t.id, t.description, t.category, t.amount, t.transaction_type, t.date)
+        for t in db.get_all_transactions()
+    )
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Database with a few thousand rows"""
+    with Database(tmp_path / "live.db", query_cache_size=0) as db:
+        db.add_transactions(
+            Transaction(f"Row {i}", f"Category {i % 7}", 100 + i, "expense",
+                        datetime(2024, 1, 1) + timedelta(hours=i))
+            for i in range(5000)
+        )
+        yield db
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Empty gzip backup store"""
+    return BackupStore(tmp_path / "backups", compression="gzip")
+
+
+def test_round_trip_restores_identical_rows(db, store, tmp_path):
+    expected = _rows(db)
+    first = store.backup(db).snapshot
+    db.add_transaction(Transaction("Later", "Food", 1, "expense", datetime(2025, 1, 1)))
+    for transaction in db.get_all_transactions()[:100]:
+        db.delete_transaction(transaction.id)
+
+    store.restore(db, first)
+    assert _rows(db) == expected
+    assert db.get_summary().total_expenses == sum(row[3] for row in expected)
+
+    store.restore_file(tmp_path / "copy.db", first)
+    with Database(tmp_path / "copy.db") as copy:
+        assert _rows(copy) == expected
+    assert store.verify(first) == first
+
+
+def test_second_backup_stores_only_changed_pages(db, store):
+    first = store.backup(db)
+    db.add_transaction(Transaction("Small change", "Food", 1, "expense", datetime(2025, 1, 1)))
+    second = store.backup(db)
+    assert first.snapshot.new_pages == first.snapshot.page_count
+    assert 0 < second.snapshot.new_pages < second.snapshot.page_count // 10
+    assert second.snapshot.pack_bytes < first.snapshot.pack_bytes // 10
+    assert [s.id for s in store.snapshots()] == [1, 2]
+
+
+def _corrupt(path, offset: int):
+    """Flip the bits of one byte of a file"""
+    data = bytearray(path.read_bytes())
+    data[offset] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+
+@pytest.mark.parametrize("suffix", ["pack", "map"])
+def test_corruption_raises_instead_of_restoring(db, store, tmp_path, suffix):
+    expected = _rows(db)
+    store.backup(db)
+    path = tmp_path / "backups" / f"snapshot-000001.{suffix}"
+    _corrupt(path, path.stat().st_size // 2)
+    db.add_transaction(Transaction("Kept", "Food", 1, "expense", datetime(2025, 1, 1)))
+
+    with pytest.raises(ChecksumError):
+        store.restore(db)
+    with pytest.raises(ChecksumError):
+        store.verify()
+    assert len(_rows(db)) == len(expected) + 1
+    assert not (tmp_path / "copy.db").exists()
+    with pytest.raises(ChecksumError):
+        store.restore_file(tmp_path / "copy.db")
+    assert not (tmp_path / "copy.db").exists()
@@ -0,0 +1,129 @@
+"""BudgetEvaluator: spend of the current period from change events"""
+from datetime import date, datetime
+
+import pytest
+
+from src.models import Budget, BudgetEvaluator, ChangeEvent, Database, Transaction
+from src.models import budgets as budgets_module
+
+TODAY = date(2026, 10, 18)
+
+
+def _expense(amount: int, day: date, category: str = "Food") -> Transaction:
+    """An expense on day"""
+    return Transaction("Test", category, amount, "expense", datetime.combine(day, datetime.min.time()))
+
+
+def _insert(*transactions: Transaction) -> ChangeEvent:
+    """Insert event of transactions"""
+    return ChangeEvent("insert", list(transactions))
+
+
+@pytest.fixture
+def evaluator():
+    """Evaluator of a 10000 cents monthly Food budget on TODAY"""
+    return BudgetEvaluator([Budget("Food", 10000)], today=TODAY)
+
+
+def _spent(evaluator: BudgetEvaluator, category: str = "Food") -> int:
+    """Spend of the only budget of category"""
+    return next(s.spent for s in evaluator.statuses() if s.budget.category == category)
+
+
+def test_spend_follows_inserts_and_deletes(evaluator):
+    expense = _expense(3000, TODAY)
+    evaluator.apply(_insert(expense, _expense(2000, date(2026, 10, 1))))
+    assert _spent(evaluator) == 5000
+    evaluator.apply(ChangeEvent("delete", [expense]))
+    assert _spent(evaluator) == 2000
+
+
+def test_income_and_other_categories_are_ignored(evaluator):
+    evaluator.apply(_insert(
+        Transaction("Pay", "Food", 5000, "income", datetime(2026, 10, 2)),
+        _expense(5000, TODAY, "Rent"),
+    ))
+    assert _spent(evaluator) == 0
+
+
+def test_alerts_when_level_rises(evaluator):
+    alerts = []
+    evaluator.subscribe(alerts.append)
+    evaluator.apply(_insert(_expense(8000, TODAY)))
+    evaluator.apply(_insert(_expense(1000, TODAY)))
+    evaluator.apply(_insert(_expense(2000, TODAY)))
+    assert [(a.previous_level, a.level) for a in alerts] == [("ok", "warning"), ("warning", "exceeded")]
+
+
+def test_future_expense_keeps_current_period(evaluator):
+    alerts = []
+    evaluator.subscribe(alerts.append)
+    evaluator.apply(_insert(_expense(500, date(2026, 11, 2))))
+    evaluator.apply(_insert(_expense(7000, date(2026, 10, 19)), _expense(7000, date(2026, 10, 20))))
+    status = evaluator.statuses()[0]
+    assert status.period_start == date(2026, 10, 1)
+    assert status.spent == 14000
+    assert alerts[-1].level == "exceeded"
+
+
+def test_deleting_future_or_past_expense_changes_nothing(evaluator):
+    evaluator.apply(_insert(_expense(1000, TODAY)))
+    evaluator.apply(ChangeEvent("delete", [_expense(500, date(2026, 11, 2))]))
+    evaluator.apply(ChangeEvent("delete", [_expense(500, date(2026, 9, 30))]))
+    assert _spent(evaluator) == 1000
+
+
+def test_update_moves_spend_between_budgets():
+    evaluator = BudgetEvaluator([Budget("Food", 10000), Budget("Fun", 10000)], today=TODAY)
+    before = _expense(3000, TODAY)
+    evaluator.apply(_insert(before))
+    evaluator.apply(ChangeEvent("update", [_expense(4000, TODAY, "Fun")], [before]))
+    assert _spent(evaluator) == 0
+    assert _spent(evaluator, "Fun") == 4000
+
+
+def test_reset_event_needs_reload(evaluator):
+    assert evaluator.apply(ChangeEvent("reset", [])) is False
+
+
+def test_load_seeds_current_period_only(tmp_path):
+    with Database(tmp_path / "budgets.db") as db:
+        db.set_budget(Budget("Food", 10000))
+        db.set_budget(Budget("Food", 50000, "year"))
+        db.add_transactions([
+            _expense(1000, date(2026, 9, 30)),
+            _expense(2000, date(2026, 10, 1)),
+            _expense(4000, date(2026, 11, 1)),
+        ])
+        evaluator = BudgetEvaluator.load(db, TODAY)
+    spent = {s.budget.period: s.spent for s in evaluator.statuses()}
+    assert spent == {"month": 2000, "year": 7000}
+
+
+class _Calendar(date):
+    """date whose today() is set by the test"""
+    current = TODAY
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+def test_new_period_reloads_from_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(budgets_module, "date", _Calendar)
+    with Database(tmp_path / "budgets.db") as db:
+        db.set_budget(Budget("Food", 10000))
+        evaluator = BudgetEvaluator.load(db)
+        evaluator.attach(db)
+        db.add_transaction(_expense(3000, TODAY))
+        db.add_transaction(_expense(8500, date(2026, 11, 2)))
+        assert _spent(evaluator) == 3000
+        assert evaluator.check_period() == []
+
+        monkeypatch.setattr(_Calendar, "current", date(2026, 11, 2))
+        alerts = evaluator.check_period()
+        evaluator.detach()
+    status = evaluator.statuses()[0]
+    assert status.period_start == date(2026, 11, 1)
+    assert status.spent == 8500
+    assert [a.level for a in alerts] == ["warning"]
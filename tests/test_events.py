@@ -0,0 +1,48 @@
+"""Change events and the data versions they are stamped with"""
+import sqlite3
+from datetime import datetime
+
+from src.models import Database, Transaction
+
+
+def _expense(amount: int) -> Transaction:
+    """An expense of amount cents"""
+    return Transaction("Test", "Food", amount, "expense", datetime(2026, 10, 18))
+
+
+def test_events_carry_the_version_of_their_commit(tmp_path):
+    events = []
+    with Database(tmp_path / "events.db") as db:
+        db.subscribe(events.append)
+        db.add_transaction(_expense(100))
+        version, summary = db.read_versioned(db.get_summary)
+        db.add_transaction(_expense(200))
+    assert summary.total_expenses == 100
+    assert events[0].version <= version < events[1].version
+
+
+def test_write_during_read_gives_no_version(tmp_path):
+    with Database(tmp_path / "events.db") as db:
+        def read_then_write():
+            summary = db.get_summary()
+            db.add_transaction(_expense(100))
+            return summary
+
+        version, _ = db.read_versioned(read_then_write)
+    assert version is None
+
+
+def test_local_commits_bump_the_version_once(tmp_path):
+    with Database(tmp_path / "events.db") as db:
+        start = db.data_version()
+        db.add_transaction(_expense(100))
+        db.add_transaction(_expense(200))
+        assert db.data_version() == start + 2
+        assert db.data_version() == start + 2
+
+        other = sqlite3.connect(tmp_path / "events.db")
+        other.execute("DELETE FROM transactions WHERE amount = 100")
+        other.commit()
+        other.close()
+        assert db.data_version() == start + 3
+        assert db.get_summary().total_expenses == 200
@@ -0,0 +1,75 @@
+"""Streaming export to CSV and JSONL"""
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models import Database, Transaction, export_transactions
+from src.models.export import EXPORT_COLUMNS, format_for
+from src.models.query import TransactionFilter
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Database with 25 alternating expenses and incomes over 25 days"""
+    with Database(tmp_path / "export.db", query_cache_size=0) as db:
+        db.add_transactions(
+            Transaction(f"Row {i}", "Food" if i % 2 else "Salary", 100 * i + 5,
+                        "expense" if i % 2 else "income", datetime(2024, 1, 1) + timedelta(days=i))
+            for i in range(25)
+        )
+        yield db
+
+
+def test_csv_with_filter(db, tmp_path):
+    path = tmp_path / "out.csv"
+    expenses = TransactionFilter(transaction_type="expense", start_date=datetime(2024, 1, 10))
+    result = export_transactions(db, path, transaction_filter=expenses)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert result.rows == len(rows) - 1 == 8
+    assert [row[2] for row in rows[1:]] == [f"Row {i}" for i in range(9, 25, 2)]
+    assert rows[1][4] == "9.05"
+    assert {row[5] for row in rows[1:]} == {"expense"}
+
+
+def test_jsonl_with_filter(db):
+    output = io.StringIO()
+    incomes = TransactionFilter(transaction_type="income", end_date=datetime(2024, 1, 6))
+    result = export_transactions(db, output, "jsonl", incomes)
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert result.rows == len(lines) == 3
+    assert [line["description"] for line in lines] == ["Row 0", "Row 2", "Row 4"]
+    assert lines[1]["amount"] == 205
+    assert lines[1]["date"].startswith("2024-01-03")
+    assert set(lines[0]) == set(EXPORT_COLUMNS)
+
+
+def test_streams_in_chunks_with_progress(db, monkeypatch):
+    chunks = []
+    iter_row_chunks = db.iter_row_chunks
+
+    def recording(transaction_filter, chunk_size):
+        for rows in iter_row_chunks(transaction_filter, chunk_size):
+            chunks.append(len(rows))
+            yield rows
+
+    monkeypatch.setattr(db, "iter_row_chunks", recording)
+    progress = []
+    output = io.StringIO()
+    result = export_transactions(db, output, "jsonl", chunk_size=10,
+                                 progress=lambda r: progress.append(r.rows))
+    assert chunks == [10, 10, 5]
+    assert progress == [10, 20, 25]
+    assert result.rows == 25
+    assert len(output.getvalue().splitlines()) == 25
+
+
+def test_format_for():
+    assert format_for("out.CSV") == "csv"
+    assert format_for("out.json") == "jsonl"
+    with pytest.raises(ValueError):
+        format_for("out.xlsx")
@@ -0,0 +1,22 @@
+"""TransactionFrame loaded from the database"""
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+from src.models import Database, Transaction
+
+
+def test_frame_round_trips_stored_transactions(tmp_path):
+    with Database(tmp_path / "frame.db", query_cache_size=0) as db:
+        db.add_transactions(
+            Transaction(f"Row {i % 9}", f"Category {i % 4}", 100 * i + 1,
+                        "expense" if i % 3 else "income",
+                        datetime(1999, 12, 31, 23, 59, 59) + timedelta(hours=7 * i, microseconds=i))
+            for i in range(200)
+        )
+        stored = sorted(db.get_all_transactions(), key=lambda t: (t.date, t.id))
+        frame = db.get_frame(chunk_size=64)
+
+        assert len(frame) == len(stored)
+        for loaded, expected in zip(frame.transactions(), stored):
+            assert loaded == replace(expected, date=expected.date.replace(microsecond=0))
+        assert frame.total() == sum(t.amount for t in stored)
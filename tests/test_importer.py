@@ -0,0 +1,121 @@
+"""Statement import: amount parsing and row validation"""
+from datetime import datetime
+
+import pytest
+
+from src.models import Database, StatementImporter
+from src.models.importer import parse_amount, parse_row
+
+
+@pytest.mark.parametrize("value, cents", [
+    ("12", 1200),
+    ("12.50", 1250),
+    ("-12,5", -1250),
+    ("1,234.56", 123456),
+    ("1.234,56", 123456),
+    ("1 234,56", 123456),
+    ("1 234,56", 123456),
+    ("1'234.50", 123450),
+    ("1,234,567", 123456700),
+    ("1.234.567", 123456700),
+    ("12,34,567.00", 123456700),
+    ("0.125", 13),
+    ("-.50", -50),
+    ("(12.00)", -1200),
+    ("($1,200.00)", -120000),
+    ("-$12.00", -1200),
+    ("$-12.00", -1200),
+    ("12.00-", -1200),
+    ("€ 1.234,56", 123456),
+    ("1.234,56 EUR", 123456),
+    ("+7", 700),
+])
+def test_parse_amount(value, cents):
+    assert parse_amount(value) == cents
+
+
+@pytest.mark.parametrize("value", [
+    "", "abc", "1e3", "1,234", "1.234", "--1", "(-1)", "1,2,3", "12 34", "1.2.3,4", "1,234.5,6",
+])
+def test_parse_amount_rejects(value):
+    with pytest.raises(ValueError):
+        parse_amount(value)
+
+
+@pytest.mark.parametrize("value, decimal, cents", [
+    ("1,234", ".", 123400),
+    ("1,234", ",", 123),
+    ("1.234", ",", 123400),
+    ("1.234,5", ",", 123450),
+])
+def test_parse_amount_with_decimal_mark(value, decimal, cents):
+    assert parse_amount(value, decimal) == cents
+
+
+def test_parse_amount_decimal_mark_must_come_last():
+    with pytest.raises(ValueError):
+        parse_amount("1,234.5", ",")
+
+
+def _row(amount: str, transaction_type: str = "") -> dict:
+    """Raw row with an amount"""
+    return {
+        "description": "Shop", "category": "", "amount": amount,
+        "transaction_type": transaction_type, "date": "2026-10-18",
+    }
+
+
+def test_parenthesised_amount_is_an_expense():
+    transaction = parse_row(_row("(12.00)"))
+    assert (transaction.transaction_type, transaction.amount) == ("expense", 1200)
+    assert transaction.category == "Uncategorized"
+
+
+def test_explicit_type_wins_over_sign():
+    transaction = parse_row(_row("-5.00", "credit"))
+    assert (transaction.transaction_type, transaction.amount) == ("income", 500)
+
+
+def test_import_reports_invalid_amounts(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(
+        "description,category,amount,transaction_type,date\n"
+        "Rent,Housing,\"1.234,56\",expense,2026-10-01\n"
+        "Salary,Work,\"2,500.00\",income,2026-10-01\n"
+        "Oops,Food,1e3,expense,2026-10-02\n"
+        "Maybe,Food,\"1,234\",expense,2026-10-02\n",
+        encoding="utf-8",
+    )
+    with Database(tmp_path / "import.db") as db:
+        result = StatementImporter(db).import_file(path)
+        amounts = sorted(t.amount for t in db.get_all_transactions())
+    assert (result.imported, result.invalid) == (2, 2)
+    assert amounts == [123456, 250000]
+    assert "line 4" in result.errors[0] and "line 5" in result.errors[1]
+
+
+def test_ofx_amounts_use_a_decimal_mark(tmp_path):
+    path = tmp_path / "statement.ofx"
+    path.write_text(
+        "<OFX><STMTTRN><TRNAMT>-1,234<DTPOSTED>20261018<NAME>Shop</STMTTRN>"
+        "\n<STMTTRN><TRNAMT>-1.234<DTPOSTED>20261018<NAME>Shop</STMTTRN></OFX>\n",
+        encoding="latin-1",
+    )
+    with Database(tmp_path / "import.db") as db:
+        result = StatementImporter(db, skip_duplicates=False).import_file(path)
+        amounts = [t.amount for t in db.get_all_transactions()]
+    assert result.imported == 2
+    assert amounts == [123, 123]
+
+
+def test_ofx_dates_ignore_the_csv_date_format(tmp_path):
+    path = tmp_path / "statement.ofx"
+    path.write_text(
+        "<OFX><STMTTRN><TRNAMT>-12.50<DTPOSTED>20261018120000[-5:EST]<NAME>Shop</STMTTRN></OFX>\n",
+        encoding="latin-1",
+    )
+    with Database(tmp_path / "import.db") as db:
+        result = StatementImporter(db, date_format="%d/%m/%Y").import_file(path)
+        dates = [t.date for t in db.get_all_transactions()]
+    assert (result.imported, result.invalid) == (1, 0)
+    assert dates == [datetime(2026, 10, 18)]
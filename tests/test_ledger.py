@@ -0,0 +1,94 @@
+"""Ledger: partition routing, cross-partition queries and archiving"""
+import threading
+from datetime import datetime
+
+import pytest
+
+from src.models import Database, Ledger, Transaction
+from src.models.query import TransactionFilter
+
+
+def _transaction(description, amount, date, transaction_type="expense", category="Food"):
+    return Transaction(description, category, amount, transaction_type, date)
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    """Ledger with two accounts over three years"""
+    with Ledger(tmp_path / "ledger", query_cache_size=0) as ledger:
+        ledger.add_transactions([
+            _transaction("Coffee 2022", 100, datetime(2022, 12, 31)),
+            _transaction("Coffee 2023", 200, datetime(2023, 6, 1)),
+            _transaction("Salary 2023", 5000, datetime(2023, 6, 2), "income", "Salary"),
+            _transaction("Coffee 2024", 400, datetime(2024, 1, 1)),
+        ])
+        ledger.add_transaction(_transaction("Rent", 1000, datetime(2023, 7, 1), category="Home"),
+                               account="savings")
+        yield ledger
+
+
+def test_writes_are_routed_by_account_and_year(ledger, tmp_path):
+    assert ledger.accounts() == ["main", "savings"]
+    assert [p.name for p in ledger.partitions()] == ["main-2022", "main-2023", "savings-2023", "main-2024"]
+    assert sorted(p.name for p in (tmp_path / "ledger").iterdir()
+                  if p.suffix == ".db") == ["main-2022.db", "main-2023.db", "main-2024.db", "savings-2023.db"]
+    with Database((tmp_path / "ledger" / "main-2023.db")) as db:
+        assert sorted(t.description for t in db.get_all_transactions()) == ["Coffee 2023", "Salary 2023"]
+    with pytest.raises(ValueError):
+        ledger.add_transaction(_transaction("Bad", 1, datetime(2023, 1, 1)), account="no-dashes")
+
+
+def test_queries_merge_partitions(ledger):
+    assert [t.description for t in ledger.iter_transactions()] == [
+        "Coffee 2024", "Rent", "Salary 2023", "Coffee 2023", "Coffee 2022"
+    ]
+    assert [t.description for t in ledger.iter_transactions(descending=False, accounts=["main"])] == [
+        "Coffee 2022", "Coffee 2023", "Salary 2023", "Coffee 2024"
+    ]
+    year_2023 = TransactionFilter(start_date=datetime(2023, 1, 1), end_date=datetime(2024, 1, 1))
+    assert ledger.count_transactions(year_2023) == 3
+    assert [t.description for t in ledger.search("coffee", limit=2)] == ["Coffee 2024", "Coffee 2023"]
+    assert ledger.get_balance() == 5000 - 100 - 200 - 400 - 1000
+    assert ledger.get_balance(accounts=["main"], years=[2023]) == 4800
+    assert ledger.get_category_totals("expense") == {"Food": 700, "Home": 1000}
+    assert ledger.get_summary(years=[2023]).total_expenses == 1200
+    assert ledger.get_period_totals("year", "expense") == {
+        "2022": {"expense": 100}, "2023": {"expense": 1200}, "2024": {"expense": 400}
+    }
+
+
+def test_concurrent_first_writes_share_one_partition(tmp_path):
+    with Ledger(tmp_path / "ledger") as ledger:
+        barrier = threading.Barrier(8)
+
+        def write(worker):
+            barrier.wait()
+            ledger.add_transaction(_transaction(f"Row {worker}", 1, datetime(2025, 1, 1)))
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert [p.name for p in ledger.partitions()] == ["main-2025"]
+        assert ledger.count_transactions() == 8
+
+
+def test_archive_and_unarchive(ledger, tmp_path):
+    archived = ledger.archive("main", 2023)
+    assert archived.archived
+    assert archived.path.name == "main-2023.archive.db"
+    assert not (tmp_path / "ledger" / "main-2023.db").exists()
+    assert ledger.get_balance(accounts=["main"], years=[2023]) == 4800
+    with pytest.raises(PermissionError):
+        ledger.add_transaction(_transaction("Late", 1, datetime(2023, 8, 1)))
+
+    # Archives are found again when the ledger is reopened
+    with Ledger(tmp_path / "ledger") as reopened:
+        assert [p.archived for p in reopened.partitions(years=[2023])] == [True, False]
+
+    restored = ledger.unarchive("main", 2023)
+    assert not restored.archived
+    assert restored.path.name == "main-2023.db"
+    ledger.add_transaction(_transaction("Late", 1, datetime(2023, 8, 1)))
+    assert ledger.get_balance(accounts=["main"], years=[2023]) == 4799
@@ -0,0 +1,99 @@
+"""Schema migrations of databases written by earlier versions"""
+import sqlite3
+
+import pytest
+
+from src.models import Database, Transaction
+from src.models.database import MIGRATIONS
+
+# Amounts in currency units, as stored in the REAL column before cents
+LEGACY_ROWS = [
+    ("Coffee", "Food", 3.5, "expense", "2024-01-02T08:00:00"),
+    ("Lunch", "Food", 0.1 + 0.2, "expense", "2024-01-02T12:00:00"),
+    ("Book", "Fun", 19.99, "expense", "2024-02-10T18:00:00"),
+    ("Refund", "Fun", 1.005, "income", "2024-02-11T09:00:00"),
+    ("Salary", "Work", 2500.0, "income", "2024-02-28T09:00:00"),
+]
+
+
+def _legacy_database(path, version: int):
+    """Database with a REAL amount column, migrated up to version"""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            description TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount REAL NOT NULL,
+            transaction_type TEXT NOT NULL CHECK(transaction_type IN ('income', 'expense')),
+            date TEXT NOT NULL
+        )
+    """)
+    for statements in MIGRATIONS[:version]:
+        for statement in statements:
+            conn.execute(statement)
+    conn.execute(f"PRAGMA user_version = {version}")
+    conn.executemany(
+        "INSERT INTO transactions (description, category, amount, transaction_type, date) "
+        "VALUES (?, ?, ?, ?, ?)", LEGACY_ROWS,
+    )
+    # A deleted row: new ids must not reuse it
+    conn.execute("INSERT INTO transactions (description, category, amount, transaction_type, date) "
+                 "VALUES ('Gone', 'Food', 1, 'expense', '2024-03-01T00:00:00')")
+    conn.execute("DELETE FROM transactions WHERE description = 'Gone'")
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.parametrize("version", [0, 3])
+def test_real_amounts_become_cents(tmp_path, version):
+    path = tmp_path / "legacy.db"
+    _legacy_database(path, version)
+    with Database(path) as db:
+        amounts = {t.description: t.amount for t in db.get_all_transactions()}
+        summary = db.get_summary()
+        new_id = db.add_transaction(Transaction("New", "Food", 100, "expense"))
+        drift = db.verify_rollups()
+        schema = db._pool.connection().execute("PRAGMA user_version").fetchone()[0]
+    assert amounts == {"Coffee": 350, "Lunch": 30, "Book": 1999, "Refund": 101, "Salary": 250000}
+    assert (summary.total_expenses, summary.totals["income"]) == (2379, 250101)
+    assert new_id == len(LEGACY_ROWS) + 2
+    assert drift == []
+    assert schema == len(MIGRATIONS)
+
+
+def test_amounts_are_stored_as_integers(tmp_path):
+    path = tmp_path / "legacy.db"
+    _legacy_database(path, 0)
+    Database(path).close()
+    conn = sqlite3.connect(path)
+    types = {row[0] for row in conn.execute("SELECT typeof(amount) FROM transactions")}
+    conn.close()
+    assert types == {"integer"}
+
+
+def _schema(path):
+    """Columns of every table and the names of every index and trigger"""
+    conn = sqlite3.connect(path)
+    try:
+        objects = conn.execute(
+            "SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+        ).fetchall()
+        columns = {
+            name: conn.execute(f"PRAGMA table_info({name})").fetchall()
+            for kind, name in objects if kind == "table"
+        }
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+    return objects, columns, version
+
+
+def test_new_files_get_the_migrated_schema(tmp_path):
+    _legacy_database(tmp_path / "legacy.db", 0)
+    Database(tmp_path / "legacy.db").close()
+    Database(tmp_path / "new.db").close()
+    new = _schema(tmp_path / "new.db")
+    assert new == _schema(tmp_path / "legacy.db")
+    assert new[2] == len(MIGRATIONS)
+    assert ("amount", "INTEGER") in {(c[1], c[2]) for c in new[1]["transactions"]}
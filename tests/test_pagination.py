@@ -0,0 +1,38 @@
+"""Keyset pagination by every sort column"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models import Database, Transaction
+from src.models.query import SORT_COLUMNS, TransactionFilter
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Database with a few hundred rows of both types"""
+    with Database(tmp_path / "pages.db", query_cache_size=0) as db:
+        db.add_transactions(
+            Transaction(f"Item {i % 37}", f"Category {i % 5}", 100 + i % 11,
+                        "income" if i % 4 == 0 else "expense",
+                        datetime(2026, 1, 1) + timedelta(hours=i))
+            for i in range(400)
+        )
+        yield db
+
+
+@pytest.mark.parametrize("order_by", SORT_COLUMNS)
+def test_pages_cover_every_row_once(db, order_by):
+    expenses = TransactionFilter(transaction_type="expense")
+    ids = [t.id for t in db.iter_transactions(expenses, page_size=23, order_by=order_by)]
+    assert len(ids) == len(set(ids)) == db.count_transactions(expenses)
+
+
+@pytest.mark.parametrize("order_by", SORT_COLUMNS)
+def test_pages_per_type_need_no_sort(db, order_by):
+    conn = db._pool.connection()
+    plan = conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT id FROM transactions WHERE transaction_type = ? "
+        f"AND ({order_by}, id) < (?, ?) ORDER BY {order_by} DESC, id DESC LIMIT 200",
+        ("expense", "x", 1),
+    ).fetchall()
+    assert not any("TEMP B-TREE" in row[-1] for row in plan)
@@ -0,0 +1,44 @@
+"""Query cache invalidation by data version"""
+import threading
+from datetime import datetime
+
+from src.models import Database, Transaction
+
+
+def _expense(amount: int) -> Transaction:
+    """An expense of amount cents"""
+    return Transaction("Test", "Food", amount, "expense", datetime(2026, 10, 18))
+
+
+def _in_new_thread(func):
+    """Result of func called on a fresh thread"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_new_threads_share_cached_results(tmp_path):
+    with Database(tmp_path / "cache.db") as db:
+        db.add_transaction(_expense(1000))
+        summaries = [_in_new_thread(db.get_summary) for _ in range(5)]
+        stats = db.cache_stats()
+    assert all(summary == summaries[0] for summary in summaries)
+    assert (stats.hits, stats.misses, stats.invalidations) == (4, 1, 0)
+
+
+def test_writes_invalidate(tmp_path):
+    with Database(tmp_path / "cache.db") as db:
+        db.add_transaction(_expense(1000))
+        assert db.get_summary().total_expenses == 1000
+        db.add_transaction(_expense(500))
+        assert db.get_summary().total_expenses == 1500
+
+
+def test_commits_by_other_connections_invalidate(tmp_path):
+    with Database(tmp_path / "cache.db") as db, Database(tmp_path / "cache.db") as other:
+        db.add_transaction(_expense(1000))
+        assert db.get_summary().total_expenses == 1000
+        other.add_transaction(_expense(500))
+        assert db.get_summary().total_expenses == 1500
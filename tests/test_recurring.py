@@ -0,0 +1,104 @@
+"""Recurring rules: schedules and idempotent materialization"""
+import threading
+from datetime import date
+
+import pytest
+
+from src.models import Database, RecurringRule
+from src.models.database import BULK_INSERT_ROWS
+
+
+def _rule(**fields) -> RecurringRule:
+    """A monthly rent rule starting on 2026-01-31"""
+    return RecurringRule(**{
+        "description": "Rent", "category": "Housing", "amount": 95000,
+        "transaction_type": "expense", "start": date(2026, 1, 31), **fields,
+    })
+
+
+def test_monthly_occurrences_clamp_to_month_end():
+    rule = _rule()
+    assert [rule.occurrence(i) for i in range(4)] == [
+        date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30),
+    ]
+
+
+def test_due_stops_at_end_and_skips_materialized():
+    rule = _rule(frequency="weekly", interval=2, start=date(2026, 1, 1),
+                 end=date(2026, 2, 1), materialized=1)
+    assert [day for _, day in rule.due(date(2026, 12, 31))] == [
+        date(2026, 1, 15), date(2026, 1, 29),
+    ]
+
+
+def test_from_rrule():
+    rule = RecurringRule.from_rrule(
+        "RRULE:FREQ=YEARLY;INTERVAL=2;UNTIL=20300101T000000Z",
+        description="Insurance", category="Car", amount=40000, transaction_type="expense",
+        start=date(2026, 3, 1),
+    )
+    assert (rule.frequency, rule.interval, rule.end) == ("yearly", 2, date(2030, 1, 1))
+    with pytest.raises(ValueError):
+        RecurringRule.from_rrule("FREQ=MONTHLY;BYDAY=MO", description="x", category="x",
+                                 amount=1, transaction_type="expense")
+
+
+def test_materialize_is_idempotent(tmp_path):
+    with Database(tmp_path / "recurring.db") as db:
+        db.add_recurring_rule(_rule())
+        assert db.materialize_recurring(date(2026, 6, 15)) == 5
+        assert db.materialize_recurring(date(2026, 6, 15)) == 0
+        assert db.materialize_recurring(date(2026, 7, 31)) == 2
+        rule = db.get_recurring_rules()[0]
+        dates = [t.date.date() for t in db.get_all_transactions()]
+    assert rule.materialized == 7
+    assert rule.next_date == date(2026, 8, 31)
+    assert len(dates) == len(set(dates)) == 7
+
+
+def test_reopened_database_creates_nothing_twice(tmp_path):
+    path = tmp_path / "recurring.db"
+    with Database(path) as db:
+        db.add_recurring_rule(_rule(frequency="daily", start=date(2020, 1, 1)))
+        created = db.materialize_recurring(date(2026, 1, 1))
+    with Database(path) as db:
+        assert db.materialize_recurring(date(2026, 1, 1)) == 0
+        assert db.count_transactions() == created
+    assert created > BULK_INSERT_ROWS
+
+
+def test_concurrent_runs_create_each_occurrence_once(tmp_path):
+    path = tmp_path / "recurring.db"
+    with Database(path) as db:
+        for i in range(20):
+            db.add_recurring_rule(_rule(description=f"Rule {i}", frequency="weekly",
+                                        start=date(2024, 1, 1)))
+    databases = [Database(path) for _ in range(4)]
+    created = []
+    threads = [
+        threading.Thread(target=lambda db=db: created.append(db.materialize_recurring(date(2026, 1, 1))))
+        for db in databases
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = databases[0].count_transactions()
+    for db in databases:
+        db.close()
+    assert sum(created) == total == 20 * 105
+
+
+def test_failed_batch_leaves_rules_unchanged(tmp_path, monkeypatch):
+    with Database(tmp_path / "recurring.db") as db:
+        db.add_recurring_rule(_rule())
+
+        def fail(cursor, rows):
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(db, "_insert_rows", fail)
+        with pytest.raises(RuntimeError):
+            db.materialize_recurring(date(2026, 6, 15))
+        monkeypatch.undo()
+        assert db.get_recurring_rules()[0].materialized == 0
+        assert db.materialize_recurring(date(2026, 6, 15)) == 5
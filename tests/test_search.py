@@ -0,0 +1,29 @@
+"""Full-text search with filters"""
+from datetime import datetime, timedelta
+
+from src.models import Database, Transaction
+from src.models.query import TransactionFilter
+
+
+def test_filter_applies_before_candidate_limit(tmp_path):
+    old = datetime(2015, 1, 1)
+    new = datetime(2024, 1, 1)
+    with Database(tmp_path / "search.db") as db:
+        db.add_transactions(
+            [Transaction("Coffee", "Food", 300, "expense", old + timedelta(days=i)) for i in range(31)]
+            + [Transaction("Coffee", "Food", 300, "expense", new + timedelta(hours=i)) for i in range(50)]
+        )
+        january = TransactionFilter(start_date=old, end_date=datetime(2015, 2, 1))
+        results = db.search("coffee", january, candidates=40)
+        assert len(results) == 31
+        assert all(t.date < datetime(2015, 2, 1) for t in results)
+        assert len(db.search("coffee", limit=100, candidates=40)) == 40
+
+
+def test_candidates_are_the_latest_dated_matches(tmp_path):
+    with Database(tmp_path / "search.db") as db:
+        # Backfilled history gets higher ids than the recent rows
+        db.add_transactions(Transaction("Coffee", "Food", 300, "expense", datetime(2024, 1, 1) + timedelta(days=i)) for i in range(10))
+        db.add_transactions(Transaction("Coffee", "Food", 300, "expense", datetime(2010, 1, 1) + timedelta(days=i)) for i in range(10))
+        results = db.search("coffee", candidates=5)
+        assert [t.date for t in results] == [datetime(2024, 1, 10) - timedelta(days=i) for i in range(5)]
@@ -0,0 +1,125 @@
+"""WriteQueue: group commits, per-write failures, retries and shutdown"""
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from src.models import Database, Transaction, WriteQueue
+from src.models import writer as writer_module
+
+
+def _expense(description: str, amount: int = 100) -> Transaction:
+    """An expense identified by its description"""
+    return Transaction(description, "Food", amount, "expense", datetime(2026, 10, 18))
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Empty database"""
+    with Database(tmp_path / "writer.db", query_cache_size=0) as db:
+        yield db
+
+
+def test_writes_submitted_together_commit_in_one_batch(db):
+    events = []
+    db.subscribe(events.append)
+    with WriteQueue(db, max_delay=0.5) as writer:
+        futures = writer.add_transactions(_expense(f"Row {i}") for i in range(20))
+        ids = [future.result(timeout=5) for future in futures]
+    assert ids == sorted(ids) and len(set(ids)) == 20
+    assert (writer.stats.batches, writer.stats.writes) == (1, 20)
+    assert len(events) == 1 and len(events[0].transactions) == 20
+    assert db.count_transactions() == 20
+
+
+def test_failing_write_fails_only_its_own_future(db):
+    invalid = Transaction("Bad", "Food", 100, "bogus", datetime(2026, 10, 18))
+    with WriteQueue(db, max_delay=0.5) as writer:
+        before = writer.add_transaction(_expense("Before"))
+        bad = writer.submit("insert", invalid)
+        after = writer.add_transaction(_expense("After"))
+        missing = writer.delete_transaction(12345)
+    assert before.result() and after.result()
+    assert isinstance(bad.exception(), sqlite3.IntegrityError)
+    assert missing.result() is False
+    assert writer.stats.batches == 1
+    assert sorted(t.description for t in db.get_all_transactions()) == ["After", "Before"]
+
+
+def test_busy_database_is_retried_with_backoff(db, monkeypatch):
+    delays = []
+    monkeypatch.setattr(writer_module.time, "sleep", delays.append)
+    write_batch = db.write_batch
+    attempts = []
+
+    def busy_twice(operations):
+        attempts.append(len(operations))
+        if len(attempts) <= 2:
+            raise sqlite3.OperationalError("database is locked")
+        return write_batch(operations)
+
+    monkeypatch.setattr(db, "write_batch", busy_twice)
+    with WriteQueue(db, backoff=0.01) as writer:
+        future = writer.add_transaction(_expense("Retried"))
+        assert future.result(timeout=5) > 0
+    assert writer.stats.retries == 2
+    assert len(delays) == 2 and 0.005 <= delays[0] <= 0.015 and 0.01 <= delays[1] <= 0.03
+    assert db.count_transactions() == 1
+
+
+def test_busy_retries_are_limited(db, monkeypatch):
+    monkeypatch.setattr(writer_module.time, "sleep", lambda delay: None)
+
+    def always_busy(operations):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(db, "write_batch", always_busy)
+    with WriteQueue(db, retries=3) as writer:
+        future = writer.add_transaction(_expense("Lost"))
+        assert isinstance(future.exception(timeout=5), sqlite3.OperationalError)
+    assert (writer.stats.retries, writer.stats.failed_batches) == (3, 1)
+
+
+def test_other_errors_are_not_retried(db, monkeypatch):
+    def broken(operations):
+        raise sqlite3.OperationalError("no such table: transactions")
+
+    monkeypatch.setattr(db, "write_batch", broken)
+    with WriteQueue(db) as writer:
+        future = writer.add_transaction(_expense("Lost"))
+        assert isinstance(future.exception(timeout=5), sqlite3.OperationalError)
+    assert writer.stats.retries == 0
+
+
+def test_close_drains_pending_writes(db):
+    writer = WriteQueue(db, max_batch=7, max_delay=1.0)
+    futures = writer.add_transactions(_expense(f"Row {i}") for i in range(50))
+    assert writer.close(timeout=10)
+    assert all(future.done() and future.exception() is None for future in futures)
+    assert db.count_transactions() == 50
+    with pytest.raises(RuntimeError):
+        writer.add_transaction(_expense("Too late"))
+
+
+def test_concurrent_writers_lose_no_rows(tmp_path):
+    path = tmp_path / "writers.db"
+    Database(path).close()
+    writers, writes = 4, 150
+
+    def write(worker: int):
+        with Database(path, query_cache_size=0) as db, WriteQueue(db, max_batch=20) as queue:
+            futures = queue.add_transactions(_expense(f"writer {worker} row {i}") for i in range(writes))
+            for future in futures:
+                future.result(timeout=30)
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with Database(path) as db:
+        counts = Counter(t.description for t in db.get_all_transactions())
+    assert len(counts) == writers * writes
+    assert set(counts.values()) == {1}